@@ -30,13 +30,17 @@ def must(name: str) -> str:
         raise RuntimeError(f"Missing env var: {name}. Проверь .env и место запуска alembic.")
     return v
 
-DB_USER = must("DB_USER")
-DB_PASS = must("DB_PASS")
-DB_HOST = must("DB_HOST")
-DB_PORT = must("DB_PORT")
-DB_NAME = must("DB_NAME")
+if os.getenv("DB_TITLE", "postgres").lower() == "sqlite":
+    DB_FILE = os.getenv("DB_FILE", "./data/sqlite.db")
+    DATABASE_URL = f"sqlite:///{Path(DB_FILE).as_posix()}"
+else:
+    DB_USER = must("DB_USER")
+    DB_PASS = must("DB_PASS")
+    DB_HOST = must("DB_HOST")
+    DB_PORT = must("DB_PORT")
+    DB_NAME = must("DB_NAME")
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
@@ -19,6 +19,12 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
+    # SQLite не умеет ALTER TABLE ADD CONSTRAINT — там то же самое даёт уникальный индекс
+    # (имена как у автоматически названных ограничений Postgres)
+    if op.get_bind().dialect.name == "sqlite":
+        op.create_index('activities_name_key', 'activities', ['name'], unique=True)
+        op.create_index('organizations_name_key', 'organizations', ['name'], unique=True)
+        return
     # ### commands auto generated by Alembic - please adjust! ###
     op.create_unique_constraint(None, 'activities', ['name'])
     op.create_unique_constraint(None, 'organizations', ['name'])
@@ -26,6 +32,10 @@ def upgrade() -> None:
 
 
 def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        op.drop_index('organizations_name_key', table_name='organizations')
+        op.drop_index('activities_name_key', table_name='activities')
+        return
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_constraint(None, 'organizations', type_='unique')
     op.drop_constraint(None, 'activities', type_='unique')
@@ -0,0 +1,54 @@
+"""activity_closure_delete
+
+Revision ID: 6b9e2f1d4c80
+Revises: a4d8e2c61b59
+Create Date: 2026-10-19 10:14:52.310775
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b9e2f1d4c80'
+down_revision: Union[str, None] = 'a4d8e2c61b59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# На Postgres удаление разбирает ON DELETE CASCADE (поддерево activities, activity_closure, связи
+# с организациями). SQLite по умолчанию внешние ключи не проверяет (PRAGMA foreign_keys выключен),
+# поэтому каскад повторяем триггером: closure к этому моменту ещё цела и знает всё поддерево.
+# Вложенные удаления этот же триггер не запускают (recursive_triggers выключен) — он и не нужен.
+CLOSURE_DELETE_SQL = """
+    DELETE FROM organization_activities
+    WHERE activity_id IN (SELECT descendant_id FROM activity_closure WHERE ancestor_id = OLD.id);
+    DELETE FROM activities
+    WHERE id IN (SELECT descendant_id FROM activity_closure WHERE ancestor_id = OLD.id AND depth > 0);
+    DELETE FROM activity_closure
+    WHERE descendant_id IN (SELECT descendant_id FROM activity_closure WHERE ancestor_id = OLD.id);
+"""
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        return
+
+    op.execute(f"""
+        CREATE TRIGGER trg_activity_closure_delete AFTER DELETE ON activities
+        BEGIN
+            {CLOSURE_DELETE_SQL}
+        END
+    """)
+    # строки, оставшиеся от уже удалённых видов деятельности
+    op.execute("DELETE FROM activity_closure WHERE ancestor_id NOT IN (SELECT id FROM activities)")
+    op.execute("DELETE FROM activity_closure WHERE descendant_id NOT IN (SELECT id FROM activities)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS trg_activity_closure_delete")
@@ -0,0 +1,122 @@
+"""activity_closure
+
+Revision ID: 9c4f1e6b2a07
+Revises: 5e2d8a41c7b3
+Create Date: 2026-10-18 11:02:07.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4f1e6b2a07'
+down_revision: Union[str, None] = '5e2d8a41c7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Тела триггеров одинаковы для Postgres и SQLite, отличается только обвязка.
+CLOSURE_INSERT_SQL = """
+    INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, NEW.id, depth + 1 FROM activity_closure WHERE descendant_id = NEW.parent_id
+    UNION ALL
+    SELECT NEW.id, NEW.id, 0;
+"""
+
+# перенос поддерева: отрываем его от старых предков и подвешиваем к предкам нового родителя
+CLOSURE_MOVE_SQL = """
+    DELETE FROM activity_closure
+    WHERE descendant_id IN (SELECT descendant_id FROM activity_closure WHERE ancestor_id = NEW.id)
+      AND ancestor_id IN (
+          SELECT ancestor_id FROM activity_closure WHERE descendant_id = NEW.id AND ancestor_id <> NEW.id
+      );
+    INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+    SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+    FROM activity_closure a
+    CROSS JOIN activity_closure d
+    WHERE a.descendant_id = NEW.parent_id AND d.ancestor_id = NEW.id;
+"""
+
+BACKFILL_SQL = """
+    INSERT INTO activity_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM activities
+        UNION ALL
+        SELECT tree.ancestor_id, activities.id, tree.depth + 1
+        FROM tree
+        JOIN activities ON activities.parent_id = tree.descendant_id
+    )
+    SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+
+def upgrade() -> None:
+    op.create_table('activity_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['activities.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['activities.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_activity_closure_descendant', 'activity_closure', ['descendant_id'], unique=False)
+
+    op.execute(BACKFILL_SQL)
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(f"""
+            CREATE FUNCTION activity_closure_insert() RETURNS trigger AS $$
+            BEGIN
+                {CLOSURE_INSERT_SQL}
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE FUNCTION activity_closure_move() RETURNS trigger AS $$
+            BEGIN
+                {CLOSURE_MOVE_SQL}
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER trg_activity_closure_insert AFTER INSERT ON activities
+            FOR EACH ROW EXECUTE FUNCTION activity_closure_insert()
+        """)
+        op.execute("""
+            CREATE TRIGGER trg_activity_closure_move AFTER UPDATE OF parent_id ON activities
+            FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id)
+            EXECUTE FUNCTION activity_closure_move()
+        """)
+    else:
+        op.execute(f"""
+            CREATE TRIGGER trg_activity_closure_insert AFTER INSERT ON activities
+            BEGIN
+                {CLOSURE_INSERT_SQL}
+            END
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_activity_closure_move AFTER UPDATE OF parent_id ON activities
+            WHEN OLD.parent_id IS NOT NEW.parent_id
+            BEGIN
+                {CLOSURE_MOVE_SQL}
+            END
+        """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS trg_activity_closure_move ON activities")
+        op.execute("DROP TRIGGER IF EXISTS trg_activity_closure_insert ON activities")
+        op.execute("DROP FUNCTION IF EXISTS activity_closure_move()")
+        op.execute("DROP FUNCTION IF EXISTS activity_closure_insert()")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS trg_activity_closure_move")
+        op.execute("DROP TRIGGER IF EXISTS trg_activity_closure_insert")
+
+    op.drop_index('ix_activity_closure_descendant', table_name='activity_closure')
+    op.drop_table('activity_closure')
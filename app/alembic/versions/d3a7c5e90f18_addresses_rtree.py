@@ -0,0 +1,64 @@
+"""addresses_rtree
+
+Revision ID: d3a7c5e90f18
+Revises: 9c4f1e6b2a07
+Create Date: 2026-10-18 12:24:55.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7c5e90f18'
+down_revision: Union[str, None] = '9c4f1e6b2a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# R*Tree есть только в SQLite; на Postgres миграция ничего не делает.
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("CREATE VIRTUAL TABLE addresses_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+    op.execute("""
+        INSERT INTO addresses_rtree (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT id, lat, lat, lon, lon FROM addresses
+        WHERE lat IS NOT NULL AND lon IS NOT NULL
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_addresses_rtree_insert AFTER INSERT ON addresses
+        WHEN NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL
+        BEGIN
+            INSERT INTO addresses_rtree (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (NEW.id, NEW.lat, NEW.lat, NEW.lon, NEW.lon);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_addresses_rtree_update AFTER UPDATE OF lat, lon ON addresses
+        BEGIN
+            DELETE FROM addresses_rtree WHERE id = OLD.id;
+            INSERT INTO addresses_rtree (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT NEW.id, NEW.lat, NEW.lat, NEW.lon, NEW.lon
+            WHERE NEW.lat IS NOT NULL AND NEW.lon IS NOT NULL;
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_addresses_rtree_delete AFTER DELETE ON addresses
+        BEGIN
+            DELETE FROM addresses_rtree WHERE id = OLD.id;
+        END
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS trg_addresses_rtree_delete")
+    op.execute("DROP TRIGGER IF EXISTS trg_addresses_rtree_update")
+    op.execute("DROP TRIGGER IF EXISTS trg_addresses_rtree_insert")
+    op.execute("DROP TABLE IF EXISTS addresses_rtree")
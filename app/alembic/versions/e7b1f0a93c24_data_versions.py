@@ -0,0 +1,75 @@
+"""data_versions
+
+Revision ID: e7b1f0a93c24
+Revises: d3a7c5e90f18
+Create Date: 2026-10-18 15:20:41.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b1f0a93c24'
+down_revision: Union[str, None] = 'd3a7c5e90f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRACKED_TABLES = ("addresses", "activities", "organizations", "organization_phones", "organization_activities")
+
+
+def upgrade() -> None:
+    op.create_table('data_versions',
+    sa.Column('table_name', sa.Text(), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+    op.bulk_insert(
+        sa.table('data_versions', sa.column('table_name', sa.Text())),
+        [{'table_name': name} for name in TRACKED_TABLES],
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        # statement-level: массовая загрузка двигает версию один раз, а не на каждую строку
+        op.execute("""
+            CREATE FUNCTION bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE data_versions SET version = version + 1, updated_at = now()
+                WHERE table_name = TG_TABLE_NAME;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        for name in TRACKED_TABLES:
+            op.execute(f"""
+                CREATE TRIGGER trg_{name}_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {name}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()
+            """)
+    else:
+        for name in TRACKED_TABLES:
+            for event in ("insert", "update", "delete"):
+                op.execute(f"""
+                    CREATE TRIGGER trg_{name}_data_version_{event} AFTER {event.upper()} ON {name}
+                    BEGIN
+                        UPDATE data_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                        WHERE table_name = '{name}';
+                    END
+                """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for name in TRACKED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{name}_data_version ON {name}")
+        op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    else:
+        for name in TRACKED_TABLES:
+            for event in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS trg_{name}_data_version_{event}")
+
+    op.drop_table('data_versions')
@@ -0,0 +1,68 @@
+"""org_name_search
+
+Revision ID: f2c9d4b7a1e3
+Revises: e7b1f0a93c24
+Create Date: 2026-10-18 16:41:09.207315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9d4b7a1e3'
+down_revision: Union[str, None] = 'e7b1f0a93c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Postgres: GIN-индекс pg_trgm по lower(name) — его использует и ILIKE '%q%', и <% / word_similarity,
+# обновляется сам. SQLite: FTS5 с trigram-токенизатором поверх organizations, синхронизация триггерами.
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # сборка Postgres без contrib: индекса не будет, /orgs/search останется на LIKE
+        if bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar() is None:
+            return
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX ix_org_name_trgm ON organizations USING gin (lower(name) gin_trgm_ops)")
+        return
+
+    op.execute("""
+        CREATE VIRTUAL TABLE organizations_fts USING fts5(
+            name, content='organizations', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    op.execute("INSERT INTO organizations_fts (organizations_fts) VALUES ('rebuild')")
+    op.execute("""
+        CREATE TRIGGER trg_organizations_fts_insert AFTER INSERT ON organizations
+        BEGIN
+            INSERT INTO organizations_fts (rowid, name) VALUES (NEW.id, NEW.name);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_organizations_fts_update AFTER UPDATE OF name ON organizations
+        BEGIN
+            INSERT INTO organizations_fts (organizations_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+            INSERT INTO organizations_fts (rowid, name) VALUES (NEW.id, NEW.name);
+        END
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_organizations_fts_delete AFTER DELETE ON organizations
+        BEGIN
+            INSERT INTO organizations_fts (organizations_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+        END
+    """)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_org_name_trgm")
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS trg_organizations_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS trg_organizations_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS trg_organizations_fts_insert")
+    op.execute("DROP TABLE IF EXISTS organizations_fts")
@@ -0,0 +1,120 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.infrastructure.repos import DIRECTORY_TABLES
+
+
+def _route_tables(path: str) -> tuple[str, ...] | None:
+    # от каких таблиц зависит ответ GET-маршрута
+    if path == "/addresses":
+        return ("addresses",)
+    if path == "/orgs" or path.startswith(("/orgs/", "/addresses/")):
+        return DIRECTORY_TABLES
+    return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # для If-None-Match сравнение слабое: W/"x" совпадает с "x"
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class ConditionalGetMiddleware:
+    # ETag / Last-Modified из версий данных (DataVersion). ETag привязан к URL: совпасть он может,
+    # только если клиент уже получил 200 на этот же запрос при той же версии данных — значит, маршрут
+    # найден, параметры валидны и объект существует. Тогда 304 отдаётся до роутера, т.е. без сессии,
+    # запросов к БД и сериализации. If-None-Match: * и If-Modified-Since к URL не привязаны:
+    # их проверяем уже по ответу обработчика и заменяем на 304 только 200.
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        data_version = getattr(scope["app"].state, "data_version", None)
+        path = scope["path"].removeprefix(scope.get("root_path", "")) or "/"
+        tables = _route_tables(path)
+        if data_version is None or tables is None:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        etag, last_modified = self._validators(
+            data_version, tables, path, scope.get("query_string", b""), request_headers.get("accept", ""),
+        )
+        validators = {
+            "ETag": etag,
+            "Last-Modified": format_datetime(last_modified, usegmt=True),
+            "Cache-Control": "no-cache",
+            "Vary": "Accept",
+        }
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None and if_none_match.strip() != "*" and _etag_matches(if_none_match, etag):
+            await Response(status_code=304, headers=validators)(scope, receive, send)
+            return
+
+        not_modified = False
+
+        async def send_with_validators(message) -> None:
+            nonlocal not_modified
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                if self._not_modified(request_headers, etag, last_modified):
+                    # тело обработчика клиенту не нужно
+                    not_modified = True
+                    message = {
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": Response(status_code=304, headers=validators).raw_headers,
+                    }
+                else:
+                    headers = MutableHeaders(scope=message)
+                    for name, value in validators.items():
+                        if name not in headers:
+                            headers[name] = value
+            elif message["type"] == "http.response.body" and not_modified:
+                if message.get("more_body", False):
+                    return
+                message = {"type": "http.response.body", "body": b""}
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
+
+    @staticmethod
+    def _validators(
+            data_version, tables: tuple[str, ...], path: str, query_string: bytes, accept: str,
+    ) -> tuple[str, datetime]:
+        stamps = [data_version.updated_at.get(name) for name in tables]
+        last_modified = max(
+            (s if s.tzinfo else s.replace(tzinfo=timezone.utc) for s in stamps if s is not None),
+            default=datetime(1970, 1, 1, tzinfo=timezone.utc),
+        ).replace(microsecond=0)
+
+        # updated_at в ключе: после пересоздания БД счётчики начинаются заново, а отметки времени — нет
+        key = f"{data_version.snapshot(tables)}|{stamps}|{'ndjson' in accept}|{path}?{query_string.decode('latin-1')}"
+        return f'"{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"', last_modified
+
+    @staticmethod
+    def _not_modified(headers: Headers, etag: str, last_modified: datetime) -> bool:
+        if_none_match = headers.get("if-none-match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, etag)
+
+        if_modified_since = headers.get("if-modified-since")
+        if if_modified_since is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified <= since
@@ -1,8 +1,44 @@
 from app.api.schemas import AddressOut
+from app.infrastructure.core.timing import timed
 from app.infrastructure.repos.models import Address
 
+@timed("map")
 def address_to_out(a: Address) -> AddressOut:
     return AddressOut.model_validate(a)
 
+@timed("map")
 def addresses_to_out(addresses: list[Address]) -> list[AddressOut]:
     return [address_to_out(a) for a in addresses]
+
+@timed("map")
+def address_to_dict(a: Address) -> dict:
+    return {
+        "id": a.id,
+        "country": a.country,
+        "city": a.city,
+        "street": a.street,
+        "house": a.house,
+        "building": a.building,
+        "lat": a.lat,
+        "lon": a.lon,
+    }
+
+@timed("map")
+def addresses_to_dicts(addresses: list[Address]) -> list[dict]:
+    return [address_to_dict(a) for a in addresses]
+
+@timed("map")
+def address_with_orgs_to_dict(
+        a: Address,
+        distance_m: float,
+        orgs: list[tuple[int, str]],
+        details: dict[int, tuple[list[str], list[str]]],
+) -> dict:
+    return {
+        **address_to_dict(a),
+        "distance_m": round(distance_m, 1),
+        "organizations": [
+            {"id": org_id, "name": name, "phones": details[org_id][0], "activities": details[org_id][1]}
+            for org_id, name in orgs
+        ],
+    }
@@ -1,7 +1,10 @@
 from app.api.schemas import OrganizationOut, AddressOut
+from app.infrastructure.core.timing import timed
 from app.infrastructure.repos.models import Organization
+from .addresses import address_to_dict
 
 
+@timed("map")
 def org_to_out(o: Organization) -> OrganizationOut:
     return OrganizationOut(
         id=o.id,
@@ -12,5 +15,22 @@ def org_to_out(o: Organization) -> OrganizationOut:
     )
 
 
+@timed("map")
 def orgs_to_out(orgs: list[Organization]) -> list[OrganizationOut]:
     return [org_to_out(o) for o in orgs]
+
+
+@timed("map")
+def org_to_dict(o: Organization) -> dict:
+    return {
+        "id": o.id,
+        "name": o.name,
+        "address": address_to_dict(o.address),
+        "phones": [p.phone for p in o.phones],
+        "activities": [a.name for a in o.activities],
+    }
+
+
+@timed("map")
+def orgs_to_dicts(orgs: list[Organization]) -> list[dict]:
+    return [org_to_dict(o) for o in orgs]
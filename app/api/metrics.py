@@ -0,0 +1,51 @@
+from time import perf_counter
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.infrastructure.core.metrics import HTTP_DURATION, HTTP_IN_FLIGHT, HTTP_REQUESTS
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def _route_template(scope: Scope) -> str:
+    # метка — шаблон пути (/orgs/{org_id}), а не сам путь, иначе число серий не ограничено
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # 304 из ConditionalGetMiddleware отдаётся до роутера — сопоставляем маршрут сами
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    # Латентность, статусы и число запросов «в работе» для /metrics.
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            method, route = scope["method"], _route_template(scope)
+            HTTP_DURATION.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status))
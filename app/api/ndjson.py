@@ -0,0 +1,30 @@
+from typing import AsyncIterator, Callable
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(
+        request: Request,
+        chunks: AsyncIterator[list],
+        to_out: Callable[[object], BaseModel],
+) -> StreamingResponse:
+    log = request.app.state.logger
+
+    async def body():
+        try:
+            async for chunk in chunks:
+                yield "".join(to_out(item).model_dump_json() + "\n" for item in chunk)
+        except SQLAlchemyError as e:
+            # статус уже отправлен, остаётся только оборвать поток
+            log.exception("DB error while streaming NDJSON", exc_info=e)
+
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
@@ -5,16 +5,25 @@ GET_ALL_ORGS = {
     "summary": "Получить список всех организаций",
     "description": (
         "Эндпоинт для получения списка всех организаций.\n\n"
+        "Параметры (query):\n"
+        "- `limit` — размер страницы (по умолчанию 100, максимум 1000)\n"
+        "- `cursor` — значение `next_cursor` из предыдущего ответа (опционально)\n\n"
         "Логика:\n"
-        "1) Всегда возвращает 200 и список организаций (список может быть пустым)\n"
-        "2) При ошибке базы данных вернёт 500\n\n"
+        "1) Всегда возвращает 200 и страницу организаций (список может быть пустым)\n"
+        "2) Если есть следующая страница — в `next_cursor` будет курсор для неё, иначе null\n"
+        "3) При некорректном курсоре вернёт 400\n"
+        "4) При ошибке базы данных вернёт 500\n\n"
         "Возвращаемые поля для каждой организации:\n"
         "- `id` — идентификатор организации\n"
         "- `name` — название организации\n"
         "- `address` — адрес организации\n"
         "- `phones` — список телефонов\n"
-        "- `activities` — список названий деятельностей\n"
-        "Пояснение: тут нужен offset и limit, если организаций много\n\n"
+        "- `activities` — список названий деятельностей\n\n"
+        "Пагинация курсорная по (name, id): стоимость глубоких страниц не растёт, в отличие от offset.\n\n"
+        "Потоковый режим: с заголовком `Accept: application/x-ndjson` вернёт все организации "
+        "(начиная с `cursor`, если он передан) построчно в формате NDJSON, `limit` игнорируется.\n\n"
+        "Условные запросы: ответ содержит `ETag` и `Last-Modified` (версия данных справочника); "
+        "с `If-None-Match`/`If-Modified-Since` при неизменных данных вернёт 304 без тела.\n"
     ),
     "tags": [ORGS_TAG],
     "responses": {
@@ -38,11 +47,19 @@ GET_ALL_ORGS = {
                                 "phones": ["+7-999-111-22-33", "+7-999-444-55-66"],
                                 "activities": ["Аптека", "Кофейня"],
                             }
-                        ]
+                        ],
+                        "next_cursor": "WyJvcmdfMSIsMV0",
                     }
                 }
             },
         },
+        304: {
+            "description": "Данные не изменились (совпал `If-None-Match` или `If-Modified-Since`)",
+        },
+        400: {
+            "description": "Некорректный курсор",
+            "content": {"application/json": {"example": {"detail": "Некорректный курсор."}}},
+        },
         500: {
             "description": "Ошибка базы данных",
             "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
@@ -97,6 +114,159 @@ GET_ORG_BY_ID = {
     },
 }
 
+SEARCH_ORGS = {
+    "summary": "Искать организации по части названия (с опечатками)",
+    "description": (
+        "Эндпоинт для поиска организаций по названию: подходит часть названия, регистр не важен, "
+        "небольшие опечатки допускаются.\n\n"
+        "Параметры (query):\n"
+        "- `q` — строка поиска\n"
+        "- `limit` — сколько организаций вернуть (по умолчанию 20, максимум 100)\n\n"
+        "Логика:\n"
+        "1) Postgres: индекс `pg_trgm` по `lower(name)` — подстрока или похожее слово, "
+        "сортировка по `word_similarity`/`similarity`\n"
+        "2) SQLite: FTS5-индекс с trigram-токенизатором — совпадение по триграммам запроса, сортировка по bm25 "
+        "(запросы короче 3 символов ищутся как подстрока)\n"
+        "3) Возвращает 200 и список организаций, самые похожие — первыми (список может быть пустым)\n"
+        "4) При ошибке базы данных — вернёт 500\n"
+    ),
+    "tags": [ORGS_TAG],
+    "responses": {
+        200: {
+            "description": "Результаты поиска успешно получены",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "organizations": [
+                            {
+                                "id": 1,
+                                "name": "Рога и Копыта",
+                                "address": {
+                                    "id": 10,
+                                    "country": "Россия",
+                                    "city": "Москва",
+                                    "street": "Тверская",
+                                    "house": 1,
+                                    "building": None,
+                                },
+                                "phones": ["2-222-222"],
+                                "activities": ["Мясная продукция"],
+                            }
+                        ],
+                    }
+                }
+            },
+        },
+        500: {
+            "description": "Ошибка базы данных",
+            "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
+        },
+    },
+}
+
+GET_ORGS_BATCH = {
+    "summary": "Получить организации по списку идентификаторов",
+    "description": (
+        "Пакетная замена `GET /orgs/{org_id}` в цикле: весь список разрешается за постоянное число запросов к БД.\n\n"
+        "Тело запроса:\n"
+        "- `ids` — идентификаторы организаций (от 1 до 1000, повторы допустимы)\n\n"
+        "Логика:\n"
+        "1) `results` идёт в том же порядке, что и `ids`\n"
+        "2) Для найденной организации `found: true` и `organization`, для ненайденной — `found: false` "
+        "и `organization: null`\n"
+        "3) При ошибке базы данных — вернёт 500\n"
+    ),
+    "tags": [ORGS_TAG],
+    "responses": {
+        200: {
+            "description": "Результаты по каждому идентификатору успешно получены",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "results": [
+                            {
+                                "id": 1,
+                                "found": True,
+                                "organization": {
+                                    "id": 1,
+                                    "name": "org_1",
+                                    "address": {
+                                        "id": 10,
+                                        "country": "Россия",
+                                        "city": "Москва",
+                                        "street": "Тверская",
+                                        "house": 1,
+                                        "building": None,
+                                    },
+                                    "phones": ["+7-999-111-22-33"],
+                                    "activities": ["Аптека"],
+                                },
+                            },
+                            {"id": 999, "found": False, "organization": None},
+                        ]
+                    }
+                }
+            },
+        },
+        500: {
+            "description": "Ошибка базы данных",
+            "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
+        },
+    },
+}
+
+GET_ORGS_BY_ADDRESS_BATCH = {
+    "summary": "Получить организации для списка зданий по адресам",
+    "description": (
+        "Пакетная версия `GET /orgs/address`: здания и их организации разрешаются за постоянное число запросов к БД.\n\n"
+        "Тело запроса:\n"
+        "- `addresses` — части адресов, как в `GET /orgs/address` (от 1 до 500)\n\n"
+        "Логика:\n"
+        "1) `results` идёт в том же порядке, что и `addresses`\n"
+        "2) Для найденного здания `found: true`, `address_id` и все его организации, для ненайденного — "
+        "`found: false`, `address_id: null` и пустой список\n"
+        "3) Регистр и лишние пробелы в частях адреса не важны\n"
+        "4) При ошибке базы данных — вернёт 500\n"
+    ),
+    "tags": [ORGS_TAG],
+    "responses": {
+        200: {
+            "description": "Результаты по каждому адресу успешно получены",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "results": [
+                            {
+                                "address_id": 10,
+                                "found": True,
+                                "organizations": [{
+                                    "id": 1,
+                                    "name": "org_1",
+                                    "address": {
+                                        "id": 10,
+                                        "country": "Россия",
+                                        "city": "Москва",
+                                        "street": "Тверская",
+                                        "house": 1,
+                                        "building": None,
+                                    },
+                                    "phones": ["+7-999-111-22-33"],
+                                    "activities": ["Аптека"],
+                                }],
+                            },
+                            {"address_id": None, "found": False, "organizations": []},
+                        ]
+                    }
+                }
+            },
+        },
+        500: {
+            "description": "Ошибка базы данных",
+            "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
+        },
+    },
+}
+
 CHECK_ORGS_IN_BUILDING = {
     "summary": "Получить список организаций в здании по адресу",
     "description": (
@@ -107,9 +277,14 @@ CHECK_ORGS_IN_BUILDING = {
         "- `street` — улица\n"
         "- `house` — номер дома\n"
         "- `building` — корпус/строение (опционально)\n"
+        "- `limit`, `cursor` — курсорная пагинация, как в `GET /orgs`\n"
+        "Регистр и лишние пробелы в частях адреса не важны (поиск по индексу `ix_addresses_lookup_ci`; "
+        "в SQLite регистр не учитывается только для латиницы)\n"
         "Логика:\n"
-        "1) Если здание найдено — вернёт 200 и список организаций (список может быть пустым)\n"
+        "1) Если здание найдено — вернёт 200 и страницу организаций (список может быть пустым)\n"
         "2) Если здание не найдено — вернёт 404\n\n"
+        "Кэш: ответ кэшируется в памяти процесса (LRU + TTL) и сбрасывается при изменении данных; "
+        "одинаковые одновременные запросы выполняются в БД один раз (заголовок `X-Cache: HIT/MISS/COALESCED`)\n"
     ),
     "tags": [ORGS_TAG],
     "responses": {
@@ -136,15 +311,20 @@ GET_ORGS_BY_ACTIVITY_TREE = {
         "у которых вид деятельности является самим «Еда» или любым дочерним/вложенным видом (например, "
         "«Мясная продукция», «Молочная продукция»).\n\n"
         "Параметры (query):\n"
-        "- `activity` — название вида деятельности (точное, строка)\n\n"
+        "- `activity` — название вида деятельности (точное, строка)\n"
+        "- `limit`, `cursor` — курсорная пагинация, как в `GET /orgs`\n\n"
         "Логика:\n"
-        "1) Находим активность по имени\n"
-        "2) Рекурсивно получаем id всех дочерних активностей (включая выбранную)\n"
-        "3) Возвращаем организации, у которых есть хотя бы одна активность из полученного списка\n\n"
+        "1) Находим активность по имени (без учёта регистра)\n"
+        "2) Получаем id всех дочерних активностей (включая выбранную) из индекса дерева в памяти "
+        "(если индекс выключен — из closure-таблицы `activity_closure` или рекурсивным запросом к БД)\n"
+        "3) Возвращаем страницу организаций, у которых есть хотя бы одна активность из полученного списка\n\n"
         "Коды ответов:\n"
         "- 200 — список организаций (может быть пустым)\n"
+        "- 400 — некорректный курсор\n"
         "- 404 — указанный вид деятельности не найден\n"
-        "- 500 — ошибка базы данных\n"
+        "- 500 — ошибка базы данных\n\n"
+        "Кэш: ответ кэшируется в памяти процесса (LRU + TTL) и сбрасывается при изменении данных; "
+        "одинаковые одновременные запросы выполняются в БД один раз (заголовок `X-Cache: HIT/MISS/COALESCED`)\n"
     ),
     "tags": [ORGS_TAG],
     "responses": {
@@ -199,7 +379,10 @@ GET_ALL_ADDRESSES = {
         "- `city` — город/населённый пункт\n"
         "- `street` — улица\n"
         "- `house` — номер дома\n"
-        "- `building` — корпус/строение (может быть null)\n"
+        "- `building` — корпус/строение (может быть null)\n\n"
+        "Потоковый режим: с заголовком `Accept: application/x-ndjson` адреса отдаются построчно в формате NDJSON.\n\n"
+        "Условные запросы: ответ содержит `ETag` и `Last-Modified` (версия таблицы адресов); "
+        "с `If-None-Match`/`If-Modified-Since` при неизменных данных вернёт 304 без тела.\n"
     ),
     "tags": [ADDRESSES_TAG],
     "responses": {
@@ -222,6 +405,9 @@ GET_ALL_ADDRESSES = {
                 }
             },
         },
+        304: {
+            "description": "Данные не изменились (совпал `If-None-Match` или `If-Modified-Since`)",
+        },
         500: {
             "description": "Ошибка базы данных",
             "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
@@ -245,7 +431,11 @@ GET_ADDRESSES_AND_COMPANIES_NEAR = {
         "2) Собираем `address_id` найденных адресов\n"
         "3) Возвращаем все организации, у которых `address_id` входит в найденный список\n"
         "4) Если ничего не найдено — вернёт 200 и пустые списки\n"
-        "5) При ошибке базы данных — вернёт 500\n"
+        "Примечание: при включённом `SPATIAL_INDEX` шаг 1 выполняется по гео-индексу в памяти, "
+        "из БД догружаются только найденные адреса\n"
+        "5) При ошибке базы данных — вернёт 500\n\n"
+        "Кэш: ответ кэшируется в памяти процесса (LRU + TTL) и сбрасывается при изменении данных; "
+        "одинаковые одновременные запросы выполняются в БД один раз (заголовок `X-Cache: HIT/MISS/COALESCED`)\n"
     ),
     "tags": [ADDRESSES_TAG],
     "responses": {
@@ -294,3 +484,202 @@ GET_ADDRESSES_AND_COMPANIES_NEAR = {
         },
     },
 }
+
+GET_ADDRESSES_AND_COMPANIES_NEAR_BATCH = {
+    "summary": "Пакетный поиск адресов и организаций в радиусе от нескольких точек",
+    "description": (
+        "Эндпоинт для массовых гео-запросов: принимает список точек и для каждой возвращает то же, "
+        "что `GET /addresses/near`.\n\n"
+        "Тело запроса:\n"
+        "- `queries` — список точек (до 500), у каждой `lat`, `lon`, `radius_m` (по умолчанию 1000) "
+        "и опционально `limit`\n\n"
+        "Логика:\n"
+        "1) Одним запросом к БД выбираем адреса, попавшие хотя бы в один bbox\n"
+        "2) Расстояния от всех точек до всех кандидатов считаются разом (векторно)\n"
+        "3) Организации по всем найденным адресам получаем одним запросом\n"
+        "4) `results[i]` соответствует `queries[i]`: адреса по возрастанию расстояния и организации по ним\n"
+        "5) При ошибке базы данных — вернёт 500\n"
+    ),
+    "tags": [ADDRESSES_TAG],
+    "responses": {
+        200: {
+            "description": "Результаты по каждой точке успешно получены",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "results": [
+                            {
+                                "addresses": [
+                                    {
+                                        "id": 10,
+                                        "country": "Россия",
+                                        "city": "Москва",
+                                        "street": "Тверская",
+                                        "house": 1,
+                                        "building": None,
+                                        "lat": 55.7558,
+                                        "lon": 37.6173,
+                                    }
+                                ],
+                                "organizations": [
+                                    {
+                                        "id": 1,
+                                        "name": "org_1",
+                                        "address": {
+                                            "id": 10,
+                                            "country": "Россия",
+                                            "city": "Москва",
+                                            "street": "Тверская",
+                                            "house": 1,
+                                            "building": None,
+                                            "lat": 55.7558,
+                                            "lon": 37.6173,
+                                        },
+                                        "phones": ["+7-999-111-22-33"],
+                                        "activities": ["Еда"],
+                                    }
+                                ],
+                            },
+                            {"addresses": [], "organizations": []},
+                        ]
+                    }
+                }
+            },
+        },
+        500: {
+            "description": "Ошибка базы данных",
+            "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
+        },
+    },
+}
+
+GET_NEAREST_ADDRESSES = {
+    "summary": "Получить k ближайших к точке зданий с организациями",
+    "description": (
+        "Эндпоинт для поиска k ближайших зданий (адресов с координатами) без подбора радиуса на клиенте.\n\n"
+        "Параметры (query):\n"
+        "- `lat` — широта точки\n"
+        "- `lon` — долгота точки\n"
+        "- `k` — сколько зданий вернуть (по умолчанию 10, максимум 100)\n"
+        "- `activity` — вид деятельности (опционально, с учётом вложенных видов): учитываются только здания, "
+        "где есть такие организации\n\n"
+        "Логика:\n"
+        "1) Ищем в круге, расширяя радиус, пока в нём не окажется k зданий — они гарантированно ближайшие\n"
+        "2) Для каждого здания возвращаем `distance_m` — расстояние в метрах — и организации в нём "
+        "(при заданном `activity` — только подходящие)\n"
+        "3) Если вид деятельности не найден — вернёт 404\n"
+        "4) При ошибке базы данных — вернёт 500\n"
+    ),
+    "tags": [ADDRESSES_TAG],
+    "responses": {
+        200: {
+            "description": "Ближайшие здания успешно получены",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "results": [
+                            {
+                                "distance_m": 125.4,
+                                "address": {
+                                    "id": 10,
+                                    "country": "Россия",
+                                    "city": "Москва",
+                                    "street": "Тверская",
+                                    "house": 1,
+                                    "building": None,
+                                    "lat": 55.7558,
+                                    "lon": 37.6173,
+                                },
+                                "organizations": [
+                                    {
+                                        "id": 1,
+                                        "name": "org_1",
+                                        "address": {
+                                            "id": 10,
+                                            "country": "Россия",
+                                            "city": "Москва",
+                                            "street": "Тверская",
+                                            "house": 1,
+                                            "building": None,
+                                            "lat": 55.7558,
+                                            "lon": 37.6173,
+                                        },
+                                        "phones": ["+7-999-111-22-33"],
+                                        "activities": ["Аптека"],
+                                    }
+                                ],
+                            }
+                        ]
+                    }
+                }
+            },
+        },
+        404: {
+            "description": "Вид деятельности не найден",
+            "content": {"application/json": {"example": {"detail": "Вид деятельности не найден."}}},
+        },
+        500: {
+            "description": "Ошибка базы данных",
+            "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
+        },
+    },
+}
+
+GET_ADDRESSES_NEAR_GROUPED = {
+    "summary": "Получить здания в радиусе от точки с вложенными организациями",
+    "description": (
+        "То же, что `GET /addresses/near`, но организации вложены в свои здания — склеивать два списка "
+        "на клиенте не нужно.\n\n"
+        "Параметры (query):\n"
+        "- `lat` — широта точки\n"
+        "- `lon` — долгота точки\n"
+        "- `radius_m` — радиус поиска в метрах (по умолчанию 1000)\n"
+        "- `limit`, `offset` — пагинация по зданиям (опционально)\n\n"
+        "Логика:\n"
+        "1) Страница зданий в радиусе по возрастанию расстояния и их организации — одним запросом "
+        "(расстояние считается один раз)\n"
+        "2) Телефоны и виды деятельности найденных организаций — вторым запросом\n"
+        "3) Для каждого здания возвращаем `distance_m` — расстояние в метрах — и список организаций\n"
+        "4) Если ничего не найдено — вернёт 200 и пустой список\n"
+        "5) При ошибке базы данных — вернёт 500\n\n"
+        "Кэш: ответ кэшируется в памяти процесса (LRU + TTL) и сбрасывается при изменении данных; "
+        "одинаковые одновременные запросы выполняются в БД один раз (заголовок `X-Cache: HIT/MISS/COALESCED`)\n"
+    ),
+    "tags": [ADDRESSES_TAG],
+    "responses": {
+        200: {
+            "description": "Здания с организациями успешно получены",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "addresses": [
+                            {
+                                "id": 10,
+                                "country": "Россия",
+                                "city": "Москва",
+                                "street": "Тверская",
+                                "house": 1,
+                                "building": None,
+                                "lat": 55.7558,
+                                "lon": 37.6173,
+                                "distance_m": 125.4,
+                                "organizations": [
+                                    {
+                                        "id": 1,
+                                        "name": "org_1",
+                                        "phones": ["+7-999-111-22-33"],
+                                        "activities": ["Аптека"],
+                                    }
+                                ],
+                            }
+                        ]
+                    }
+                }
+            },
+        },
+        500: {
+            "description": "Ошибка базы данных",
+            "content": {"application/json": {"example": {"detail": "Ошибка базы данных."}}},
+        },
+    },
+}
@@ -0,0 +1,32 @@
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(name: str, org_id: int) -> str:
+    raw = json.dumps([name, org_id], ensure_ascii=False, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, org_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+
+    if not isinstance(name, str) or not isinstance(org_id, int):
+        raise InvalidCursor(cursor)
+    return name, org_id
+
+
+def split_page(orgs: list, limit: int) -> tuple[list, str | None]:
+    # репозиторий просим вернуть limit + 1 строк: лишняя строка означает, что есть следующая страница
+    if len(orgs) <= limit:
+        return orgs, None
+    page = orgs[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.name, last.id)
@@ -0,0 +1,34 @@
+import json
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+from app.infrastructure.core.timing import timed
+
+# Готовый JSON из БД (Postgres, OrganizationRepository(json_rows=True)) склеивается в ответ без Pydantic.
+
+
+@timed("ser")
+def orgs_json_response(rows, next_cursor: str | None) -> Response:
+    body = '{"organizations":[' + ",".join(r.json for r in rows) + '],"next_cursor":' + json.dumps(next_cursor) + "}"
+    return Response(body.encode(), media_type="application/json")
+
+
+@timed("ser")
+def org_json_response(row) -> Response:
+    return Response(('{"organization":' + row.json + "}").encode(), media_type="application/json")
+
+
+# Ответ из словарей мапперов (*_to_dict): одна сериализация orjson, без валидации response_model.
+
+
+@timed("ser")
+def fast_json_response(payload: dict) -> Response:
+    return Response(orjson.dumps(payload), media_type="application/json")
+
+
+@timed("ser")
+def encoded_json_response(content) -> Response:
+    # то же для ответа из Pydantic-схем (кэшируемые эндпоинты собирают тело сами, без response_model)
+    return fast_json_response(jsonable_encoder(content))
@@ -1,23 +1,122 @@
 from fastapi import APIRouter, Request, Depends, HTTPException, Path, Query
+from fastapi.responses import Response
 
-from app.infrastructure.dependencies import get_db
-from .mappers.addresses import addresses_to_out
-from .mappers.organizations import orgs_to_out, org_to_out
+from app.infrastructure.dependencies import get_db, get_read_db
+from .mappers.addresses import addresses_to_out, address_to_out, addresses_to_dicts, address_to_dict, \
+    address_with_orgs_to_dict
+from .mappers.organizations import orgs_to_out, org_to_out, orgs_to_dicts, org_to_dict
 from .openapi import CHECK_ORGS_IN_BUILDING, GET_ALL_ORGS, GET_ALL_ADDRESSES, GET_ORG_BY_ID, \
-    GET_ADDRESSES_AND_COMPANIES_NEAR, GET_ORGS_BY_ACTIVITY_TREE
+    GET_ADDRESSES_AND_COMPANIES_NEAR, GET_ORGS_BY_ACTIVITY_TREE, GET_ADDRESSES_AND_COMPANIES_NEAR_BATCH, \
+    GET_NEAREST_ADDRESSES, GET_ADDRESSES_NEAR_GROUPED, SEARCH_ORGS, GET_ORGS_BATCH, GET_ORGS_BY_ADDRESS_BATCH
+from .ndjson import wants_ndjson, ndjson_response
+from .pagination import InvalidCursor, decode_cursor, split_page
+from .responses import orgs_json_response, org_json_response, fast_json_response, encoded_json_response
+from .server_timing import TimedRoute
 from app.api.schemas import (
     OrgsInBuildingResponse,
     BuildingAddressQuery,
+    PageQuery,
     AddressesResponse,
     AddressesWithOrganizationsResponse,
+    NearBatchRequest,
+    NearBatchResponse,
+    NearestResponse,
+    NearGroupedResponse,
+    OrgsSearchResponse,
+    OrgsBatchRequest,
+    OrgsBatchResponse,
+    OrgsByAddressBatchRequest,
+    OrgsByAddressBatchResponse,
 )
+from app.infrastructure.repos import DIRECTORY_TABLES
 from app.infrastructure.repos.cruds import AddressRepository, OrganizationRepository, ActivityRepository
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 
-orgs_router = APIRouter(prefix="/orgs")
-addresses_router = APIRouter(prefix="/addresses")
+orgs_router = APIRouter(prefix="/orgs", route_class=TimedRoute)
+addresses_router = APIRouter(prefix="/addresses", route_class=TimedRoute)
+
+
+async def _activity_subtree_ids(request: Request, activity_repo: ActivityRepository, name: str) -> list[int]:
+    activity_index = request.app.state.activity_index
+    if activity_index is not None:
+        return await activity_index.get_subtree_ids_by_name(name)
+    return await activity_repo.get_subtree_ids_by_name(name)
+
+
+def _fast_json(request: Request) -> bool:
+    return request.app.state.settings.fast_json
+
+
+def _respond(request: Request, payload: dict):
+    # fast_json: словари уже в форме схемы ответа, FastAPI их не валидирует повторно
+    if _fast_json(request):
+        return fast_json_response(payload)
+    return payload
+
+
+def _orgs_page(request: Request, orgs: list, limit: int):
+    orgs, next_cursor = split_page(orgs, limit)
+    if request.app.state.pg_json:
+        return orgs_json_response(orgs, next_cursor)
+    if _fast_json(request):
+        return fast_json_response({"organizations": orgs_to_dicts(orgs), "next_cursor": next_cursor})
+    return {"organizations": orgs_to_out(orgs), "next_cursor": next_cursor}
+
+
+def _group_by_address(orgs: list, org_out) -> dict[int, list]:
+    orgs_by_address = {}
+    for org in orgs:
+        orgs_by_address.setdefault(org.address_id, []).append(org_out(org))
+    return orgs_by_address
+
+
+def _response_key(request: Request, *params) -> tuple:
+    return (request.url.path, *params, request.app.state.data_version.snapshot(DIRECTORY_TABLES))
+
+
+def _json_body(body: bytes, cache_status: str) -> Response:
+    return Response(body, media_type="application/json", headers={"X-Cache": cache_status})
+
+
+async def _shared_response(request: Request, key: tuple, produce) -> Response:
+    # кэш ответов + single-flight: одинаковые запросы не ходят в БД ни повторно, ни параллельно
+    cache = request.app.state.response_cache
+    if cache is not None and (body := cache.get(key)) is not None:
+        return _json_body(body, "HIT")
+
+    async def produce_body() -> bytes:
+        # своя сессия, а не сессия запроса: лидер может отключиться, и get_read_db закроет его
+        # сессию, пока результат ждут остальные запросы
+        async with request.app.state.read_session_maker() as session:
+            response = await produce(session)
+        if not isinstance(response, Response):
+            response = encoded_json_response(response)
+        if cache is not None:
+            cache.put(key, response.body)
+        return response.body
+
+    flights = request.app.state.single_flight
+    if flights is None:
+        return _json_body(await produce_body(), "MISS")
+
+    body, leader = await flights.do(key, produce_body)
+    return _json_body(body, "MISS" if leader else "COALESCED")
+
+
+def _address_parts(q: BuildingAddressQuery) -> tuple[str, str, str, int, int | None]:
+    # регистр сравнивает БД (lower() в индексе ix_addresses_lookup_ci), пробелы схлопываем здесь
+    return " ".join(q.country.split()), " ".join(q.city.split()), " ".join(q.street.split()), q.house, q.building
+
+
+def _page_after(page: PageQuery) -> tuple[str, int] | None:
+    if page.cursor is None:
+        return None
+    try:
+        return decode_cursor(page.cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Некорректный курсор.")
 
 
 @orgs_router.get(
@@ -27,18 +126,25 @@ addresses_router = APIRouter(prefix="/addresses")
 )
 async def get_all_orgs(
         request: Request,
-        session: AsyncSession = Depends(get_db),
+        page: PageQuery = Depends(),
+        session: AsyncSession = Depends(get_read_db),
 ):
-    org_repo = OrganizationRepository(session)
+    after = _page_after(page)
+
+    if wants_ndjson(request):
+        chunk_size = request.app.state.settings.stream_chunk_size
+        org_repo = OrganizationRepository(session)
+        return ndjson_response(request, org_repo.iter_chunks(chunk_size, after=after), org_to_out)
+
+    org_repo = OrganizationRepository(session, json_rows=request.app.state.pg_json)
 
     try:
-        orgs = await org_repo.list_all()
+        orgs = await org_repo.list_all(limit=page.limit + 1, after=after)
     except SQLAlchemyError as e:
         request.app.state.logger.exception("DB error while fetching organizations", exc_info=e)
         raise HTTPException(status_code=500, detail="Ошибка базы данных.")
 
-    result = orgs_to_out(orgs)
-    return {"organizations": result}
+    return _orgs_page(request, orgs, page.limit)
 
 
 @orgs_router.get(
@@ -49,27 +155,51 @@ async def get_all_orgs(
 async def get_orgs_by_activity_tree(
         request: Request,
         activity: str = Query(..., min_length=1, description="Название вида деятельности (например: Еда)"),
-        session: AsyncSession = Depends(get_db),
+        page: PageQuery = Depends(),
 ):
-    activity_repo = ActivityRepository(session)
-    org_repo = OrganizationRepository(session)
+    activity_name = activity.strip()
+    key = _response_key(request, activity_name, page.limit, page.cursor)
 
-    try:
-        activity_ids = await activity_repo.get_subtree_ids_by_name(activity.strip())
-    except SQLAlchemyError as e:
-        request.app.state.logger.exception("DB error while fetching activity subtree", exc_info=e)
-        raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+    async def produce(session: AsyncSession):
+        after = _page_after(page)
+        activity_index = request.app.state.activity_index
+        use_closure = request.app.state.settings.activity_closure
 
-    if not activity_ids:
-        raise HTTPException(status_code=404, detail="Вид деятельности не найден.")
+        activity_repo = ActivityRepository(session, use_closure=use_closure)
+        org_repo = OrganizationRepository(session, json_rows=request.app.state.pg_json)
 
-    try:
-        orgs = await org_repo.list_by_activities_any(activity_ids)
-    except SQLAlchemyError as e:
-        request.app.state.logger.exception("DB error while fetching organizations by activities", exc_info=e)
-        raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+        if activity_index is None and use_closure:
+            # closure-таблица: организации поддерева одним запросом, существование проверяем только при пустом ответе
+            try:
+                orgs = await org_repo.list_by_activity_tree(activity_name, limit=page.limit + 1, after=after)
+                found = bool(orgs) or await activity_repo.exists_by_name(activity_name)
+            except SQLAlchemyError as e:
+                request.app.state.logger.exception("DB error while fetching organizations by activity tree", exc_info=e)
+                raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+            if not found:
+                raise HTTPException(status_code=404, detail="Вид деятельности не найден.")
+
+            return _orgs_page(request, orgs, page.limit)
 
-    return {"organizations": orgs_to_out(orgs)}
+        try:
+            activity_ids = await _activity_subtree_ids(request, activity_repo, activity_name)
+        except SQLAlchemyError as e:
+            request.app.state.logger.exception("DB error while fetching activity subtree", exc_info=e)
+            raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+        if not activity_ids:
+            raise HTTPException(status_code=404, detail="Вид деятельности не найден.")
+
+        try:
+            orgs = await org_repo.list_by_activities_any(activity_ids, limit=page.limit + 1, after=after)
+        except SQLAlchemyError as e:
+            request.app.state.logger.exception("DB error while fetching organizations by activities", exc_info=e)
+            raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+        return _orgs_page(request, orgs, page.limit)
+
+    return await _shared_response(request, key, produce)
 
 
 @orgs_router.get(
@@ -80,39 +210,137 @@ async def get_orgs_by_activity_tree(
 async def check_orgs_in_building(
         request: Request,
         q: BuildingAddressQuery = Depends(),
-        session: AsyncSession = Depends(get_db),
+        page: PageQuery = Depends(),
 ):
-    country = q.country.strip()
-    city = q.city.strip()
-    street = q.street.strip()
-    house = q.house
-    building = q.building
+    country, city, street, house, building = _address_parts(q)
 
-    address_repo = AddressRepository(session)
+    key = _response_key(request, country, city, street, house, building, page.limit, page.cursor)
+
+    async def produce(session: AsyncSession):
+        after = _page_after(page)
+
+        address_repo = AddressRepository(session)
+        org_repo = OrganizationRepository(session, json_rows=request.app.state.pg_json)
+
+        try:
+            address_id = await address_repo.get_address_id(
+                country=country,
+                city=city,
+                street=street,
+                house=house,
+                building=building,
+            )
+        except SQLAlchemyError as e:
+            request.app.state.logger.exception("DB error while fetching address_id", exc_info=e)
+            raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+        if address_id is None:
+            raise HTTPException(status_code=404, detail="Здание не найдено.")
+
+        try:
+            orgs = await org_repo.list_by_address_id(address_id, limit=page.limit + 1, after=after)
+        except SQLAlchemyError as e:
+            request.app.state.logger.exception("DB error while fetching organizations by address", exc_info=e)
+            raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+        return _orgs_page(request, orgs, page.limit)
+
+    return await _shared_response(request, key, produce)
+
+
+@orgs_router.get(
+    "/search",
+    response_model=OrgsSearchResponse,
+    **SEARCH_ORGS,
+)
+async def search_orgs(
+        request: Request,
+        q: str = Query(..., min_length=1, max_length=100, description="Часть названия организации"),
+        limit: int = Query(20, ge=1, le=100, description="Сколько организаций вернуть"),
+):
+    query = " ".join(q.split())
+    key = _response_key(request, query, limit)
+
+    async def produce(session: AsyncSession):
+        if not query:
+            return {"organizations": []}
+
+        org_repo = OrganizationRepository(session, name_search=request.app.state.name_search)
+
+        try:
+            orgs = await org_repo.search(query, limit=limit)
+        except SQLAlchemyError as e:
+            request.app.state.logger.exception("DB error while searching organizations", exc_info=e)
+            raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+        fast = _fast_json(request)
+        return _respond(request, {"organizations": (orgs_to_dicts if fast else orgs_to_out)(orgs)})
+
+    return await _shared_response(request, key, produce)
+
+
+@orgs_router.post(
+    "/batch",
+    response_model=OrgsBatchResponse,
+    **GET_ORGS_BATCH,
+)
+async def get_orgs_batch(
+        request: Request,
+        body: OrgsBatchRequest,
+        session: AsyncSession = Depends(get_db),
+):
     org_repo = OrganizationRepository(session)
 
     try:
-        address_id = await address_repo.get_address_id(
-            country=country,
-            city=city,
-            street=street,
-            house=house,
-            building=building,
-        )
+        orgs = await org_repo.get_by_ids(body.ids)
     except SQLAlchemyError as e:
-        request.app.state.logger.exception("DB error while fetching address_id", exc_info=e)
+        request.app.state.logger.exception("DB error while fetching organizations by ids (batch)", exc_info=e)
         raise HTTPException(status_code=500, detail="Ошибка базы данных.")
 
-    if address_id is None:
-        raise HTTPException(status_code=404, detail="Здание не найдено.")
+    to_out = org_to_dict if _fast_json(request) else org_to_out
+    by_id = {o.id: to_out(o) for o in orgs}
+
+    return _respond(request, {
+        "results": [
+            {"id": org_id, "found": org_id in by_id, "organization": by_id.get(org_id)}
+            for org_id in body.ids
+        ]
+    })
+
+
+@orgs_router.post(
+    "/address/batch",
+    response_model=OrgsByAddressBatchResponse,
+    **GET_ORGS_BY_ADDRESS_BATCH,
+)
+async def get_orgs_by_address_batch(
+        request: Request,
+        body: OrgsByAddressBatchRequest,
+        session: AsyncSession = Depends(get_db),
+):
+    address_repo = AddressRepository(session)
+    org_repo = OrganizationRepository(session)
 
     try:
-        orgs = await org_repo.list_by_address_id(address_id)
+        address_ids = await address_repo.get_address_ids([_address_parts(q) for q in body.addresses])
+        found_ids = {i for i in address_ids if i is not None}
+        orgs = await org_repo.list_by_addresses_ids(found_ids) if found_ids else []
     except SQLAlchemyError as e:
-        request.app.state.logger.exception("DB error while fetching organizations by address", exc_info=e)
+        request.app.state.logger.exception("DB error while fetching organizations by addresses (batch)", exc_info=e)
         raise HTTPException(status_code=500, detail="Ошибка базы данных.")
 
-    return {"organizations": orgs_to_out(orgs)}
+    orgs_by_address = _group_by_address(orgs, org_to_dict if _fast_json(request) else org_to_out)
+
+    return _respond(request, {
+        "results": [
+            {
+                "address_id": address_id,
+                "found": address_id is not None,
+                "organizations": orgs_by_address.get(address_id, []),
+            }
+            for address_id in address_ids
+        ]
+    })
 
 
 @orgs_router.get(
@@ -122,9 +350,9 @@ async def check_orgs_in_building(
 async def get_org_by_id(
         request: Request,
         org_id: int = Path(..., ge=1, description="Идентификатор организации"),
-        session: AsyncSession = Depends(get_db),
+        session: AsyncSession = Depends(get_read_db),
 ):
-    org_repo = OrganizationRepository(session)
+    org_repo = OrganizationRepository(session, json_rows=request.app.state.pg_json)
 
     try:
         org = await org_repo.get_by_id(org_id)
@@ -135,6 +363,10 @@ async def get_org_by_id(
     if org is None:
         raise HTTPException(status_code=404, detail="Организация не найдена.")
 
+    if request.app.state.pg_json:
+        return org_json_response(org)
+    if _fast_json(request):
+        return fast_json_response({"organization": org_to_dict(org)})
     return {"organization": org_to_out(org)}
 
 
@@ -145,16 +377,24 @@ async def get_org_by_id(
 )
 async def get_all_addresses(
         request: Request,
-        session: AsyncSession = Depends(get_db),
+        session: AsyncSession = Depends(get_read_db),
 ):
     address_repo = AddressRepository(session)
 
+    if wants_ndjson(request):
+        chunk_size = request.app.state.settings.stream_chunk_size
+        return ndjson_response(request, address_repo.iter_all(chunk_size), address_to_out)
+
     try:
         addresses = await address_repo.list_all()
     except SQLAlchemyError as e:
         request.app.state.logger.exception("DB error while fetching addresses", exc_info=e)
         raise HTTPException(status_code=500, detail="Ошибка базы данных.")
 
+    if _fast_json(request):
+        request.app.state.logger.debug("Result: %d addresses", len(addresses))
+        return fast_json_response({"addresses": addresses_to_dicts(addresses)})
+
     result = addresses_to_out(addresses)
     request.app.state.logger.debug(f"Result: {result}")
     return {"addresses": result}
@@ -172,20 +412,188 @@ async def get_addresses_near(
         radius_m: int = Query(1000, gt=0, le=100_0000, description="Радиус поиска в метрах"),
         limit: int | None = Query(None, gt=0, le=1000),
         offset: int | None = Query(None, ge=0),
+):
+    key = _response_key(request, lat, lon, radius_m, limit, offset)
+
+    async def produce(session: AsyncSession):
+        use_rtree = "addresses_rtree" in request.app.state.sqlite_virtual_tables
+        address_repo = AddressRepository(session, use_rtree=use_rtree)
+        org_repo = OrganizationRepository(session)
+
+        spatial_index = request.app.state.spatial_index
+
+        try:
+            if spatial_index is not None:
+                address_ids, _ = await spatial_index.query(lat, lon, radius_m, limit=limit, offset=offset)
+                addresses = await address_repo.get_by_ids(address_ids)
+            else:
+                addresses = await address_repo.list_within_radius(lat, lon, radius_m, limit=limit, offset=offset)
+            address_ids = [a.id for a in addresses]
+            orgs = await org_repo.list_by_addresses_ids(address_ids)
+        except SQLAlchemyError as e:
+            request.app.state.logger.exception("DB error while fetching addresses/orgs near point", exc_info=e)
+            raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+        fast = _fast_json(request)
+        return _respond(request, {
+            "addresses": (addresses_to_dicts if fast else addresses_to_out)(addresses),
+            "organizations": (orgs_to_dicts if fast else orgs_to_out)(orgs),
+        })
+
+    return await _shared_response(request, key, produce)
+
+
+@addresses_router.get(
+    "/near/grouped",
+    response_model=NearGroupedResponse,
+    **GET_ADDRESSES_NEAR_GROUPED,
+)
+async def get_addresses_near_grouped(
+        request: Request,
+        lat: float = Query(..., ge=-90, le=90, description="Широта точки"),
+        lon: float = Query(..., ge=-180, le=180, description="Долгота точки"),
+        radius_m: int = Query(1000, gt=0, le=1_000_000, description="Радиус поиска в метрах"),
+        limit: int | None = Query(None, gt=0, le=1000, description="Сколько зданий вернуть"),
+        offset: int | None = Query(None, ge=0),
+):
+    key = _response_key(request, lat, lon, radius_m, limit, offset)
+
+    async def produce(session: AsyncSession):
+        use_rtree = "addresses_rtree" in request.app.state.sqlite_virtual_tables
+        address_repo = AddressRepository(session, use_rtree=use_rtree)
+        org_repo = OrganizationRepository(session)
+
+        spatial_index = request.app.state.spatial_index
+
+        try:
+            if spatial_index is not None:
+                address_ids, _ = await spatial_index.query(lat, lon, radius_m, limit=limit, offset=offset)
+                grouped = await address_repo.list_within_radius_with_orgs(lat, lon, radius_m, ids=address_ids)
+            else:
+                grouped = await address_repo.list_within_radius_with_orgs(
+                    lat, lon, radius_m, limit=limit, offset=offset,
+                )
+            details = await org_repo.get_phones_and_activities(
+                org_id for _, _, orgs in grouped for org_id, _ in orgs
+            )
+        except SQLAlchemyError as e:
+            request.app.state.logger.exception("DB error while fetching grouped addresses/orgs near point", exc_info=e)
+            raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+        return _respond(request, {
+            "addresses": [
+                address_with_orgs_to_dict(address, distance_m, orgs, details)
+                for address, distance_m, orgs in grouped
+            ],
+        })
+
+    return await _shared_response(request, key, produce)
+
+
+@addresses_router.post(
+    "/near/batch",
+    response_model=NearBatchResponse,
+    **GET_ADDRESSES_AND_COMPANIES_NEAR_BATCH,
+)
+async def get_addresses_near_batch(
+        request: Request,
+        body: NearBatchRequest,
         session: AsyncSession = Depends(get_db),
 ):
-    address_repo = AddressRepository(session)
+    use_rtree = "addresses_rtree" in request.app.state.sqlite_virtual_tables
+    address_repo = AddressRepository(session, use_rtree=use_rtree)
     org_repo = OrganizationRepository(session)
 
+    points = [(q.lat, q.lon, q.radius_m, q.limit) for q in body.queries]
+    spatial_index = request.app.state.spatial_index
+
     try:
-        addresses = await address_repo.list_within_radius(lat, lon, radius_m, limit=limit, offset=offset)
-        address_ids = [a.id for a in addresses]
+        if spatial_index is not None:
+            ids_per_point = await spatial_index.query_many(points)
+            by_id = {a.id: a for a in await address_repo.get_by_ids({i for ids in ids_per_point for i in ids})}
+            addresses_per_point = [[by_id[i] for i in ids if i in by_id] for ids in ids_per_point]
+        else:
+            addresses_per_point = await address_repo.list_within_radius_many(points)
+        address_ids = {a.id for addresses in addresses_per_point for a in addresses}
         orgs = await org_repo.list_by_addresses_ids(address_ids)
     except SQLAlchemyError as e:
-        request.app.state.logger.exception("DB error while fetching addresses/orgs near point", exc_info=e)
+        request.app.state.logger.exception("DB error while fetching addresses/orgs near points (batch)", exc_info=e)
+        raise HTTPException(status_code=500, detail="Ошибка базы данных.")
+
+    fast = _fast_json(request)
+    to_addresses = addresses_to_dicts if fast else addresses_to_out
+    orgs_by_address = _group_by_address(orgs, org_to_dict if fast else org_to_out)
+
+    return _respond(request, {
+        "results": [
+            {
+                "addresses": to_addresses(addresses),
+                "organizations": [org for a in addresses for org in orgs_by_address.get(a.id, ())],
+            }
+            for addresses in addresses_per_point
+        ]
+    })
+
+
+@addresses_router.get(
+    "/nearest",
+    response_model=NearestResponse,
+    **GET_NEAREST_ADDRESSES,
+)
+async def get_nearest_addresses(
+        request: Request,
+        lat: float = Query(..., ge=-90, le=90, description="Широта точки"),
+        lon: float = Query(..., ge=-180, le=180, description="Долгота точки"),
+        k: int = Query(10, ge=1, le=100, description="Сколько ближайших зданий вернуть"),
+        activity: str | None = Query(None, min_length=1, description="Вид деятельности (с учётом вложенных)"),
+        session: AsyncSession = Depends(get_read_db),
+):
+    use_rtree = "addresses_rtree" in request.app.state.sqlite_virtual_tables
+    address_repo = AddressRepository(session, use_rtree=use_rtree)
+    org_repo = OrganizationRepository(session)
+    activity_repo = ActivityRepository(session, use_closure=request.app.state.settings.activity_closure)
+
+    spatial_index = request.app.state.spatial_index
+
+    try:
+        activity_ids = None
+        if activity is not None:
+            activity_ids = await _activity_subtree_ids(request, activity_repo, activity.strip())
+            if not activity_ids:
+                raise HTTPException(status_code=404, detail="Вид деятельности не найден.")
+
+        if spatial_index is not None:
+            allowed = None
+            if activity_ids is not None:
+                allowed = await org_repo.list_address_ids_by_activities(activity_ids)
+            address_ids, distances = await spatial_index.nearest(lat, lon, k, allowed_ids=allowed)
+            by_id = {a.id: a for a in await address_repo.get_by_ids(address_ids)}
+            if len(by_id) == len(address_ids):
+                nearest = [(by_id[i], distance_m) for i, distance_m in zip(address_ids, distances)]
+            else:
+                # индекс отстал от БД (адрес удалён до очередного опроса data_versions / TTL):
+                # ответ берём из SQL, индекс перечитаем на следующем запросе
+                spatial_index.invalidate()
+                nearest = await address_repo.list_nearest(lat, lon, k, activity_ids=activity_ids)
+        else:
+            nearest = await address_repo.list_nearest(lat, lon, k, activity_ids=activity_ids)
+
+        orgs = await org_repo.list(address_ids=[a.id for a, _ in nearest], activity_ids=activity_ids)
+    except SQLAlchemyError as e:
+        request.app.state.logger.exception("DB error while fetching nearest addresses", exc_info=e)
         raise HTTPException(status_code=500, detail="Ошибка базы данных.")
 
-    return {
-        "addresses": addresses_to_out(addresses),
-        "organizations": orgs_to_out(orgs),
-    }
+    fast = _fast_json(request)
+    to_address = address_to_dict if fast else address_to_out
+    orgs_by_address = _group_by_address(orgs, org_to_dict if fast else org_to_out)
+
+    return _respond(request, {
+        "results": [
+            {
+                "distance_m": round(distance_m, 1),
+                "address": to_address(address),
+                "organizations": orgs_by_address.get(address.id, []),
+            }
+            for address, distance_m in nearest
+        ]
+    })
@@ -11,6 +11,40 @@ class BuildingAddressQuery(BaseModel):
     building: int | None = Field(None, ge=1, examples=[2])
 
 
+class PageQuery(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    limit: int = Field(100, ge=1, le=1000, description="Размер страницы")
+    cursor: str | None = Field(None, min_length=1, description="Курсор из `next_cursor` предыдущей страницы")
+
+
+class NearQuery(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    lat: float = Field(..., ge=-90, le=90, examples=[55.757])
+    lon: float = Field(..., ge=-180, le=180, examples=[37.615])
+    radius_m: int = Field(1000, gt=0, le=1_000_000, examples=[1000])
+    limit: int | None = Field(None, gt=0, le=1000)
+
+
+class NearBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    queries: list[NearQuery] = Field(..., min_length=1, max_length=500)
+
+
+class OrgsBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    ids: list[int] = Field(..., min_length=1, max_length=1000, examples=[[1, 2, 3]])
+
+
+class OrgsByAddressBatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    addresses: list[BuildingAddressQuery] = Field(..., min_length=1, max_length=500)
+
+
 class AddressOut(BaseModel):
     id: int
     country: str
@@ -35,6 +69,31 @@ class OrganizationOut(BaseModel):
 
 class OrgsInBuildingResponse(BaseModel):
     organizations: list[OrganizationOut]
+    next_cursor: str | None = None
+
+
+class OrgsSearchResponse(BaseModel):
+    organizations: list[OrganizationOut]
+
+
+class OrgBatchItemOut(BaseModel):
+    id: int
+    found: bool
+    organization: OrganizationOut | None = None
+
+
+class OrgsBatchResponse(BaseModel):
+    results: list[OrgBatchItemOut]
+
+
+class OrgsByAddressBatchItemOut(BaseModel):
+    address_id: int | None = None
+    found: bool
+    organizations: list[OrganizationOut]
+
+
+class OrgsByAddressBatchResponse(BaseModel):
+    results: list[OrgsByAddressBatchItemOut]
 
 
 class AddressesResponse(BaseModel):
@@ -44,3 +103,33 @@ class AddressesResponse(BaseModel):
 class AddressesWithOrganizationsResponse(BaseModel):
     addresses: list[AddressOut]
     organizations: list[OrganizationOut]
+
+
+class AddressOrganizationOut(BaseModel):
+    id: int
+    name: str
+    phones: list[str]
+    activities: list[str]
+
+
+class AddressWithOrganizationsOut(AddressOut):
+    distance_m: float
+    organizations: list[AddressOrganizationOut]
+
+
+class NearGroupedResponse(BaseModel):
+    addresses: list[AddressWithOrganizationsOut]
+
+
+class NearestAddressOut(BaseModel):
+    distance_m: float
+    address: AddressOut
+    organizations: list[OrganizationOut]
+
+
+class NearestResponse(BaseModel):
+    results: list[NearestAddressOut]
+
+
+class NearBatchResponse(BaseModel):
+    results: list[AddressesWithOrganizationsResponse]
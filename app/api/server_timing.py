@@ -0,0 +1,65 @@
+from functools import wraps
+from time import perf_counter
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.infrastructure.core.timing import current, end_request, start_request
+
+
+class TimedRoute(APIRoute):
+    # Отмечает момент, когда эндпоинт вернул результат: всё до начала ответа —
+    # валидация response_model и кодирование JSON, т.е. сериализация.
+    def __init__(self, path: str, endpoint, **kwargs) -> None:
+        @wraps(endpoint)
+        async def timed_endpoint(*args, **kw):
+            try:
+                return await endpoint(*args, **kw)
+            finally:
+                timing = current()
+                if timing is not None:
+                    timing.endpoint_done = perf_counter()
+
+        super().__init__(path, timed_endpoint, **kwargs)
+
+
+class ServerTimingMiddleware:
+    # Заголовок Server-Timing (pool / db / map / ser / app / total) и строка в лог для медленных запросов.
+    # У потоковых ответов (NDJSON) заголовок уходит до тела, поэтому в нём только время до первого байта;
+    # в лог попадает полное время.
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing, token = start_request()
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                now = perf_counter()
+                if timing.endpoint_done is not None:
+                    timing.ser_s += now - timing.endpoint_done
+                    timing.endpoint_done = None
+                MutableHeaders(scope=message).append("Server-Timing", timing.header(now - timing.started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            total_ms = (perf_counter() - timing.started) * 1000
+            state = scope["app"].state
+            if total_ms >= state.settings.slow_request_ms:
+                state.logger.warning(
+                    "Slow request method=%s path=%s status=%d total_ms=%.1f pool_ms=%.1f db_ms=%.1f queries=%d "
+                    "map_ms=%.1f ser_ms=%.1f",
+                    scope["method"], scope["path"], status, total_ms, timing.pool_s * 1000, timing.db_s * 1000,
+                    timing.queries, timing.map_s * 1000, timing.ser_s * 1000,
+                )
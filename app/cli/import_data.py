@@ -0,0 +1,147 @@
+"""Потоковый импорт справочника из CSV/NDJSON.
+
+    python -m app.cli.import_data activities data/activities.csv
+    python -m app.cli.import_data organizations data/orgs.ndjson --chunk-size 20000
+
+Колонки (ключи NDJSON):
+    activities     name, parent
+    addresses      country, city, street, house, building, lat, lon
+    organizations  name, country, city, street, house, building, lat, lon, phones, activities
+
+В CSV phones и activities перечисляются через ";", в NDJSON это массивы строк.
+Виды деятельности указываются по имени и должны быть импортированы заранее.
+
+Каждая пачка коммитится отдельной транзакцией, а не весь файл одной: иначе после сбоя
+продолжать было бы нечего. Номер последней загруженной записи пишется в <file>.checkpoint,
+повторный запуск продолжает с неё; повтор уже загруженной пачки ничего не дублирует.
+На SQLite версии data_versions двигаются один раз в конце импорта (прерванный импорт
+сдвинет их при повторном запуске).
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator
+
+import orjson
+
+from app.infrastructure.core.config import Settings
+from app.infrastructure.core.logging import setup_logging
+from app.infrastructure.repos import async_engine
+from app.infrastructure.repos.bulk_import import KINDS, BulkImporter, ImportStats
+from app.infrastructure.repos.utils import build_db_url, build_engine_options
+
+
+def read_records(path: Path, fmt: str) -> Iterator[dict[str, Any]]:
+    with path.open("r", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield orjson.loads(line)
+
+
+def load_checkpoint(path: Path, source: Path, kind: str) -> int:
+    if not path.exists():
+        return 0
+    state = json.loads(path.read_text(encoding="utf-8"))
+    if state.get("source") != str(source) or state.get("kind") != kind:
+        raise RuntimeError(
+            f"Checkpoint {path} belongs to another import ({state.get('kind')} {state.get('source')}); "
+            "remove it or pass --restart."
+        )
+    return int(state["records"])
+
+
+def save_checkpoint(path: Path, source: Path, kind: str, records: int) -> None:
+    # пишем во временный файл и подменяем, чтобы сбой посреди записи не испортил чекпоинт
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"source": str(source), "kind": kind, "records": records}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+async def run(args: argparse.Namespace) -> ImportStats:
+    settings = Settings()
+    log = setup_logging(settings.log_level)
+
+    source = args.file.resolve()
+    fmt = args.format or ("csv" if source.suffix.lower() == ".csv" else "ndjson")
+    checkpoint = args.checkpoint or source.with_name(source.name + ".checkpoint")
+    if args.restart:
+        checkpoint.unlink(missing_ok=True)
+    done = load_checkpoint(checkpoint, source, args.kind)
+
+    records = enumerate(read_records(source, fmt), start=1)
+    if done:
+        log.info("Resuming %s import from record %d", args.kind, done + 1)
+        # пропуск уже загруженного: только разбор файла, без обращений к БД
+        for _ in islice(records, done):
+            pass
+
+    total = ImportStats()
+    db_url = build_db_url(settings)
+    engine = async_engine(db_url, **build_engine_options(settings, db_url))
+    try:
+        async with engine.connect() as conn:
+            importer = BulkImporter(conn, log)
+            await importer.prepare()
+
+            started = time.perf_counter()
+            while chunk := list(islice(records, args.chunk_size)):
+                chunk_started = time.perf_counter()
+                async with conn.begin():
+                    stats = await importer.import_chunk(args.kind, chunk)
+                save_checkpoint(checkpoint, source, args.kind, importer.checkpoint(chunk[-1][0]))
+                total.add(stats)
+
+                now = time.perf_counter()
+                log.info(
+                    "Records %d-%d: %.0f rec/s (avg %.0f rec/s), %s",
+                    chunk[0][0], chunk[-1][0],
+                    stats.records / max(now - chunk_started, 1e-9),
+                    total.records / max(now - started, 1e-9),
+                    ", ".join(f"{k}={v}" for k, v in stats.as_dict().items() if k != "records"),
+                )
+
+            async with conn.begin():
+                total.add(await importer.finish(args.kind))
+    finally:
+        await engine.dispose()
+
+    checkpoint.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - started
+    log.info(
+        "Import finished in %.1fs (%.0f rec/s): %s",
+        elapsed, total.records / max(elapsed, 1e-9), total.as_dict(),
+    )
+    return total
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli.import_data",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="default: by file extension")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--checkpoint", type=Path, help="default: <file>.checkpoint")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start over")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1 @@
 from .config import settings
-from .lifespan import lifespan
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Optional
+from typing import Literal, Optional
 from pathlib import Path
 
 from pydantic import Field, SecretStr
@@ -23,6 +23,31 @@ class Settings(BaseSettings):
     log_level: str = "DEBUG"
     db_logs: bool = False
 
+    stream_chunk_size: int = 500
+    pg_json_responses: bool = True
+    fast_json: bool = True
+    activity_index: bool = True
+    activity_closure: bool = True
+
+    spatial_index: bool = False
+    spatial_index_cell_deg: float = 0.05
+    spatial_index_ttl_s: float = 60.0
+
+    data_version_poll_s: float = 1.0
+    conditional_get: bool = True
+    response_cache: bool = True
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    response_cache_max_entries: int = 10_000
+    response_cache_ttl_s: float = 30.0
+    single_flight: bool = True
+    server_timing: bool = True
+    slow_request_ms: float = 500.0
+    metrics: bool = True
+    slow_query_log: bool = True
+    slow_query_ms: float = 200.0
+    slow_query_log_size: int = 100
+    slow_query_explain: bool = False
+
     debug: bool = False
     test_db: bool = False
 
@@ -40,6 +65,27 @@ class Settings(BaseSettings):
     )
     db_url: Optional[str] = Field(default=None, env="DB_URL")
 
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_s: float = 30.0
+    # -1 — не пересоздавать соединения по возрасту
+    db_pool_recycle_s: int = -1
+    # проверка соединения (лишний round trip) при каждой выдаче из пула;
+    # без неё оборванное соединение обнаружится ошибкой первого запроса
+    db_pool_pre_ping: bool = True
+    db_prepared_statement_cache_size: int = 100
+    # параметры сессии Postgres для asyncpg, например {"jit": "off", "statement_timeout": "5000"}
+    db_pg_server_settings: dict[str, str] = Field(default_factory=dict)
+
+    # реплики для чтения (GET-эндпоинты): готовые URL, либо файлы SQLite / host:port Postgres
+    db_replica_urls: list[str] = Field(default_factory=list)
+    db_replica_files: list[str] = Field(default_factory=list)
+    db_replica_hosts: list[str] = Field(default_factory=list)
+    db_replica_strategy: Literal["round_robin", "least_conn"] = "round_robin"
+    db_replica_check_s: float = 5.0
+    # после изменения данных на primary столько секунд читаем только с него (0 — выкл.)
+    db_replica_stickiness_s: float = 0.0
+
     model_config = SettingsConfigDict(
         env_file=str(ENV_PATH),
         extra="ignore",
@@ -1,12 +1,30 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from .config import Settings
 from .logging import setup_logging
-from app.infrastructure.repos.utils import build_db_url
-from app.infrastructure.repos import async_session, async_engine
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+from . import timing
+from .metrics import POOL_CONNECTIONS, REPLICA_UP
+from .slow_queries import SlowQueryLog
+from app.infrastructure.repos.utils import build_db_url, build_engine_options, build_replica_urls
+from app.infrastructure.repos import (
+    async_session,
+    async_engine,
+    sqlite_virtual_tables,
+    pg_extensions,
+    pool_stats,
+    read_only_engine,
+    ActivityTreeIndex,
+    AddressSpatialIndex,
+    DataVersion,
+    ReplicaSet,
+)
 
 
 @asynccontextmanager
@@ -19,17 +37,54 @@ async def lifespan(app: FastAPI):
     log = app.state.logger
 
     log.info("Creating SQLAlchemy engine...")
+    engine_options = build_engine_options(settings, settings.db_url)
     try:
-        aengine = async_engine(settings.db_url)
+        aengine = async_engine(settings.db_url, **engine_options)
+        # GET-запросы: транзакции только для чтения (для SQLite — отдельный пул к тому же файлу)
+        read_engine = read_only_engine(aengine, **engine_options)
     except Exception:
         log.exception("Failed to create SQLAlchemy engine")
         raise
     else:
-        log.info("SQLAlchemy engine created")
+        log.info(
+            "SQLAlchemy engine created (pool=%s size=%d max_overflow=%d timeout_s=%.1f recycle_s=%d pre_ping=%s)",
+            type(aengine.pool).__name__, settings.db_pool_size, settings.db_max_overflow,
+            settings.db_pool_timeout_s, settings.db_pool_recycle_s, settings.db_pool_pre_ping,
+        )
+
+    # пулы для db_pool_connections: (engine, role, движок); общий пул учитывается один раз
+    pools = [("primary", "read_write", aengine)]
+    if read_engine.sync_engine.pool is not aengine.sync_engine.pool:
+        pools.append(("primary", "read_only", read_engine))
+    if settings.metrics:
+        POOL_CONNECTIONS.collect = lambda: [
+            stat for name, role, engine in pools for stat in pool_stats(engine, name, role)
+        ]
+
+    app.state.slow_queries = None
+    if settings.slow_query_log:
+        app.state.slow_queries = SlowQueryLog(
+            threshold_ms=settings.slow_query_ms,
+            size=settings.slow_query_log_size,
+            explain=settings.slow_query_explain,
+            log=log,
+        )
+
+    def instrument(engine: AsyncEngine) -> None:
+        if settings.server_timing:
+            timing.instrument(engine.sync_engine)
+        if app.state.slow_queries is not None:
+            app.state.slow_queries.instrument(engine.sync_engine)
+
+    instrument(aengine)
+    # на Postgres read_engine — тот же движок с опциями, события primary срабатывают и для него
+    if read_engine.sync_engine.pool is not aengine.sync_engine.pool:
+        instrument(read_engine)
 
     log.info("Creating SQLAlchemy session maker...")
     try:
         app.state.session_maker = async_session(aengine)
+        app.state.read_session_maker = async_session(read_engine)
     except Exception:
         log.exception("Failed to create session maker")
         raise
@@ -40,8 +95,121 @@ async def lifespan(app: FastAPI):
         await conn.execute(text("SELECT 1"))
     log.info("DB ping OK")
 
+    app.state.pg_json = settings.pg_json_responses and aengine.dialect.name == "postgresql"
+
+    app.state.sqlite_virtual_tables = await sqlite_virtual_tables(aengine)
+    if app.state.sqlite_virtual_tables:
+        log.info("SQLite virtual tables: %s", ", ".join(sorted(app.state.sqlite_virtual_tables)))
+
+    app.state.name_search = None
+    if "pg_trgm" in await pg_extensions(aengine):
+        app.state.name_search = "pg_trgm"
+    elif "organizations_fts" in app.state.sqlite_virtual_tables:
+        app.state.name_search = "fts5"
+    if app.state.name_search is None:
+        log.warning("No name search index (pg_trgm / organizations_fts), /orgs/search falls back to LIKE")
+
+    log.info("Loading data versions...")
+    data_version = DataVersion(app.state.session_maker, poll_s=settings.data_version_poll_s)
+    try:
+        await data_version.refresh()
+    except Exception:
+        log.exception("Failed to load data versions")
+        raise
+    else:
+        app.state.data_version = data_version
+        log.info("Data versions loaded")
+
+    app.state.response_cache = None
+    if settings.response_cache:
+        app.state.response_cache = ResponseCache(
+            max_bytes=settings.response_cache_max_bytes,
+            max_entries=settings.response_cache_max_entries,
+            ttl_s=settings.response_cache_ttl_s,
+        )
+    app.state.single_flight = SingleFlight() if settings.single_flight else None
+
+    app.state.activity_index = None
+    if settings.activity_index:
+        log.info("Loading activity tree index...")
+        activity_index = ActivityTreeIndex(app.state.session_maker)
+        try:
+            await activity_index.reload()
+        except Exception:
+            log.exception("Failed to load activity tree index")
+            raise
+        else:
+            app.state.activity_index = activity_index
+            log.info("Activity tree index loaded")
+
+    app.state.spatial_index = None
+    if settings.spatial_index:
+        log.info("Loading address spatial index...")
+        spatial_index = AddressSpatialIndex(
+            app.state.session_maker,
+            cell_deg=settings.spatial_index_cell_deg,
+            ttl_s=settings.spatial_index_ttl_s,
+        )
+        try:
+            await spatial_index.reload()
+        except Exception:
+            log.exception("Failed to load address spatial index")
+            raise
+        else:
+            app.state.spatial_index = spatial_index
+            log.info("Address spatial index loaded (%d addresses)", len(spatial_index.ids))
+
+    def on_data_change(changed: set[str]) -> None:
+        if app.state.response_cache is not None:
+            app.state.response_cache.clear()
+        if app.state.activity_index is not None and "activities" in changed:
+            app.state.activity_index.invalidate()
+        if app.state.spatial_index is not None and "addresses" in changed:
+            app.state.spatial_index.invalidate()
+
+    data_version.on_change(on_data_change)
+    data_version_poller = asyncio.create_task(data_version.run(log))
+
+    app.state.replicas = None
+    replica_checker = None
+    replica_urls = build_replica_urls(settings)
+    if replica_urls:
+        log.info("Creating read replica engines...")
+        replicas = ReplicaSet(
+            read_engine,
+            data_version,
+            strategy=settings.db_replica_strategy,
+            check_s=settings.db_replica_check_s,
+            stickiness_s=settings.db_replica_stickiness_s,
+        )
+        for url in replica_urls:
+            rengine = async_engine(url, read_only=True, **build_engine_options(settings, url))
+            if rengine.dialect.name != aengine.dialect.name:
+                await rengine.dispose()
+                raise RuntimeError(f"Read replica dialect {rengine.dialect.name!r} differs from the primary")
+            instrument(rengine)
+            replica = replicas.add(url, rengine)
+            pools.append((replica.name, "replica", rengine))
+        await replicas.check(log)
+        app.state.replicas = replicas
+        app.state.read_session_maker = replicas.session_maker()
+        data_version.on_change(replicas.on_data_change)
+        if settings.metrics:
+            REPLICA_UP.collect = replicas.health
+        replica_checker = asyncio.create_task(replicas.run(log))
+        log.info(
+            "Read replicas: %d (%d healthy), strategy=%s",
+            len(replicas.replicas), sum(r.healthy for r in replicas.replicas), settings.db_replica_strategy,
+        )
+
     try:
         yield
     finally:
+        data_version_poller.cancel()
+        if replica_checker is not None:
+            replica_checker.cancel()
+            await app.state.replicas.dispose()
+        if read_engine.sync_engine.pool is not aengine.sync_engine.pool:
+            await read_engine.dispose()
         await aengine.dispose()
 
@@ -0,0 +1,164 @@
+import inspect
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Iterable
+
+# Минимальные метрики в текстовом формате Prometheus (exposition format 0.0.4), без
+# prometheus_client и внешних сервисов: всё живёт в памяти процесса и отдаётся с /metrics.
+# Обновления идут из одного потока (event loop), поэтому без блокировок.
+
+Labels = tuple[str, ...]
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Labels, values: Labels, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+@dataclass(slots=True)
+class Counter:
+    name: str
+    help: str
+    label_names: Labels = ()
+    values: dict[Labels, float] = field(default_factory=dict)
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_num(value)}"
+
+
+@dataclass(slots=True)
+class Gauge:
+    name: str
+    help: str
+    label_names: Labels = ()
+    values: dict[Labels, float] = field(default_factory=dict)
+    # значения, которые дешевле снять в момент опроса (например, статистика пула)
+    collect: Callable[[], Iterable[tuple[Labels, float]]] | None = None
+
+    def inc(self, *labels: str, value: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def dec(self, *labels: str, value: float = 1.0) -> None:
+        self.inc(*labels, value=-value)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        values = dict(self.values)
+        if self.collect is not None:
+            values.update(self.collect())
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {_num(value)}"
+
+
+@dataclass(slots=True)
+class Histogram:
+    name: str
+    help: str
+    label_names: Labels = ()
+    buckets: tuple[float, ...] = HTTP_BUCKETS
+    # labels -> [счётчики по корзинам (последняя — +Inf, не накопительные), сумма]
+    series: dict[Labels, list] = field(default_factory=dict)
+
+    def observe(self, value: float, *labels: str) -> None:
+        s = self.series.get(labels)
+        if s is None:
+            s = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        s[0][bisect_left(self.buckets, value)] += 1
+        s[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_num(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {_num(total)}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+@dataclass(slots=True)
+class Registry:
+    metrics: list = field(default_factory=list)
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status"),
+))
+HTTP_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"),
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+))
+REPOSITORY_DURATION = REGISTRY.register(Histogram(
+    "db_repository_duration_seconds", "Latency of repository methods (queries plus ORM loading).",
+    ("repository", "method"), DB_BUCKETS,
+))
+POOL_WAIT = REGISTRY.register(Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled DB connection.", (), DB_BUCKETS,
+))
+POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "db_pool_connections", "SQLAlchemy pool connections by engine, role and state.", ("engine", "role", "state"),
+))
+READ_SESSIONS = REGISTRY.register(Counter(
+    "db_read_sessions_total", "Read-only sessions by target (replica or primary).", ("target",),
+))
+REPLICA_UP = REGISTRY.register(Gauge(
+    "db_replica_up", "1 if the read replica is healthy and caught up with the primary.", ("replica",),
+))
+
+
+def observe_repository(cls):
+    # Класс-декоратор для репозиториев: гистограмма по каждому публичному async-методу.
+    # Асинхронные генераторы (потоковые выгрузки) не оборачиваем — их время растянуто на весь ответ.
+    for name, fn in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(fn):
+            continue
+        setattr(cls, name, _observed(fn, cls.__name__, name))
+    return cls
+
+
+def _observed(fn, repository: str, method: str):
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            REPOSITORY_DURATION.observe(perf_counter() - started, repository, method)
+
+    return wrapper
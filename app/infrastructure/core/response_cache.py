@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Hashable
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    skipped_too_large: int = 0
+
+
+@dataclass(slots=True)
+class ResponseCache:
+    # Готовые тела ответов (bytes). LRU с ограничением по числу записей и по суммарному размеру,
+    # плюс TTL. Версия данных входит в ключ, поэтому после записи в БД старые ответы не находятся.
+    max_bytes: int = 64 * 1024 * 1024
+    max_entries: int = 10_000
+    ttl_s: float = 30.0
+
+    stats: CacheStats = field(default_factory=CacheStats)
+    size_bytes: int = 0
+    _entries: OrderedDict = field(default_factory=OrderedDict)
+
+    def get(self, key: Hashable) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        body, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return body
+
+    def put(self, key: Hashable, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            self.stats.skipped_too_large += 1
+            return
+
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (body, time.monotonic() + self.ttl_s)
+        self.size_bytes += len(body)
+        self.stats.stores += 1
+
+        while self.size_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        body, _ = self._entries.pop(key)
+        self.size_bytes -= len(body)
+
+    def snapshot(self) -> dict:
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_s": self.ttl_s,
+            "hit_ratio": round(self.stats.hits / lookups, 4) if lookups else None,
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "stores": self.stats.stores,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "invalidations": self.stats.invalidations,
+            "skipped_too_large": self.stats.skipped_too_large,
+        }
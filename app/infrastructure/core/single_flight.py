@@ -0,0 +1,44 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class SingleFlightStats:
+    leaders: int = 0
+    merged: int = 0
+
+
+@dataclass(slots=True)
+class SingleFlight:
+    # Одинаковые одновременные запросы ждут одну задачу: первый (leader) выполняет fn,
+    # остальные получают тот же результат или то же исключение.
+    stats: SingleFlightStats = field(default_factory=SingleFlightStats)
+    _calls: dict[Hashable, asyncio.Task] = field(default_factory=dict)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        task = self._calls.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.stats.leaders += 1
+        else:
+            self.stats.merged += 1
+
+        # shield: отмена одного ожидающего не должна отменять запрос для остальных
+        return await asyncio.shield(task), leader
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.stats.leaders,
+            "merged": self.stats.merged,
+        }
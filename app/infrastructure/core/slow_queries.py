@@ -0,0 +1,147 @@
+import logging
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Журнал медленных SQL-запросов: текст, параметры и длительность выше порога, последние N
+# записей в памяти процесса. По желанию к записи прикладывается план — EXPLAIN (ANALYZE, BUFFERS)
+# на Postgres (запрос выполняется ещё раз!) или EXPLAIN QUERY PLAN на SQLite.
+
+MAX_PARAMS = 50
+MAX_PARAM_LEN = 200
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    at: str
+    duration_ms: float
+    statement: str
+    parameters: list
+    executemany: bool
+    plan: str | None = None
+    plan_error: str | None = None
+
+
+def _param(value):
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= MAX_PARAM_LEN else text[:MAX_PARAM_LEN] + "…"
+
+
+def _params(parameters, executemany: bool) -> list:
+    if executemany:
+        # для пакетной вставки достаточно первой строки и их числа
+        parameters = list(parameters)
+        return [len(parameters), _params(parameters[0], False)] if parameters else [0]
+    if isinstance(parameters, dict):
+        parameters = [f"{k}={v!r}" for k, v in parameters.items()]
+    values = [_param(v) for v in (parameters or ())]
+    if len(values) > MAX_PARAMS:
+        values = values[:MAX_PARAMS] + [f"… {len(values) - MAX_PARAMS} more"]
+    return values
+
+
+def _sqlite_plan(rows) -> str:
+    # (id, parent, notused, detail) -> дерево с отступами, как в sqlite3 CLI
+    depth, lines = {0: -1}, []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return "\n".join(lines)
+
+
+@dataclass(slots=True)
+class SlowQueryLog:
+    threshold_ms: float
+    size: int = 100
+    explain: bool = False
+    log: logging.Logger | None = None
+    recorded: int = 0
+    _entries: deque = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._entries = deque(maxlen=self.size)
+
+    def instrument(self, engine: Engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["slow_query_started"] = perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.pop("slow_query_started", None)
+        if started is None:
+            return
+        duration_ms = (perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = SlowQuery(
+            at=datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            duration_ms=round(duration_ms, 2),
+            statement=statement,
+            parameters=_params(parameters, executemany),
+            executemany=executemany,
+        )
+        # EXPLAIN только для чтения: ANALYZE выполняет запрос, а серверный курсор
+        # (потоковая выгрузка) ещё не дочитан
+        server_side = context is not None and context.execution_options.get("stream_results", False)
+        if self.explain and not executemany and not server_side and _is_select(statement):
+            try:
+                entry.plan = self._explain(conn, statement, parameters)
+            except Exception as exc:
+                entry.plan_error = f"{type(exc).__name__}: {exc}"
+
+        self._entries.append(entry)
+        self.recorded += 1
+        if self.log is not None:
+            self.log.warning(
+                "Slow query duration_ms=%.1f sql=%s", duration_ms, " ".join(statement.split())[:500],
+            )
+
+    def _explain(self, conn, statement: str, parameters) -> str:
+        # сырой DBAPI-курсор того же соединения: видит ту же транзакцию и не вызывает события заново
+        cursor = conn.connection.cursor()
+        try:
+            if conn.dialect.name == "postgresql":
+                # ANALYZE выполняет запрос, в том числе изменяющие CTE (WITH ... INSERT/UPDATE/DELETE):
+                # всё сделанное EXPLAIN откатываем всегда, ошибка не обрывает транзакцию запроса
+                cursor.execute("SAVEPOINT slow_query_explain")
+                try:
+                    cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+                    return "\n".join(row[0] for row in cursor.fetchall())
+                finally:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                    cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+            return _sqlite_plan(cursor.fetchall())
+        finally:
+            cursor.close()
+
+    def entries(self, limit: int | None = None) -> list[dict]:
+        # новые сверху
+        items = list(reversed(self._entries))
+        return [asdict(e) for e in items[:limit]]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def snapshot(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "size": self.size,
+            "explain": self.explain,
+            "recorded": self.recorded,
+            "kept": len(self._entries),
+        }
+
+
+def _is_select(statement: str) -> bool:
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return head in ("SELECT", "WITH")
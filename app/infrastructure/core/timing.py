@@ -0,0 +1,98 @@
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from functools import wraps
+from time import perf_counter
+from typing import Callable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+F = TypeVar("F", bound=Callable)
+
+# Разбивка времени запроса: ожидание пула, SQL (курсор), маппинг в схемы ответа и сериализация; остаток (app) —
+# сборка ORM-объектов и сам фреймворк. Отдельно ORM не меряем: даже пустой обработчик
+# do_orm_execute ломает selectinload вместе с yield_per (NDJSON-выгрузка).
+# Пока Server-Timing выключен, контекст не создаётся, обработчики событий не подключены,
+# а timed сводится к одной проверке ContextVar.
+
+
+@dataclass(slots=True)
+class RequestTiming:
+    started: float
+    queries: int = 0
+    db_s: float = 0.0
+    # ожидание соединения из пула
+    pool_s: float = 0.0
+    map_s: float = 0.0
+    ser_s: float = 0.0
+    # когда эндпоинт вернул результат: дальше FastAPI валидирует и кодирует ответ
+    endpoint_done: float | None = None
+
+    _phase: str | None = None
+
+    def header(self, total_s: float) -> str:
+        return ", ".join((
+            f"pool;dur={self.pool_s * 1000:.2f}",
+            f'db;dur={self.db_s * 1000:.2f};desc="{self.queries} queries"',
+            f"map;dur={self.map_s * 1000:.2f}",
+            f"ser;dur={self.ser_s * 1000:.2f}",
+            f"app;dur={(total_s - self.pool_s - self.db_s - self.map_s - self.ser_s) * 1000:.2f}",
+            f"total;dur={total_s * 1000:.2f}",
+        ))
+
+
+_current: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+def current() -> RequestTiming | None:
+    return _current.get()
+
+
+def start_request() -> tuple[RequestTiming, Token]:
+    timing = RequestTiming(perf_counter())
+    return timing, _current.set(timing)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def timed(phase: str) -> Callable[[F], F]:
+    # map / ser; вложенные вызовы (orgs_to_dicts -> address_to_dict) не считаются дважды
+    attr = f"{phase}_s"
+
+    def decorator(fn: F) -> F:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            timing = _current.get()
+            if timing is None or timing._phase is not None:
+                return fn(*args, **kwargs)
+            timing._phase = phase
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                setattr(timing, attr, getattr(timing, attr) + perf_counter() - started)
+                timing._phase = None
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info["timing_started"] = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timing = _current.get()
+    started = conn.info.pop("timing_started", None)
+    if timing is not None and started is not None:
+        timing.queries += 1
+        timing.db_s += perf_counter() - started
+
+
+def instrument(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
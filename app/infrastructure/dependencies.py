@@ -2,8 +2,8 @@ from fastapi import Request
 
 
 async def get_db(request: Request):
-    # тут оверхед для select операций,
-    # но для реальных транзакций надо (желательно даже правильно ловить исключения)
+    # соединение из пула берётся при первом запросе сессии, не при её создании;
+    # rollback на исключении — для настоящих (пишущих) транзакций
     session_maker = request.app.state.session_maker
     async with session_maker() as session:
         try:
@@ -12,4 +12,18 @@ async def get_db(request: Request):
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_read_db(request: Request):
+    # Только чтение: транзакция READ ONLY (query_only на SQLite), на реплике, если они настроены.
+    # Сессия ленивая — соединение берётся из пула при первом запросе, поэтому ответ из кэша
+    # или ошибка валидации обходятся без него, а rollback/close пустой сессии ничего не стоят.
+    async with request.app.state.read_session_maker() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
@@ -1 +1,5 @@
-from .session import async_engine, async_session
\ No newline at end of file
+from .session import async_engine, async_session, read_only_engine, sqlite_virtual_tables, pg_extensions, pool_stats
+from .activity_index import ActivityTreeIndex
+from .spatial_index import AddressSpatialIndex
+from .data_version import DataVersion, DIRECTORY_TABLES
+from .replicas import ReplicaSet
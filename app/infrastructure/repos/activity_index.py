@@ -0,0 +1,57 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .cruds import ActivityRepository
+
+
+@dataclass(slots=True)
+class ActivityTreeIndex:
+    # Дерево видов деятельности маленькое и меняется редко: держим его в памяти,
+    # чтобы не гонять рекурсивный CTE на каждый запрос /orgs/activity.
+    session_maker: async_sessionmaker[AsyncSession]
+
+    ids_by_name: dict[str, list[int]] = field(default_factory=dict)
+    children: dict[int | None, list[int]] = field(default_factory=dict)
+    stale: bool = True
+
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # растёт при каждом invalidate(): так видно, что дерево поменялось, пока его читали
+    _generation: int = 0
+
+    async def reload(self) -> None:
+        generation = self._generation
+        async with self.session_maker() as session:
+            edges = await ActivityRepository(session).list_edges()
+
+        ids_by_name: dict[str, list[int]] = {}
+        children: dict[int | None, list[int]] = {}
+        for activity_id, name, parent_id in edges:
+            ids_by_name.setdefault(name.casefold(), []).append(activity_id)
+            children.setdefault(parent_id, []).append(activity_id)
+
+        self.ids_by_name, self.children = ids_by_name, children
+        # invalidate() во время чтения: прочитанное могло не застать изменение, перечитаем ещё раз
+        self.stale = generation != self._generation
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self.stale = True
+
+    async def ensure_loaded(self) -> None:
+        if not self.stale:
+            return
+        async with self._lock:
+            if self.stale:
+                await self.reload()
+
+    async def get_subtree_ids_by_name(self, name: str) -> list[int]:
+        await self.ensure_loaded()
+
+        result = list(self.ids_by_name.get(name.casefold(), ()))
+        i = 0
+        while i < len(result):
+            result.extend(self.children.get(result[i], ()))
+            i += 1
+        return result
@@ -0,0 +1,376 @@
+from dataclasses import dataclass, field, fields
+from logging import Logger
+from typing import Any, Iterable
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Float,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    and_,
+    delete,
+    exists,
+    func,
+    insert,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .models import Activity, Address, Organization, OrganizationPhone, data_versions, organization_activities
+
+# Промежуточные (временные) таблицы: пачка записей сначала целиком заливается сюда —
+# COPY на Postgres, executemany на SQLite, — а в основные таблицы переносится
+# несколькими INSERT ... SELECT, а не построчно.
+STAGING = MetaData()
+
+import_addresses = Table(
+    "_import_addresses",
+    STAGING,
+    Column("seq", BigInteger, nullable=False),
+    Column("country", Text, nullable=False),
+    Column("city", Text, nullable=False),
+    Column("street", Text, nullable=False),
+    Column("house", Integer, nullable=False),
+    Column("building", Integer),
+    Column("lat", Float),
+    Column("lon", Float),
+    prefixes=["TEMPORARY"],
+)
+
+import_orgs = Table(
+    "_import_orgs",
+    STAGING,
+    Column("seq", BigInteger, nullable=False),
+    Column("name", Text, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+import_phones = Table(
+    "_import_phones",
+    STAGING,
+    Column("seq", BigInteger, nullable=False),
+    Column("phone", Text, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+import_org_activities = Table(
+    "_import_org_activities",
+    STAGING,
+    Column("seq", BigInteger, nullable=False),
+    Column("activity_id", Integer, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+KINDS = ("activities", "addresses", "organizations")
+
+# таблицы data_versions, которые затрагивает импорт каждого вида
+KIND_TABLES = {
+    "activities": ("activities",),
+    "addresses": ("addresses",),
+    "organizations": ("addresses", "organizations", "organization_phones", "organization_activities"),
+}
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+@dataclass(slots=True)
+class ImportStats:
+    records: int = 0
+    invalid: int = 0
+    activities: int = 0
+    addresses: int = 0
+    organizations: int = 0
+    phones: int = 0
+    activity_links: int = 0
+
+    def add(self, other: "ImportStats") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+    def as_dict(self) -> dict[str, int]:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+
+def _text(record: dict[str, Any], key: str) -> str:
+    value = record.get(key)
+    value = "" if value is None else str(value).strip()
+    if not value:
+        raise InvalidRecord(f"{key} is required")
+    return value
+
+
+def _opt_int(value: Any) -> int | None:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return int(value)
+
+
+def _opt_float(value: Any) -> float | None:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return float(value)
+
+
+def _names(value: Any) -> list[str]:
+    # в CSV списки телефонов/деятельностей пишутся через ";", в NDJSON это обычные массивы
+    if value is None:
+        return []
+    items = value.split(";") if isinstance(value, str) else value
+    return [s for s in (str(item).strip() for item in items) if s]
+
+
+def address_row(seq: int, record: dict[str, Any]) -> tuple:
+    try:
+        return (
+            seq,
+            _text(record, "country"),
+            _text(record, "city"),
+            _text(record, "street"),
+            int(record["house"]),
+            _opt_int(record.get("building")),
+            _opt_float(record.get("lat")),
+            _opt_float(record.get("lon")),
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise InvalidRecord(f"bad address: {e}") from e
+
+
+def _same_address(target, src) -> list:
+    # совпадение по uq_addresses_full; building сравниваем null-безопасно,
+    # т.к. уникальное ограничение NULL-ы между собой не считает равными
+    return [
+        target.c.country == src.c.country,
+        target.c.city == src.c.city,
+        target.c.street == src.c.street,
+        target.c.house == src.c.house,
+        target.c.building.is_not_distinct_from(src.c.building),
+    ]
+
+
+@dataclass(slots=True)
+class BulkImporter:
+    # Работает на одном соединении: временные таблицы живут в рамках сессии БД.
+    # Каждая пачка — отдельная транзакция (её открывает вызывающий код), и повторный
+    # прогон той же пачки ничего не дублирует, поэтому импорт можно продолжать после сбоя.
+    conn: AsyncConnection
+    log: Logger
+
+    activity_ids: dict[str, int] = field(default_factory=dict)
+    # виды деятельности, чей родитель ещё не встретился в файле: name -> (seq, parent)
+    deferred: dict[str, tuple[int, str | None]] = field(default_factory=dict)
+
+    async def prepare(self) -> None:
+        async with self.conn.begin():
+            await self.conn.run_sync(STAGING.create_all)
+            rows = await self.conn.execute(select(Activity.id, Activity.name))
+            self.activity_ids = {name: id_ for id_, name in rows.all()}
+
+    async def _load(self, table: Table, rows: list[tuple]) -> None:
+        await self.conn.execute(delete(table))
+        if not rows:
+            return
+        columns = [c.name for c in table.c]
+        if self.conn.dialect.name == "postgresql":
+            # транзакцию asyncpg SQLAlchemy уже открыл на delete() выше, COPY идёт в ней же
+            raw = await self.conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(table.name, records=rows, columns=columns)
+        else:
+            placeholders = ", ".join("?" for _ in columns)
+            await self.conn.exec_driver_sql(
+                f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({placeholders})",
+                rows,
+            )
+
+    async def _merge_addresses(self) -> int:
+        target = Address.__table__
+        s = import_addresses
+        stmt = insert(target).from_select(
+            ["country", "city", "street", "house", "building", "lat", "lon"],
+            select(s.c.country, s.c.city, s.c.street, s.c.house, s.c.building, func.min(s.c.lat), func.min(s.c.lon))
+            .where(~exists().where(and_(*_same_address(target, s))))
+            .group_by(s.c.country, s.c.city, s.c.street, s.c.house, s.c.building),
+        )
+        return (await self.conn.execute(stmt)).rowcount
+
+    async def import_addresses(self, chunk: Iterable[tuple[int, dict[str, Any]]]) -> ImportStats:
+        stats = ImportStats()
+        rows = []
+        for seq, record in chunk:
+            stats.records += 1
+            try:
+                rows.append(address_row(seq, record))
+            except InvalidRecord as e:
+                stats.invalid += 1
+                self.log.warning("Record %d skipped: %s", seq, e)
+
+        await self._load(import_addresses, rows)
+        stats.addresses = await self._merge_addresses()
+        return stats
+
+    async def import_organizations(self, chunk: Iterable[tuple[int, dict[str, Any]]]) -> ImportStats:
+        stats = ImportStats()
+        addresses, orgs, phones, links = [], [], [], []
+        for seq, record in chunk:
+            stats.records += 1
+            try:
+                address = address_row(seq, record)
+                name = _text(record, "name")
+                activity_ids = []
+                for activity in _names(record.get("activities")):
+                    if activity not in self.activity_ids:
+                        raise InvalidRecord(f"unknown activity {activity!r}")
+                    activity_ids.append(self.activity_ids[activity])
+            except InvalidRecord as e:
+                stats.invalid += 1
+                self.log.warning("Record %d skipped: %s", seq, e)
+                continue
+            addresses.append(address)
+            orgs.append((seq, name))
+            phones.extend((seq, phone) for phone in _names(record.get("phones")))
+            links.extend((seq, activity_id) for activity_id in activity_ids)
+
+        await self._load(import_addresses, addresses)
+        await self._load(import_orgs, orgs)
+        await self._load(import_phones, phones)
+        await self._load(import_org_activities, links)
+
+        stats.addresses = await self._merge_addresses()
+
+        # организация с уже существующим именем не перезаписывается, телефоны и виды
+        # деятельности из файла к ней только добавляются
+        a, s, o = Address.__table__, import_addresses, import_orgs
+        org_t = Organization.__table__
+        stats.organizations = (await self.conn.execute(
+            insert(org_t).from_select(
+                ["name", "address_id"],
+                select(o.c.name, func.min(a.c.id))
+                .select_from(o.join(s, s.c.seq == o.c.seq).join(a, and_(*_same_address(a, s))))
+                .where(~exists().where(org_t.c.name == o.c.name))
+                .group_by(o.c.name),
+            )
+        )).rowcount
+
+        p, phone_t = import_phones, OrganizationPhone.__table__
+        stats.phones = (await self.conn.execute(
+            insert(phone_t).from_select(
+                ["organization_id", "phone"],
+                select(org_t.c.id, p.c.phone)
+                .select_from(p.join(o, o.c.seq == p.c.seq).join(org_t, org_t.c.name == o.c.name))
+                .where(~exists().where(phone_t.c.organization_id == org_t.c.id, phone_t.c.phone == p.c.phone))
+                .distinct(),
+            )
+        )).rowcount
+
+        l, link_t = import_org_activities, organization_activities
+        stats.activity_links = (await self.conn.execute(
+            insert(link_t).from_select(
+                ["organization_id", "activity_id"],
+                select(org_t.c.id, l.c.activity_id)
+                .select_from(l.join(o, o.c.seq == l.c.seq).join(org_t, org_t.c.name == o.c.name))
+                .where(~exists().where(
+                    link_t.c.organization_id == org_t.c.id, link_t.c.activity_id == l.c.activity_id
+                ))
+                .distinct(),
+            )
+        )).rowcount
+        return stats
+
+    async def import_activities(self, chunk: Iterable[tuple[int, dict[str, Any]]]) -> ImportStats:
+        # Деревьев видов деятельности немного, поэтому без COPY: вставляем по уровням,
+        # чтобы триггер activity_closure видел уже вставленного родителя. Записи, чей родитель
+        # будет дальше в файле, откладываются до следующих пачек (см. checkpoint()).
+        stats = ImportStats()
+        pending, self.deferred = self.deferred, {}
+        for seq, record in chunk:
+            stats.records += 1
+            try:
+                name = _text(record, "name")
+                parent = str(record.get("parent") or "").strip() or None
+            except InvalidRecord as e:
+                stats.invalid += 1
+                self.log.warning("Record %d skipped: %s", seq, e)
+                continue
+            if name not in self.activity_ids:
+                pending.setdefault(name, (seq, parent))
+
+        while pending:
+            ready = {
+                name: parent for name, (_, parent) in pending.items()
+                if parent is None or parent in self.activity_ids
+            }
+            if not ready:
+                break
+            await self.conn.execute(
+                insert(Activity),
+                [
+                    {"name": name, "parent_id": None if parent is None else self.activity_ids[parent]}
+                    for name, parent in ready.items()
+                ],
+            )
+            rows = await self.conn.execute(select(Activity.id, Activity.name).where(Activity.name.in_(list(ready))))
+            self.activity_ids.update({name: id_ for id_, name in rows.all()})
+            stats.activities += len(ready)
+            for name in ready:
+                del pending[name]
+
+        self.deferred = pending
+        return stats
+
+    def checkpoint(self, last_seq: int) -> int:
+        # отложенные записи ещё не в БД: чекпоинт не должен уходить дальше первой из них,
+        # иначе после сбоя они потеряются (повтор уже загруженных записей безвреден)
+        if self.deferred:
+            return min(seq for seq, _ in self.deferred.values()) - 1
+        return last_seq
+
+    async def _drop_version_triggers(self) -> list[str]:
+        # Построчные триггеры data_versions на SQLite делают UPDATE на каждую вставленную строку.
+        # DDL в SQLite транзакционен: триггеры удаляются и создаются заново в транзакции пачки,
+        # так что другие соединения их отсутствия не видят, а при сбое откат их вернёт.
+        rows = await self.conn.execute(text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name GLOB 'trg_*_data_version_*'"
+        ))
+        triggers = rows.all()
+        for name, _ in triggers:
+            await self.conn.exec_driver_sql(f"DROP TRIGGER {name}")
+        return [sql for _, sql in triggers]
+
+    async def import_chunk(self, kind: str, chunk: list[tuple[int, dict[str, Any]]]) -> ImportStats:
+        triggers = await self._drop_version_triggers() if self.conn.dialect.name == "sqlite" else []
+        match kind:
+            case "activities":
+                stats = await self.import_activities(chunk)
+            case "addresses":
+                stats = await self.import_addresses(chunk)
+            case "organizations":
+                stats = await self.import_organizations(chunk)
+            case _:
+                raise ValueError(f"Unsupported import kind: {kind!r}")
+        for sql in triggers:
+            await self.conn.exec_driver_sql(sql)
+        return stats
+
+    async def finish(self, kind: str) -> ImportStats:
+        # вызывается в транзакции после последней пачки
+        stats = ImportStats()
+        for seq, parent in sorted(self.deferred.values()):
+            stats.invalid += 1
+            self.log.warning("Record %d skipped: unknown parent activity %r", seq, parent)
+        self.deferred = {}
+
+        if self.conn.dialect.name == "sqlite":
+            # триггеры на время пачек снимались — версию двигаем один раз за весь импорт
+            # (на Postgres триггеры statement-level и уже сработали по разу на INSERT)
+            await self.conn.execute(
+                update(data_versions)
+                .where(data_versions.c.table_name.in_(KIND_TABLES[kind]))
+                .values(version=data_versions.c.version + 1, updated_at=func.current_timestamp())
+            )
+        return stats
@@ -1,17 +1,45 @@
-import math
 from dataclasses import dataclass
-from typing import Iterable
+from datetime import datetime
+from typing import AsyncIterator, Iterable
 
-from sqlalchemy import select, func
+import numpy as np
+from sqlalchemy import select, func, tuple_, and_, or_, case, cast, literal, literal_column, union_all, JSON, Text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
+from app.infrastructure.core.metrics import observe_repository
 from app.infrastructure.repos.models import *
+from app.infrastructure.repos.utils.geo import EARTH_RADIUS_KM, MAX_DISTANCE_M, bounding_boxes, radius_matches
 
+# начиная с этой доли видов деятельности в поддереве /orgs/activity идёт упорядоченным сканом
+BROAD_SUBTREE_SHARE = 0.1
 
+
+def _json_float(column):
+    # float8 без дробной части Postgres пишет в JSON как 55, а Python (Pydantic) — как 55.0;
+    # в остальном (кратчайшая точная запись) форматы совпадают
+    return case(
+        (column == func.trunc(column), cast(cast(column, Text) + ".0", JSON)),
+        else_=func.to_json(column),
+    ).label(column.key)
+
+
+@observe_repository
 @dataclass(slots=True)
 class AddressRepository:
     session: AsyncSession
+    use_rtree: bool = False
+
+    @staticmethod
+    def _lookup_condition(country: str, city: str, street: str, house: int, building: int | None):
+        return and_(
+            func.lower(Address.country) == func.lower(country),
+            func.lower(Address.city) == func.lower(city),
+            func.lower(Address.street) == func.lower(street),
+            Address.house == house,
+            Address.building.is_(None) if building is None else Address.building == building,
+        )
 
     async def get_address_id(
             self,
@@ -22,47 +50,121 @@ class AddressRepository:
             house: int,
             building: int | None,
     ) -> int | None:
-        stmt = (
-            select(Address.id)
-            .where(
-                func.lower(Address.country) == func.lower(country),
-                func.lower(Address.city) == func.lower(city),
-                func.lower(Address.street) == func.lower(street),
-                Address.house == house,
-            )
-        )
+        stmt = select(Address.id).where(self._lookup_condition(country, city, street, house, building))
+        return await self.session.scalar(stmt)
 
-        if building is None:
-            stmt = stmt.where(Address.building.is_(None))
-        else:
-            stmt = stmt.where(Address.building == building)
+    async def get_address_ids(
+            self,
+            addresses: "list[tuple[str, str, str, int, int | None]]",
+            chunk_size: int = 250,
+    ) -> "list[int | None]":
+        # UNION ALL из проб по ix_addresses_lookup_ci с номером элемента: сравнение регистра остаётся на стороне БД,
+        # а ответ сопоставляется с входом по номеру. chunk_size < 500 — лимит составного SELECT в SQLite.
+        result: "list[int | None]" = [None] * len(addresses)
+        for start in range(0, len(addresses), chunk_size):
+            stmt = union_all(*(
+                select(literal(i).label("idx"), Address.id).where(self._lookup_condition(*address))
+                for i, address in enumerate(addresses[start:start + chunk_size], start)
+            ))
+            for idx, address_id in (await self.session.execute(stmt)).all():
+                result[idx] = address_id
+        return result
 
-        return await self.session.scalar(stmt)
+    @staticmethod
+    def _list_all_stmt():
+        return select(Address).order_by(
+            Address.country, Address.city, Address.street, Address.house, Address.building
+        )
 
     async def list_all(self) -> list[Address]:
-        stmt = select(Address).order_by(
-            Address.country, Address.city, Address.street, Address.house, Address.building
+        return (await self.session.execute(self._list_all_stmt())).scalars().all()
+
+    async def iter_all(self, /, chunk_size: int = 1000) -> AsyncIterator[list[Address]]:
+        result = await self.session.stream_scalars(
+            self._list_all_stmt(),
+            execution_options={"yield_per": chunk_size},
+        )
+        # identity map держит объекты по слабым ссылкам, отданные пачки освобождаются сами;
+        # expunge_all() посреди yield_per ломает загрузку следующей пачки
+        async for chunk in result.partitions():
+            yield chunk
+
+    async def get_by_ids(self, ids: Iterable[int]) -> list[Address]:
+        # порядок ответа совпадает с порядком ids (например, по расстоянию из гео-индекса)
+        ids = list(ids)
+        if not ids:
+            return []
+        rows = (await self.session.execute(select(Address).where(Address.id.in_(ids)))).scalars().all()
+        by_id = {a.id: a for a in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    async def list_coordinates(self) -> list[tuple[int, float, float]]:
+        stmt = select(Address.id, Address.lat, Address.lon).where(
+            Address.lat.is_not(None),
+            Address.lon.is_not(None),
         )
+        return [tuple(r) for r in (await self.session.execute(stmt)).all()]
+
+    async def list_within_boxes(
+            self,
+            boxes: Iterable[tuple[float, float, float, float]],
+    ) -> list[Address]:
+        # один запрос на объединение bbox-ов (lat_min, lat_max, lon_min, lon_max); точную фильтрацию делает вызывающий
+        boxes = list(boxes)
+        if not boxes:
+            return []
+
+        if self.use_rtree:
+            col = addresses_rtree.c
+            stmt = select(Address).join(addresses_rtree, col.id == Address.id).where(or_(*(
+                and_(col.min_lat <= lat_max, col.max_lat >= lat_min, col.min_lon <= lon_max, col.max_lon >= lon_min)
+                for lat_min, lat_max, lon_min, lon_max in boxes
+            )))
+        else:
+            stmt = select(Address).where(
+                Address.lat.is_not(None),
+                Address.lon.is_not(None),
+                or_(*(
+                    and_(Address.lat.between(lat_min, lat_max), Address.lon.between(lon_min, lon_max))
+                    for lat_min, lat_max, lon_min, lon_max in boxes
+                )),
+            )
+
         return (await self.session.execute(stmt)).scalars().all()
 
-    async def list_within_radius(
+    async def list_within_radius_many(
+            self,
+            points: "list[tuple[float, float, int, int | None]]",
+    ) -> list[list[Address]]:
+        # (lat, lon, radius_m, limit) -> адреса в радиусе по возрастанию расстояния, для всех точек одним запросом
+        radii_km = np.array([radius_m / 1000.0 for _, _, radius_m, _ in points], dtype=np.float64)
+        candidates = await self.list_within_boxes(
+            box
+            for (lat, lon, _, _), radius_km in zip(points, radii_km)
+            for box in bounding_boxes(lat, lon, radius_km)
+        )
+
+        matches = radius_matches(
+            np.array([p[0] for p in points], dtype=np.float64),
+            np.array([p[1] for p in points], dtype=np.float64),
+            radii_km,
+            np.array([a.lat for a in candidates], dtype=np.float64),
+            np.array([a.lon for a in candidates], dtype=np.float64),
+        )
+        return [
+            [candidates[i] for i in idx[:limit]]
+            for (idx, _), (_, _, _, limit) in zip(matches, points)
+        ]
+
+    def _within_radius_stmt(
             self,
-            /,
             lat: float,
             lon: float,
-            radius_m: int,
-            limit: int | None = None,
-            offset: int | None = None,
-    ) -> list[Address]:
+            radius_m: float,
+            activity_ids: Iterable[int] | None = None,
+    ):
         radius_km = radius_m / 1000.0
-
-        km_per_deg = 111.32
-        d_lat = radius_km / km_per_deg
-        cos_lat = max(0.000001, math.cos(math.radians(lat)))
-        d_lon = radius_km / (km_per_deg * cos_lat)
-
-        lat_min, lat_max = lat - d_lat, lat + d_lat
-        lon_min, lon_max = lon - d_lon, lon + d_lon
+        boxes = bounding_boxes(lat, lon, radius_km)
 
         lat1 = func.radians(lat)
         lon1 = func.radians(lon)
@@ -74,20 +176,49 @@ class AddressRepository:
 
         a = func.pow(func.sin(dlat / 2), 2) + func.cos(lat1) * func.cos(lat2) * func.pow(func.sin(dlon / 2), 2)
         c = 2 * func.asin(func.sqrt(a))
-        distance_km = 6371.0 * c
+        distance_km = EARTH_RADIUS_KM * c
 
         stmt = (
             select(Address)
             .where(
                 Address.lat.is_not(None),
                 Address.lon.is_not(None),
-                Address.lat.between(lat_min, lat_max),
-                Address.lon.between(lon_min, lon_max),
                 distance_km <= radius_km,
             )
             .order_by(distance_km)
         )
 
+        if self.use_rtree:
+            # SQLite: bbox-префильтр по R*Tree вместо диапазона по ix_addresses_geo
+            col = addresses_rtree.c
+            stmt = stmt.join(addresses_rtree, col.id == Address.id).where(or_(*(
+                and_(col.min_lat <= lat_max, col.max_lat >= lat_min, col.min_lon <= lon_max, col.max_lon >= lon_min)
+                for lat_min, lat_max, lon_min, lon_max in boxes
+            )))
+        else:
+            stmt = stmt.where(or_(*(
+                and_(Address.lat.between(lat_min, lat_max), Address.lon.between(lon_min, lon_max))
+                for lat_min, lat_max, lon_min, lon_max in boxes
+            )))
+
+        if activity_ids:
+            stmt = stmt.where(Address.organizations.any(
+                Organization.activities.any(Activity.id.in_(list(activity_ids)))
+            ))
+
+        return stmt, distance_km
+
+    async def list_within_radius(
+            self,
+            /,
+            lat: float,
+            lon: float,
+            radius_m: int,
+            limit: int | None = None,
+            offset: int | None = None,
+    ) -> list[Address]:
+        stmt, _ = self._within_radius_stmt(lat, lon, radius_m)
+
         if offset:
             stmt = stmt.offset(offset)
         if limit:
@@ -95,10 +226,75 @@ class AddressRepository:
 
         return (await self.session.execute(stmt)).scalars().all()
 
+    async def list_within_radius_with_orgs(
+            self,
+            /,
+            lat: float,
+            lon: float,
+            radius_m: int,
+            limit: int | None = None,
+            offset: int | None = None,
+            ids: Iterable[int] | None = None,
+    ) -> list[tuple[Address, float, list[tuple[int, str]]]]:
+        # Один запрос: страница адресов (расстояние считается один раз, в подзапросе) LEFT JOIN организации.
+        # ids — адреса, уже отобранные и нарезанные гео-индексом; тогда limit/offset не нужны.
+        stmt, distance_km = self._within_radius_stmt(lat, lon, radius_m)
+        stmt = stmt.add_columns(distance_km.label("distance_km")).order_by(Address.id)
+
+        if ids is not None:
+            stmt = stmt.where(Address.id.in_(list(ids)))
+        if offset:
+            stmt = stmt.offset(offset)
+        if limit:
+            stmt = stmt.limit(limit)
+
+        page = stmt.subquery("page")
+        address = aliased(Address, page)
+        rows = await self.session.execute(
+            select(address, page.c.distance_km, Organization.id, Organization.name)
+            .outerjoin(Organization, Organization.address_id == address.id)
+            .order_by(page.c.distance_km, address.id, Organization.name, Organization.id)
+        )
+
+        grouped = []
+        for a, distance, org_id, org_name in rows.all():
+            if not grouped or grouped[-1][0] is not a:
+                grouped.append((a, distance * 1000.0, []))
+            if org_id is not None:
+                grouped[-1][2].append((org_id, org_name))
+        return grouped
 
+    async def list_nearest(
+            self,
+            /,
+            lat: float,
+            lon: float,
+            k: int,
+            activity_ids: Iterable[int] | None = None,
+            start_radius_m: float = 1000.0,
+    ) -> list[tuple[Address, float]]:
+        # Расширяем круг, пока в нём не наберётся k адресов: всё, что внутри круга,
+        # гарантированно ближе всего, что снаружи, поэтому первые k из круга — ответ.
+        activity_ids = list(activity_ids) if activity_ids is not None else None
+        radius_m = start_radius_m
+        while True:
+            stmt, distance_km = self._within_radius_stmt(lat, lon, radius_m, activity_ids)
+            stmt = stmt.add_columns(distance_km).limit(k)
+            rows = (await self.session.execute(stmt)).all()
+
+            if len(rows) >= k or radius_m >= MAX_DISTANCE_M:
+                return [(address, distance * 1000.0) for address, distance in rows]
+            radius_m = min(radius_m * 4, MAX_DISTANCE_M)
+
+
+@observe_repository
 @dataclass(slots=True)
 class OrganizationRepository:
     session: AsyncSession
+    # Postgres: отдавать вместо ORM-объектов строки (name, id, json) с готовым JSON организации
+    json_rows: bool = False
+    # индекс для поиска по имени: "pg_trgm", "fts5" или None (LIKE без индекса)
+    name_search: str | None = None
 
     @staticmethod
     def _load_options():
@@ -108,42 +304,139 @@ class OrganizationRepository:
             selectinload(Organization.activities),
         )
 
-    async def list(
+    @staticmethod
+    def _json_select():
+        # Весь объект организации собирается в одном запросе. row_to_json/array_to_json дают компактный JSON
+        # с ключами в порядке колонок — байт в байт как OrganizationOut после FastAPI.
+        address = (
+            select(
+                Address.id, Address.country, Address.city, Address.street,
+                Address.house, Address.building,
+                _json_float(Address.lat), _json_float(Address.lon),
+            )
+            .where(Address.id == Organization.address_id)
+            .correlate(Organization)
+            .subquery("a")
+        )
+        phones = (
+            select(func.array_to_json(func.array_agg(aggregate_order_by(OrganizationPhone.phone, OrganizationPhone.phone))))
+            .where(OrganizationPhone.organization_id == Organization.id)
+            .scalar_subquery()
+        )
+        activities = (
+            select(func.array_to_json(func.array_agg(aggregate_order_by(Activity.name, Activity.name))))
+            .join(organization_activities, organization_activities.c.activity_id == Activity.id)
+            .where(organization_activities.c.organization_id == Organization.id)
+            .scalar_subquery()
+        )
+        return select(
+            Organization.id,
+            Organization.name,
+            select(func.row_to_json(address.table_valued())).scalar_subquery().label("address"),
+            func.coalesce(phones, literal_column("'[]'::json")).label("phones"),
+            func.coalesce(activities, literal_column("'[]'::json")).label("activities"),
+        )
+
+    def _select(self):
+        if self.json_rows:
+            return self._json_select()
+        return select(Organization).options(*self._load_options())
+
+    async def _fetch(self, stmt):
+        if not self.json_rows:
+            return (await self.session.execute(stmt)).scalars().all()
+
+        t = stmt.subquery("t")
+        body = (
+            select(t.c.id, t.c.name, cast(func.row_to_json(t.table_valued()), Text).label("json"))
+            .order_by(t.c.name, t.c.id)
+        )
+        return (await self.session.execute(body)).all()
+
+    def _list_stmt(
             self,
-            /,
             address_ids: Iterable[int] | None = None,
             activity_ids: Iterable[int] | None = None,
             name: str | None = None,
-            limit: int | None = None,
-            offset: int | None = None,
-    ) -> list[Organization]:
-        stmt = (
-            select(Organization)
-            .options(*self._load_options())
-            .order_by(Organization.name)
-        )
-
-        if address_ids:
+            after: tuple[str, int] | None = None,
+            ancestor_ids: Iterable[int] | None = None,
+            subtree_scan: bool = False,
+    ):
+        # keyset-пагинация по (name, id): глубокие страницы стоят столько же, сколько первая
+        stmt = self._select().order_by(Organization.name, Organization.id)
+
+        if address_ids is not None:
             stmt = stmt.where(Organization.address_id.in_(list(address_ids)))
 
         if name is not None:
             stmt = stmt.where(Organization.name == name)
 
         if activity_ids:
-            stmt = (
-                stmt.join(Organization.activities)
-                .where(Activity.id.in_(activity_ids))
-                .distinct()
+            stmt = stmt.where(Organization.activities.any(Activity.id.in_(list(activity_ids))))
+
+        if ancestor_ids is not None:
+            # организации поддерева — из closure-таблицы по id корня
+            subtree = (
+                select(organization_activities.c.organization_id)
+                .join(
+                    activity_closure,
+                    activity_closure.c.descendant_id == organization_activities.c.activity_id,
+                )
+                .where(activity_closure.c.ancestor_id.in_(list(ancestor_ids)))
             )
+            if subtree_scan:
+                # широкое поддерево: страница набирается на первых же организациях по имени
+                subtree = subtree.where(organization_activities.c.organization_id == Organization.id)
+                stmt = stmt.where(subtree.exists())
+            else:
+                # узкое: сначала собираем немногие id, затем сортируем только их
+                stmt = stmt.where(Organization.id.in_(subtree))
+
+        if after is not None:
+            stmt = stmt.where(tuple_(Organization.name, Organization.id) > tuple_(*after))
+
+        return stmt
+
+    async def list(
+            self,
+            /,
+            address_ids: Iterable[int] | None = None,
+            activity_ids: Iterable[int] | None = None,
+            name: str | None = None,
+            limit: int | None = None,
+            offset: int | None = None,
+            after: tuple[str, int] | None = None,
+            ancestor_ids: Iterable[int] | None = None,
+            subtree_scan: bool = False,
+    ) -> list[Organization]:
+        stmt = self._list_stmt(address_ids, activity_ids, name, after, ancestor_ids, subtree_scan)
 
         if offset:
             stmt = stmt.offset(offset)
         if limit:
             stmt = stmt.limit(limit)
 
-        return (await self.session.execute(stmt)).scalars().all()
+        return await self._fetch(stmt)
+
+    async def iter_chunks(
+            self,
+            /,
+            chunk_size: int = 500,
+            after: tuple[str, int] | None = None,
+    ) -> "AsyncIterator[list[Organization]]":
+        # server-side курсор + yield_per: selectinload догружает связи пачками по chunk_size
+        result = await self.session.stream_scalars(
+            self._list_stmt(after=after),
+            execution_options={"yield_per": chunk_size},
+        )
+        async for chunk in result.partitions():
+            yield chunk
 
     async def get_by_id(self, org_id: int) -> Organization | None:
+        if self.json_rows:
+            rows = await self._fetch(self._select().where(Organization.id == org_id))
+            return rows[0] if rows else None
+
         stmt = (
             select(Organization)
             .where(Organization.id == org_id)
@@ -151,6 +444,47 @@ class OrganizationRepository:
         )
         return await self.session.scalar(stmt)
 
+    async def search(self, /, q: str, limit: int = 20) -> "list[Organization]":
+        stmt = select(Organization).options(*self._load_options()).limit(limit)
+
+        if self.name_search == "pg_trgm":
+            # подстрока или похожее слово (опечатки): оба условия идут по GIN-индексу ix_org_name_trgm
+            name, query = func.lower(Organization.name), func.lower(q)
+            pattern = "%" + q.lower().replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+            stmt = stmt.where(
+                or_(name.like(pattern, escape="/"), query.op("<%")(name))
+            ).order_by(
+                func.word_similarity(query, name).desc(),
+                func.similarity(query, name).desc(),
+                Organization.name,
+                Organization.id,
+            )
+            return (await self.session.execute(stmt)).scalars().all()
+
+        trigrams = sorted({q.lower()[i:i + 3] for i in range(len(q) - 2)})
+        if self.name_search == "fts5" and trigrams:
+            # OR по триграммам запроса: находит и подстроки, и имена с опечатками, bm25 (rank) ставит выше
+            # имена с наибольшим числом общих триграмм
+            match = " OR ".join('"' + t.replace('"', '""') + '"' for t in trigrams)
+            fts = (
+                select(organizations_fts.c.rowid, organizations_fts.c.rank)
+                .where(literal_column("organizations_fts").op("MATCH")(match))
+                .subquery("fts")
+            )
+            stmt = stmt.join(fts, fts.c.rowid == Organization.id).order_by(fts.c.rank, Organization.name, Organization.id)
+            return (await self.session.execute(stmt)).scalars().all()
+
+        stmt = stmt.where(Organization.name.contains(q, autoescape=True)).order_by(Organization.name, Organization.id)
+        return (await self.session.execute(stmt)).scalars().all()
+
+    async def get_by_ids(self, ids: Iterable[int]) -> "list[Organization]":
+        # порядок не гарантируется: сопоставление с входом — на стороне вызывающего
+        ids = list(set(ids))
+        if not ids:
+            return []
+        stmt = select(Organization).where(Organization.id.in_(ids)).options(*self._load_options())
+        return (await self.session.execute(stmt)).scalars().all()
+
     async def get_by_name(self, name: str) -> Organization | None:
         stmt = (
             select(Organization)
@@ -160,24 +494,121 @@ class OrganizationRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def list_all(self) -> list("Organization"):
-        return await self.list()
+    async def list_all(
+            self,
+            limit: int | None = None,
+            after: tuple[str, int] | None = None,
+    ) -> "list[Organization]":
+        return await self.list(limit=limit, after=after)
 
-    async def list_by_address_id(self, address_id: int) -> list("Organization"):
-        return await self.list(address_ids=[address_id])
+    async def list_by_address_id(
+            self,
+            address_id: int,
+            limit: int | None = None,
+            after: tuple[str, int] | None = None,
+    ) -> "list[Organization]":
+        return await self.list(address_ids=[address_id], limit=limit, after=after)
 
-    async def list_by_addresses_ids(self, addresses_ids: list(int)) -> list("Organization"):
+    async def list_by_addresses_ids(self, addresses_ids: "list[int]") -> "list[Organization]":
         return await self.list(address_ids=addresses_ids)
 
-    async def list_by_activities_any(self, activity_ids: int | Iterable[int]) -> list("Organization"):
-        return await self.list(activity_ids=activity_ids)
+    async def get_phones_and_activities(
+            self,
+            org_ids: Iterable[int],
+    ) -> dict[int, tuple["list[str]", "list[str]"]]:
+        # телефоны и названия деятельностей для пачки организаций одним UNION ALL вместо двух selectinload
+        org_ids = list(org_ids)
+        if not org_ids:
+            return {}
+
+        phones = select(
+            OrganizationPhone.organization_id.label("org_id"),
+            literal(0).label("kind"),
+            OrganizationPhone.phone.label("value"),
+        ).where(OrganizationPhone.organization_id.in_(org_ids))
+        activities = (
+            select(
+                organization_activities.c.organization_id.label("org_id"),
+                literal(1).label("kind"),
+                Activity.name.label("value"),
+            )
+            .join(Activity, Activity.id == organization_activities.c.activity_id)
+            .where(organization_activities.c.organization_id.in_(org_ids))
+        )
+        u = union_all(phones, activities).subquery("u")
+        rows = await self.session.execute(select(u.c.org_id, u.c.kind, u.c.value).order_by(u.c.org_id, u.c.kind, u.c.value))
+
+        result = {org_id: ([], []) for org_id in org_ids}
+        for org_id, kind, value in rows.all():
+            result[org_id][kind].append(value)
+        return result
+
+    async def list_by_activities_any(
+            self,
+            activity_ids: int | Iterable[int],
+            limit: int | None = None,
+            after: tuple[str, int] | None = None,
+    ) -> "list[Organization]":
+        if isinstance(activity_ids, int):
+            activity_ids = [activity_ids]
+        return await self.list(activity_ids=activity_ids, limit=limit, after=after)
+
+    async def list_address_ids_by_activities(self, activity_ids: Iterable[int]) -> set[int]:
+        stmt = (
+            select(Organization.address_id)
+            .where(Organization.activities.any(Activity.id.in_(list(activity_ids))))
+            .distinct()
+        )
+        return set((await self.session.scalars(stmt)).all())
+
+    async def list_by_activity_tree(
+            self,
+            activity_name: str,
+            limit: int | None = None,
+            after: tuple[str, int] | None = None,
+    ) -> "list[Organization]":
+        # Сначала находим корень поддерева и его размер: от доли видов деятельности в поддереве
+        # зависит, что дешевле — упорядоченный скан организаций с EXISTS (широкие корни вроде «Еда»)
+        # или выборка по closure → organization_activities (листья вроде «Свинина»).
+        ancestor = aliased(Activity)
+        stmt = (
+            select(ancestor.id, func.count(activity_closure.c.descendant_id))
+            .join(activity_closure, activity_closure.c.ancestor_id == ancestor.id)
+            .where(func.lower(ancestor.name) == func.lower(activity_name))
+            .group_by(ancestor.id)
+        )
+        roots = (await self.session.execute(stmt)).all()
+        if not roots:
+            return []
+        total = await self.session.scalar(select(func.count()).select_from(Activity))
+        subtree_size = sum(size for _, size in roots)
+        return await self.list(
+            ancestor_ids=[root_id for root_id, _ in roots],
+            subtree_scan=subtree_size >= BROAD_SUBTREE_SHARE * total,
+            limit=limit,
+            after=after,
+        )
 
 
+@observe_repository
 @dataclass(slots=True)
 class ActivityRepository:
     session: AsyncSession
+    use_closure: bool = False
+
+    async def exists_by_name(self, /, name: str) -> bool:
+        stmt = select(Activity.id).where(func.lower(Activity.name) == func.lower(name)).limit(1)
+        return await self.session.scalar(stmt) is not None
 
     async def get_subtree_ids_by_name(self, /, name: str) -> list[int]:
+        if self.use_closure:
+            stmt = (
+                select(activity_closure.c.descendant_id)
+                .join(Activity, Activity.id == activity_closure.c.ancestor_id)
+                .where(func.lower(Activity.name) == func.lower(name))
+            )
+            return list((await self.session.scalars(stmt)).all())
+
         base = (
             select(Activity.id)
             .where(func.lower(Activity.name) == func.lower(name))
@@ -190,3 +621,19 @@ class ActivityRepository:
 
         rows = await self.session.execute(select(tree.c.id))
         return [r[0] for r in rows.all()]
+
+    async def list_edges(self) -> list[tuple[int, str, int | None]]:
+        rows = await self.session.execute(select(Activity.id, Activity.name, Activity.parent_id))
+        return [tuple(r) for r in rows.all()]
+
+
+@observe_repository
+@dataclass(slots=True)
+class DataVersionRepository:
+    session: AsyncSession
+
+    async def list_versions(self) -> list[tuple[str, int, datetime]]:
+        rows = await self.session.execute(
+            select(data_versions.c.table_name, data_versions.c.version, data_versions.c.updated_at)
+        )
+        return [tuple(r) for r in rows.all()]
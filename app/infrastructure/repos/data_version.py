@@ -0,0 +1,57 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging import Logger
+from typing import Callable, Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .cruds import DataVersionRepository
+
+# таблицы, которые отслеживает миграция data_versions
+DIRECTORY_TABLES = ("addresses", "activities", "organizations", "organization_phones", "organization_activities")
+
+
+@dataclass(slots=True)
+class DataVersion:
+    # Версии таблиц справочника (data_versions двигают триггеры). Опрашиваем раз в poll_s,
+    # чтобы на запрос не тратить обращение к БД: кэш и индексы сверяются с этим снимком.
+    session_maker: async_sessionmaker[AsyncSession]
+    poll_s: float = 1.0
+
+    versions: dict[str, int] = field(default_factory=dict)
+    updated_at: dict[str, datetime] = field(default_factory=dict)
+    listeners: list[Callable[[set[str]], None]] = field(default_factory=list)
+
+    async def refresh(self) -> set[str]:
+        async with self.session_maker() as session:
+            rows = await DataVersionRepository(session).list_versions()
+
+        changed = {name for name, version, _ in rows if self.versions.get(name) != version}
+        if not changed:
+            return changed
+
+        first_load = not self.versions
+        self.versions = {name: version for name, version, _ in rows}
+        self.updated_at = {name: updated_at for name, _, updated_at in rows}
+        if not first_load:
+            for listener in self.listeners:
+                listener(changed)
+        return changed
+
+    def on_change(self, listener: Callable[[set[str]], None]) -> None:
+        self.listeners.append(listener)
+
+    def snapshot(self, tables: Iterable[str]) -> tuple[int, ...]:
+        return tuple(self.versions.get(name, 0) for name in tables)
+
+    async def run(self, log: Logger) -> None:
+        while True:
+            await asyncio.sleep(self.poll_s)
+            try:
+                changed = await self.refresh()
+            except Exception:
+                log.exception("Failed to poll data versions")
+            else:
+                if changed:
+                    log.info("Data changed: %s", ", ".join(sorted(changed)))
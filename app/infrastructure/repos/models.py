@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy import Integer, Text, ForeignKey, UniqueConstraint, Index, Float, Table, Column
+from sqlalchemy import Integer, BigInteger, Text, DateTime, ForeignKey, UniqueConstraint, Index, Float, Table, Column, table, column, func
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -36,6 +36,17 @@ class Address(Base):
     )
 
 
+# поиск здания без учёта регистра (AddressRepository.get_address_id) — одна проба по этому индексу
+Index(
+    "ix_addresses_lookup_ci",
+    func.lower(Address.country),
+    func.lower(Address.city),
+    func.lower(Address.street),
+    Address.house,
+    Address.building,
+)
+
+
 class Activity(Base):
     __tablename__ = "activities"
 
@@ -96,6 +107,30 @@ organization_activities = Table(
 )
 
 
+activity_closure = Table(
+    "activity_closure",
+    Base.metadata,
+    Column(
+        "ancestor_id",
+        ForeignKey(
+            "activities.id",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    ),
+    Column(
+        "descendant_id",
+        ForeignKey(
+            "activities.id",
+            ondelete="CASCADE",
+        ),
+        primary_key=True,
+    ),
+    Column("depth", Integer, nullable=False),
+    Index("ix_activity_closure_descendant", "descendant_id"),
+)
+
+
 class Organization(Base):
     __tablename__ = "organizations"
 
@@ -130,6 +165,7 @@ class Organization(Base):
 
     __table_args__ = (
         Index("ix_org_name", "name"),
+        Index("ix_org_name_id", "name", "id"),
     )
 
 
@@ -158,9 +194,44 @@ class OrganizationPhone(Base):
     )
 
 
+# Счётчик изменений по таблицам справочника, обновляется триггерами (см. миграцию data_versions).
+data_versions = Table(
+    "data_versions",
+    Base.metadata,
+    Column("table_name", Text, primary_key=True),
+    Column("version", BigInteger, nullable=False, server_default="0"),
+    Column("updated_at", DateTime(timezone=True), nullable=False, server_default=func.current_timestamp()),
+)
+
+
+# Виртуальная R*Tree-таблица (только SQLite) создаётся миграцией, поэтому её нет в Base.metadata.
+addresses_rtree = table(
+    "addresses_rtree",
+    column("id", Integer),
+    column("min_lat", Float),
+    column("max_lat", Float),
+    column("min_lon", Float),
+    column("max_lon", Float),
+)
+
+
+# FTS5-индекс имён организаций (только SQLite, trigram-токенизатор), тоже из миграции.
+organizations_fts = table(
+    "organizations_fts",
+    column("rowid", Integer),
+    column("name", Text),
+    column("rank", Float),
+)
+
+
 __all__ = [
     "Organization",
     "OrganizationPhone",
     "Activity",
     "Address",
+    "organization_activities",
+    "activity_closure",
+    "data_versions",
+    "addresses_rtree",
+    "organizations_fts",
 ]
\ No newline at end of file
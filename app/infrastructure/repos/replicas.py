@@ -0,0 +1,162 @@
+import asyncio
+from dataclasses import dataclass, field
+from logging import Logger
+from time import monotonic
+from typing import Literal
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.infrastructure.core.metrics import READ_SESSIONS
+from .cruds import DataVersionRepository
+from .data_version import DataVersion
+from .session import async_session
+
+PRIMARY = "primary"
+PENDING = "pending check after data change"
+
+
+@dataclass(slots=True)
+class Replica:
+    name: str
+    engine: AsyncEngine
+    session_maker: async_sessionmaker[AsyncSession]
+    # до первой успешной проверки реплика не используется
+    healthy: bool = False
+    reason: str | None = "not checked yet"
+
+    def __post_init__(self) -> None:
+        # обрыв соединения — сразу выводим из ротации, вернёт её следующая проверка
+        event.listen(self.engine.sync_engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect:
+            self.healthy, self.reason = False, "disconnected"
+
+    def in_flight(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()
+
+
+class ReplicaRoutingSession(Session):
+    # Узел выбирается при первом запросе сессии (не при её создании: ответ из кэша не занимает
+    # соединение и не влияет на least-conn) и закрепляется за сессией до её закрытия.
+    _read_bind: Engine | None = None
+
+    def get_bind(self, mapper=None, **kw) -> Engine:
+        if self._read_bind is None:
+            self._read_bind = self.info["replicas"].choose_bind()
+        return self._read_bind
+
+    def close(self) -> None:
+        super().close()
+        self._read_bind = None
+
+
+@dataclass(slots=True)
+class ReplicaSet:
+    # Сессии для чтения: реплика по round-robin или least-conn, при недоступности или отставании
+    # реплик — primary. Реплика считается здоровой, если отвечает и её data_versions не отстают
+    # от primary: иначе устаревший ответ попал бы в кэш под новой версией данных.
+    # primary — движок только для чтения (read_only_engine).
+    primary: AsyncEngine
+    data_version: DataVersion
+    strategy: Literal["round_robin", "least_conn"] = "round_robin"
+    check_s: float = 5.0
+    stickiness_s: float = 0.0
+    check_timeout_s: float = 2.0
+
+    replicas: list[Replica] = field(default_factory=list)
+    primary_until: float = 0.0
+    _next: int = 0
+    # растёт при каждом изменении данных: результат проверки, начатой раньше, уже не годится
+    _generation: int = 0
+    _recheck: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def add(self, url: str, engine: AsyncEngine) -> Replica:
+        name = make_url(url).render_as_string(hide_password=True)
+        replica = Replica(name, engine, async_session(engine))
+        self.replicas.append(replica)
+        return replica
+
+    def choose(self) -> Replica | None:
+        if monotonic() < self.primary_until:
+            return None
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        # сдвиг по кругу: и очередь для round-robin, и разбивка ничьих для least-conn
+        start = self._next % len(healthy)
+        self._next += 1
+        candidates = healthy[start:] + healthy[:start]
+        if self.strategy == "least_conn":
+            return min(candidates, key=lambda r: r.in_flight())
+        return candidates[0]
+
+    def choose_bind(self) -> Engine:
+        replica = self.choose()
+        READ_SESSIONS.inc(PRIMARY if replica is None else replica.name)
+        return (self.primary if replica is None else replica.engine).sync_engine
+
+    def session_maker(self) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(
+            expire_on_commit=False,
+            class_=AsyncSession,
+            sync_session_class=ReplicaRoutingSession,
+            info={"replicas": self},
+        )
+
+    def on_data_change(self, changed: set[str]) -> None:
+        # данные на primary изменились: до перепроверки (и окна stickiness) реплики могут отставать
+        if self.stickiness_s > 0:
+            self.primary_until = monotonic() + self.stickiness_s
+        for replica in self.replicas:
+            if replica.healthy:
+                replica.healthy, replica.reason = False, PENDING
+        self._generation += 1
+        self._recheck.set()
+
+    async def check(self, log: Logger | None = None) -> None:
+        generation, expected = self._generation, dict(self.data_version.versions)
+        results = await asyncio.gather(*(self._check_one(r, expected) for r in self.replicas))
+        if generation != self._generation:
+            return
+        for replica, reason in zip(self.replicas, results):
+            # в лог — только смена состояния; догнавшая после изменения данных реплика не новость
+            if log is not None and reason != replica.reason and not (reason is None and replica.reason == PENDING):
+                if reason is None:
+                    log.info("Read replica %s is up", replica.name)
+                else:
+                    log.warning("Read replica %s is out of rotation: %s", replica.name, reason)
+            replica.healthy, replica.reason = reason is None, reason
+
+    async def _check_one(self, replica: Replica, expected: dict[str, int]) -> str | None:
+        try:
+            async with replica.session_maker() as session:
+                rows = await asyncio.wait_for(DataVersionRepository(session).list_versions(), self.check_timeout_s)
+        except Exception as exc:
+            # первая строка: SQLAlchemy дописывает ссылку на документацию
+            return f"{type(exc).__name__}: {str(exc).splitlines()[0] if str(exc) else ''}"
+        versions = {name: version for name, version, _ in rows}
+        behind = sorted(name for name, version in expected.items() if versions.get(name, 0) < version)
+        return f"behind primary on {', '.join(behind)}" if behind else None
+
+    async def run(self, log: Logger) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._recheck.wait(), self.check_s)
+            except asyncio.TimeoutError:
+                pass
+            self._recheck.clear()
+            try:
+                await self.check(log)
+            except Exception:
+                log.exception("Failed to check read replicas")
+
+    def health(self) -> list[tuple[tuple[str], int]]:
+        return [((r.name,), int(r.healthy)) for r in self.replicas]
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
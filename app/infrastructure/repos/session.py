@@ -1,18 +1,152 @@
+import math
+from time import perf_counter
+
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     create_async_engine,
     AsyncSession,
     async_sessionmaker,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.infrastructure.core.metrics import POOL_WAIT
+from app.infrastructure.core.timing import current
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # сколько запрос ждал соединение из пула (включая открытие нового) — db_pool_wait_seconds
+    # и pool в Server-Timing
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = perf_counter() - started
+            POOL_WAIT.observe(waited)
+            timing = current()
+            if timing is not None:
+                timing.pool_s += waited
 
 
-def async_engine(db_url) -> AsyncEngine:
-    return create_async_engine(
+def async_engine(db_url, *, read_only: bool = False, **options) -> AsyncEngine:
+    # options — параметры пула и драйвера (build_engine_options)
+    options.setdefault("pool_pre_ping", True)
+    if ":memory:" not in db_url:
+        # in-memory SQLite живёт на одном соединении (StaticPool), пул там не нужен
+        options["poolclass"] = TimedQueuePool
+    aengine = create_async_engine(
         db_url,
-        pool_pre_ping=True,
         echo=False,
+        **options,
     )
+    if aengine.dialect.name == "sqlite":
+        event.listen(aengine.sync_engine, "connect", _sqlite_math_functions)
+    if not read_only:
+        return aengine
+    if aengine.dialect.name == "sqlite":
+        # весь пул только для чтения: query_only включается один раз на соединение
+        event.listen(aengine.sync_engine, "connect", _sqlite_query_only)
+        return aengine
+    return _pg_read_only(aengine)
+
+
+def read_only_engine(aengine: AsyncEngine, **options) -> AsyncEngine:
+    # Движок для GET-запросов к тому же primary: транзакции только для чтения, сервер не ведёт
+    # учёт под запись. DEFERRABLE на Postgres действует только при SERIALIZABLE, иначе безвреден.
+    if aengine.dialect.name == "postgresql":
+        return _pg_read_only(aengine)
+    if isinstance(aengine.sync_engine.pool, TimedQueuePool):
+        # SQLite: query_only — свойство соединения, поэтому отдельный пул к тому же файлу
+        return async_engine(aengine.url.render_as_string(hide_password=False), read_only=True, **options)
+    # in-memory SQLite: второй пул открыл бы другую, пустую базу
+    return aengine
+
+
+def _pg_read_only(aengine: AsyncEngine) -> AsyncEngine:
+    # общий пул; asyncpg открывает транзакцию сразу как BEGIN READ ONLY DEFERRABLE (без лишнего
+    # round trip), при возврате в пул режим соединения сбрасывается
+    return aengine.execution_options(postgresql_readonly=True, postgresql_deferrable=True)
+
+
+def _sqlite_query_only(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+
+# радиусный поиск (haversine в SQL); встроенные в SQLite есть только при SQLITE_ENABLE_MATH_FUNCTIONS (3.35+)
+SQLITE_MATH_FUNCTIONS = {
+    "radians": (1, math.radians),
+    "sin": (1, math.sin),
+    "cos": (1, math.cos),
+    "asin": (1, math.asin),
+    "sqrt": (1, math.sqrt),
+    "pow": (2, math.pow),
+}
+
+
+def _sql_math(fn):
+    # как встроенные: NULL на входе или вне области определения -> NULL
+    def wrapper(*args):
+        if any(a is None for a in args):
+            return None
+        try:
+            return fn(*args)
+        except (ValueError, OverflowError):
+            return None
+
+    return wrapper
+
+
+def register_sqlite_math_functions(dbapi_connection) -> None:
+    for name, (n_args, fn) in SQLITE_MATH_FUNCTIONS.items():
+        dbapi_connection.create_function(name, n_args, _sql_math(fn), deterministic=True)
+
+
+def _sqlite_math_functions(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT radians(1), sin(1), cos(1), asin(1), sqrt(1), pow(1, 1)")
+    except Exception:
+        # сборка без математических функций: подставляем Python-версии
+        register_sqlite_math_functions(dbapi_connection)
+    finally:
+        cursor.close()
+
+
+def pool_stats(aengine: AsyncEngine, *labels: str) -> list[tuple[tuple[str, ...], int]]:
+    # labels — метки пула (engine, role), к ним добавляется state
+    pool = aengine.sync_engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return []
+    return [
+        ((*labels, "size"), pool.size()),
+        ((*labels, "checked_out"), pool.checkedout()),
+        ((*labels, "checked_in"), pool.checkedin()),
+        # QueuePool.overflow() отрицательный, пока основной пул не заполнен
+        ((*labels, "overflow"), max(pool.overflow(), 0)),
+    ]
 
 
 def async_session(aengine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
     return async_sessionmaker(aengine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def sqlite_virtual_tables(aengine: AsyncEngine) -> set[str]:
+    # R*Tree / FTS5 таблицы появляются только после sqlite-миграций, поэтому проверяем их наличие при старте
+    if aengine.dialect.name != "sqlite":
+        return set()
+    async with aengine.connect() as conn:
+        rows = await conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'")
+        )
+        return {r[0] for r in rows.all()}
+
+
+async def pg_extensions(aengine: AsyncEngine) -> set[str]:
+    if aengine.dialect.name != "postgresql":
+        return set()
+    async with aengine.connect() as conn:
+        rows = await conn.execute(text("SELECT extname FROM pg_extension"))
+        return {r[0] for r in rows.all()}
@@ -0,0 +1,136 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from .cruds import AddressRepository
+from .utils.geo import MAX_DISTANCE_M, bounding_boxes, haversine_km
+
+
+@dataclass(slots=True)
+class AddressSpatialIndex:
+    # Равномерная сетка по координатам адресов: точки отсортированы по ключу ячейки
+    # (row * n_cols + col), поэтому ячейки одной строки сетки лежат в массиве подряд.
+    session_maker: async_sessionmaker[AsyncSession]
+    cell_deg: float = 0.05
+    ttl_s: float = 60.0
+
+    ids: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    lats: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    lons: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
+    keys: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    loaded_at: float = 0.0
+    stale: bool = True
+
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # растёт при каждом invalidate(): так видно, что адреса поменялись, пока их читали
+    _generation: int = 0
+
+    @property
+    def n_cols(self) -> int:
+        return math.ceil(360.0 / self.cell_deg) + 1
+
+    def _rows(self, lats):
+        return np.floor((np.asarray(lats) + 90.0) / self.cell_deg).astype(np.int64)
+
+    def _cols(self, lons):
+        return np.floor((np.asarray(lons) + 180.0) / self.cell_deg).astype(np.int64)
+
+    async def reload(self) -> None:
+        generation = self._generation
+        async with self.session_maker() as session:
+            rows = await AddressRepository(session).list_coordinates()
+
+        data = np.array(rows, dtype=np.float64).reshape(-1, 3)
+        lats, lons = data[:, 1], data[:, 2]
+        keys = self._rows(lats) * self.n_cols + self._cols(lons)
+        order = np.argsort(keys, kind="stable")
+
+        self.ids = np.ascontiguousarray(data[order, 0].astype(np.int64))
+        self.lats = np.ascontiguousarray(lats[order])
+        self.lons = np.ascontiguousarray(lons[order])
+        self.keys = np.ascontiguousarray(keys[order])
+        self.loaded_at = time.monotonic()
+        # invalidate() во время чтения: прочитанное могло не застать изменение, перечитаем ещё раз
+        self.stale = generation != self._generation
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self.stale = True
+
+    async def ensure_fresh(self) -> None:
+        if not self.stale and time.monotonic() - self.loaded_at < self.ttl_s:
+            return
+        async with self._lock:
+            if self.stale or time.monotonic() - self.loaded_at >= self.ttl_s:
+                await self.reload()
+
+    def _candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        spans = []
+        for lat_min, lat_max, lon_min, lon_max in bounding_boxes(lat, lon, radius_km):
+            rows = np.arange(self._rows(lat_min), self._rows(lat_max) + 1, dtype=np.int64)
+            starts = np.searchsorted(self.keys, rows * self.n_cols + self._cols(lon_min), side="left")
+            ends = np.searchsorted(self.keys, rows * self.n_cols + self._cols(lon_max), side="right")
+            spans.extend(np.arange(s, e) for s, e in zip(starts, ends) if e > s)
+        return np.concatenate(spans) if spans else np.empty(0, dtype=np.int64)
+
+    def search(self, lat: float, lon: float, radius_m: float) -> tuple[np.ndarray, np.ndarray]:
+        radius_km = radius_m / 1000.0
+        idx = self._candidates(lat, lon, radius_km)
+
+        distances = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+        mask = distances <= radius_km
+        idx, distances = idx[mask], distances[mask]
+
+        order = np.argsort(distances, kind="stable")
+        return self.ids[idx[order]], distances[order] * 1000.0
+
+    async def query(
+            self,
+            lat: float,
+            lon: float,
+            radius_m: int,
+            limit: int | None = None,
+            offset: int | None = None,
+    ) -> tuple[list[int], list[float]]:
+        await self.ensure_fresh()
+        ids, distances_m = self.search(lat, lon, radius_m)
+
+        start = offset or 0
+        stop = start + limit if limit else None
+        return ids[start:stop].tolist(), distances_m[start:stop].tolist()
+
+    async def query_many(
+            self,
+            points: "list[tuple[float, float, int, int | None]]",
+    ) -> list[list[int]]:
+        await self.ensure_fresh()
+        return [
+            self.search(lat, lon, radius_m)[0][:limit].tolist()
+            for lat, lon, radius_m, limit in points
+        ]
+
+    async def nearest(
+            self,
+            lat: float,
+            lon: float,
+            k: int,
+            allowed_ids: "set[int] | None" = None,
+            start_radius_m: float = 1000.0,
+    ) -> tuple[list[int], list[float]]:
+        await self.ensure_fresh()
+        allowed = None if allowed_ids is None else np.fromiter(allowed_ids, dtype=np.int64, count=len(allowed_ids))
+
+        radius_m = start_radius_m
+        while True:
+            ids, distances_m = self.search(lat, lon, radius_m)
+            if allowed is not None:
+                mask = np.isin(ids, allowed)
+                ids, distances_m = ids[mask], distances_m[mask]
+
+            if len(ids) >= k or radius_m >= MAX_DISTANCE_M:
+                return ids[:k].tolist(), distances_m[:k].tolist()
+            radius_m = min(radius_m * 4, MAX_DISTANCE_M)
@@ -1 +1,2 @@
-from .db_url_handler import build_db_url
\ No newline at end of file
+from .db_url_handler import build_db_url, build_replica_urls
+from .engine_options import build_engine_options
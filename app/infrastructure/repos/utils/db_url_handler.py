@@ -32,12 +32,38 @@ def build_db_url(settings: BaseSettings) -> str:
                     f"Postgres config is missing required var(s): {', '.join(missing)}"
                 )
 
-            password = settings.db_pass.get_secret_value()
-            return (
-                "postgresql+asyncpg://"
-                f"{quote_plus(settings.db_user)}:{quote_plus(password)}"
-                f"@{settings.db_host}:{settings.db_port}/{settings.db_name}"
-            )
+            return _postgres_url(settings, settings.db_host, settings.db_port)
 
         case _:
             raise RuntimeError(f"Unsupported DB_TITLE: {driver!r}")
+
+
+def build_replica_urls(settings: BaseSettings) -> list[str]:
+    # DB_REPLICA_URLS — готовые URL; иначе файлы (sqlite) или host:port (postgres) с теми же
+    # учётными данными и именем базы, что у primary
+    if settings.db_replica_urls:
+        return list(settings.db_replica_urls)
+
+    driver = (settings.db_title or "sqlite").lower()
+    match driver:
+        case "sqlite":
+            return [f"sqlite+aiosqlite:///{Path(f).as_posix()}" for f in settings.db_replica_files]
+
+        case "postgres":
+            urls = []
+            for replica in settings.db_replica_hosts:
+                host, _, port = replica.partition(":")
+                urls.append(_postgres_url(settings, host, int(port) if port else settings.db_port))
+            return urls
+
+        case _:
+            raise RuntimeError(f"Unsupported DB_TITLE: {driver!r}")
+
+
+def _postgres_url(settings: BaseSettings, host: str, port: int) -> str:
+    password = settings.db_pass.get_secret_value()
+    return (
+        "postgresql+asyncpg://"
+        f"{quote_plus(settings.db_user)}:{quote_plus(password)}"
+        f"@{host}:{port}/{settings.db_name}"
+    )
@@ -0,0 +1,26 @@
+from typing import Any
+
+from pydantic_settings import BaseSettings
+
+
+def build_engine_options(settings: BaseSettings, db_url: str) -> dict[str, Any]:
+    # in-memory SQLite живёт на одном соединении (StaticPool): настраивать нечего
+    if ":memory:" in db_url:
+        return {}
+
+    options: dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_s,
+        "pool_recycle": settings.db_pool_recycle_s,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if db_url.startswith("postgresql+asyncpg"):
+        connect_args: dict[str, Any] = {
+            # кэш подготовленных выражений на соединение; 0 — для pgbouncer в режиме transaction
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        }
+        if settings.db_pg_server_settings:
+            connect_args["server_settings"] = dict(settings.db_pg_server_settings)
+        options["connect_args"] = connect_args
+    return options
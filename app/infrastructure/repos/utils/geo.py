@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+# половина длины экватора: дальше этого на сфере точек нет
+MAX_DISTANCE_M = math.pi * EARTH_RADIUS_KM * 1000.0
+# запас на округление: точка ровно на границе круга не должна выпасть из bbox
+BBOX_EPS_DEG = 1e-9
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    # bbox круга на той же сфере, что и haversine_km. Долготы могут выходить за ±180
+    # (круг пересекает антимеридиан) — на диапазоны их делит bounding_boxes.
+    d = radius_km / EARTH_RADIUS_KM
+    d_lat = math.degrees(d) + BBOX_EPS_DEG
+    lat_min, lat_max = lat - d_lat, lat + d_lat
+    if lat_min <= -90.0 or lat_max >= 90.0:
+        # круг накрывает полюс: годится любая долгота
+        return max(lat_min, -90.0), min(lat_max, 90.0), -180.0, 180.0
+    d_lon = math.degrees(math.asin(min(1.0, math.sin(d) / math.cos(math.radians(lat))))) + BBOX_EPS_DEG
+    return lat_min, lat_max, lon - d_lon, lon + d_lon
+
+
+def bounding_boxes(lat: float, lon: float, radius_km: float) -> list[tuple[float, float, float, float]]:
+    # bbox в пределах [-180, 180]: через антимеридиан — два прямоугольника
+    lat_min, lat_max, lon_min, lon_max = bounding_box(lat, lon, radius_km)
+    if lon_max - lon_min >= 360.0:
+        return [(lat_min, lat_max, -180.0, 180.0)]
+    if lon_min < -180.0:
+        return [(lat_min, lat_max, lon_min + 360.0, 180.0), (lat_min, lat_max, -180.0, lon_max)]
+    if lon_max > 180.0:
+        return [(lat_min, lat_max, lon_min, 180.0), (lat_min, lat_max, -180.0, lon_max - 360.0)]
+    return [(lat_min, lat_max, lon_min, lon_max)]
+
+
+def haversine_km(lat, lon, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    # lat/lon могут быть скалярами или столбцами (N, 1) — тогда numpy посчитает матрицу расстояний
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def radius_matches(
+        q_lats: np.ndarray,
+        q_lons: np.ndarray,
+        radii_km: np.ndarray,
+        lats: np.ndarray,
+        lons: np.ndarray,
+        max_cells: int = 2_000_000,
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    # Для каждой точки запроса — индексы кандидатов в радиусе и расстояния (км), по возрастанию расстояния.
+    # Матрица (запросы x кандидаты) считается блоками, чтобы не раздувать память на больших выборках.
+    result = []
+    step = max(1, max_cells // max(len(lats), 1))
+    for start in range(0, len(q_lats), step):
+        block = slice(start, start + step)
+        distances = haversine_km(q_lats[block, None], q_lons[block, None], lats[None, :], lons[None, :])
+        for row, radius_km in zip(distances, radii_km[block]):
+            idx = np.flatnonzero(row <= radius_km)
+            order = np.argsort(row[idx], kind="stable")
+            result.append((idx[order], row[idx[order]]))
+    return result
@@ -1,9 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware import Middleware
 
 from app.infrastructure.core import settings
-from app.infrastructure.core import lifespan
+from app.infrastructure.core.lifespan import lifespan
+from app.api.conditional import ConditionalGetMiddleware
+from app.api.server_timing import ServerTimingMiddleware
+from app.api.metrics import MetricsMiddleware
+from app.infrastructure.core.metrics import REGISTRY
 from app.api.routers import orgs_router, addresses_router
 
 
@@ -17,6 +22,12 @@ def create_app() -> FastAPI:
             allow_headers=["*"],
         ),
     ]
+    if settings.metrics:
+        middleware.append(Middleware(MetricsMiddleware))
+    if settings.server_timing:
+        middleware.append(Middleware(ServerTimingMiddleware))
+    if settings.conditional_get:
+        middleware.append(Middleware(ConditionalGetMiddleware))
 
     fastapi_app = FastAPI(
         title=settings.app_title,
@@ -32,11 +43,33 @@ def create_app() -> FastAPI:
     fastapi_app.include_router(orgs_router)
     fastapi_app.include_router(addresses_router)
 
+    @fastapi_app.get("/cache/stats")
+    async def cache_stats(request: Request):
+        cache = request.app.state.response_cache
+        flights = request.app.state.single_flight
+        return {
+            "enabled": cache is not None,
+            **(cache.snapshot() if cache is not None else {}),
+            "single_flight": flights.snapshot() if flights is not None else None,
+        }
+
+    if settings.metrics:
+        @fastapi_app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+        async def metrics():
+            return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
     if settings.debug:
         @fastapi_app.get("/info")
         async def app_info():
             return {**settings.model_dump()}
 
+        @fastapi_app.get("/debug/slow-queries")
+        async def slow_queries(request: Request, limit: int | None = None):
+            journal = request.app.state.slow_queries
+            if journal is None:
+                return {"enabled": False, "entries": []}
+            return {"enabled": True, **journal.snapshot(), "entries": journal.entries(limit)}
+
     return fastapi_app
 
 
@@ -0,0 +1,254 @@
+"""
+Бенчмарк эндпоинтов: приложение целиком (middleware, роутеры, репозитории) гоняется
+in-process через ASGI поверх SQLite-базы из datagen.py. По каждому сценарию —
+p50/p95/p99, запросов в секунду и число SQL-запросов на HTTP-запрос.
+
+    python benchmarks/bench_endpoints.py --scale 10k                  # сравнить с baseline.json
+    python benchmarks/bench_endpoints.py --scale 10k --save-baseline  # записать новый baseline
+    python benchmarks/bench_endpoints.py --only near --requests 500
+
+База кэшируется во временном каталоге (по scale и seed), --rebuild пересоздаёт её.
+Кэш ответов выключен (иначе меряется только он), --cache включает.
+Код выхода 1 — если SQL-запросов на HTTP-запрос стало больше, чем в baseline: это число
+от машины не зависит. Латентность в baseline.json снята на одной конкретной машине, поэтому
+p95 только печатается; проверять его как регрессию (--tolerance 0.25) имеет смысл лишь против
+baseline, записанного на той же машине (--save-baseline перед изменениями).
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import orjson
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Settings создаются при первом импорте app (его тянет и datagen), заголовок нужен до него
+os.environ.setdefault("APP_TITLE", "secunda-bench")
+
+from datagen import CITIES, SCALES, Dataset, build_sqlite
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# (method, url, json body)
+Call = tuple[str, str, Any]
+
+
+@dataclass(slots=True)
+class Scenario:
+    name: str
+    make: Callable[[random.Random], Call]
+    # тяжёлые сценарии (весь справочник одним ответом) гоняем реже
+    share: float = 1.0
+
+
+def _point(rng: random.Random) -> tuple[float, float]:
+    _, _, lat, lon, _ = rng.choice(CITIES)
+    return round(lat + rng.gauss(0, 0.05), 6), round(lon + rng.gauss(0, 0.08), 6)
+
+
+def _address_params(address: dict[str, Any]) -> dict[str, Any]:
+    return {k: address[k] for k in ("country", "city", "street", "house", "building") if address[k] is not None}
+
+
+def scenarios(dataset: Dataset) -> list[Scenario]:
+    addresses = dataset.addresses()
+    activities = [a["name"] for a in dataset.activities()]
+    roots = [a["name"] for a in dataset.activities() if a["parent"] is None]
+    words = ["Альфа", "Норд", "Титан", "ьфа", "Гран", "Ради", "Меридиан 1"]
+    n = dataset.orgs
+
+    def get(path: str, **params) -> Call:
+        from urllib.parse import urlencode
+        return "GET", f"{path}?{urlencode(params)}" if params else path, None
+
+    return [
+        Scenario("orgs_page", lambda r: get("/orgs", limit=100)),
+        Scenario("org_by_id", lambda r: get(f"/orgs/{r.randint(1, n)}")),
+        Scenario("orgs_by_activity_leaf", lambda r: get("/orgs/activity", activity=r.choice(activities))),
+        Scenario("orgs_by_activity_root", lambda r: get("/orgs/activity", activity=r.choice(roots))),
+        Scenario("orgs_by_address", lambda r: get("/orgs/address", **_address_params(r.choice(addresses)))),
+        Scenario("orgs_search", lambda r: get("/orgs/search", q=r.choice(words))),
+        Scenario("orgs_batch", lambda r: ("POST", "/orgs/batch", {"ids": r.sample(range(1, n + 1), min(100, n))})),
+        Scenario("orgs_address_batch", lambda r: (
+            "POST", "/orgs/address/batch",
+            {"addresses": [_address_params(a) for a in r.sample(addresses, min(50, len(addresses)))]},
+        )),
+        Scenario("addresses_all", lambda r: get("/addresses"), share=0.05),
+        Scenario("addresses_near", lambda r: get("/addresses/near", **dict(zip(("lat", "lon"), _point(r))), radius_m=1000)),
+        Scenario("addresses_near_grouped", lambda r: get(
+            "/addresses/near/grouped", **dict(zip(("lat", "lon"), _point(r))), radius_m=1000, limit=50,
+        )),
+        Scenario("addresses_near_batch", lambda r: (
+            "POST", "/addresses/near/batch",
+            {"queries": [{"lat": lat, "lon": lon, "radius_m": 500} for lat, lon in (_point(r) for _ in range(20))]},
+        )),
+        Scenario("addresses_nearest", lambda r: get("/addresses/nearest", **dict(zip(("lat", "lon"), _point(r))), k=10)),
+        Scenario("addresses_nearest_activity", lambda r: get(
+            "/addresses/nearest", **dict(zip(("lat", "lon"), _point(r))), k=10, activity=r.choice(roots),
+        )),
+    ]
+
+
+def percentile(q: list[float], p: int) -> float:
+    return q[p - 1]
+
+
+async def run_scenario(client, scenario: Scenario, requests: int, warmup: int, seed: int, queries: list[int]) -> dict:
+    # один и тот же seed в каждом раунде: раунды меряют одни и те же запросы
+    rng = random.Random(f"{scenario.name}:{seed}")
+    requests = max(int(requests * scenario.share), 5)
+    calls = [scenario.make(rng) for _ in range(warmup + requests)]
+
+    async def send(call: Call):
+        method, url, body = call
+        return await client.request(method, url, json=body)
+
+    for call in calls[:warmup]:
+        await send(call)
+
+    gc.collect()
+    latencies, errors = [], 0
+    queries_before = queries[0]
+    started = time.perf_counter()
+    for call in calls[warmup:]:
+        t = time.perf_counter()
+        response = await send(call)
+        latencies.append((time.perf_counter() - t) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(q, 50), 3),
+        "p95_ms": round(percentile(q, 95), 3),
+        "p99_ms": round(percentile(q, 99), 3),
+        "rps": round(requests / elapsed, 1),
+        "queries_per_request": round((queries[0] - queries_before) / requests, 2),
+    }
+
+
+async def bench(args: argparse.Namespace, dataset: Dataset) -> dict[str, dict]:
+    import httpx
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    from app.main import create_app
+
+    queries = [0]
+
+    def count_query(*_):
+        queries[0] += 1
+
+    event.listen(Engine, "before_cursor_execute", count_query)
+
+    app = create_app()
+    selected = [s for s in scenarios(dataset) if not args.only or args.only in s.name]
+    rounds: dict[str, list[dict]] = {s.name: [] for s in selected}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for _ in range(args.rounds):
+                for scenario in selected:
+                    rounds[scenario.name].append(
+                        await run_scenario(client, scenario, args.requests, args.warmup, args.seed, queries)
+                    )
+
+    # медиана по раундам сглаживает разовые паузы (GC, соседи по машине)
+    results = {}
+    for name, runs in rounds.items():
+        results[name] = r = {k: statistics.median(run[k] for run in runs) for k in runs[0]}
+        print(
+            f"{name:28} p50 {r['p50_ms']:8.2f}  p95 {r['p95_ms']:8.2f}  p99 {r['p99_ms']:8.2f} ms"
+            f"  {r['rps']:8.1f} rps  {r['queries_per_request']:6.2f} q/req"
+            + (f"  errors {r['errors']}" if r["errors"] else "")
+        )
+    return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], tolerance: float | None) -> list[str]:
+    regressions = []
+    print(f"\n{'vs baseline':28} {'p95':>10} {'q/req':>10}")
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:28} {'new':>10}")
+            continue
+        delta = (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        dq = r["queries_per_request"] - base["queries_per_request"]
+        print(f"{name:28} {delta:+10.1%} {dq:+10.2f}")
+        if tolerance is not None and delta > tolerance:
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {r['p95_ms']} ms")
+        if dq > 0:
+            regressions.append(f"{name}: queries/request {base['queries_per_request']} -> {r['queries_per_request']}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=100, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3, help="report the median over this many rounds")
+    parser.add_argument("--only", help="run scenarios whose name contains this substring")
+    parser.add_argument("--db", type=Path, help="SQLite file (default: cached in the temp dir)")
+    parser.add_argument("--rebuild", action="store_true", help="regenerate the database")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance", type=float,
+        help="fail on a relative p95 slowdown above this (only against a baseline saved on the same machine)",
+    )
+    args = parser.parse_args()
+
+    dataset = Dataset(SCALES[args.scale], args.seed)
+    db = args.db or Path(tempfile.gettempdir()) / f"secunda-bench-{args.scale}-{args.seed}.sqlite"
+    if args.rebuild or not db.exists():
+        print(f"Building {db} ...")
+        build_sqlite(dataset, db)
+
+    # настройки приложения читаются из окружения при старте (lifespan), поэтому до импорта app
+    os.environ.update({
+        "DB_TITLE": "sqlite",
+        "DB_FILE": str(db),
+        "LOG_LEVEL": "WARNING",
+        "DEBUG": "false",
+        "RESPONSE_CACHE": "true" if args.cache else "false",
+        # фоновый опрос data_versions не должен попадать в подсчёт запросов
+        "DATA_VERSION_POLL_S": "3600",
+    })
+    results = asyncio.run(bench(args, dataset))
+
+    stored = orjson.loads(args.baseline.read_bytes()) if args.baseline.exists() else {}
+    key = f"{args.scale}:{args.seed}"
+    if args.save_baseline:
+        stored[key] = {**stored.get(key, {}), **results}
+        args.baseline.write_bytes(orjson.dumps(stored, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS) + b"\n")
+        print(f"\nBaseline saved to {args.baseline} [{key}]")
+        return 0
+
+    if key not in stored:
+        print(f"\nNo baseline for {key} in {args.baseline}")
+        return 0
+    regressions = compare(results, stored[key], args.tolerance)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Микробенчмарк сериализации ответа со списком организаций:
+текущие мапперы (Pydantic + response_model) против словарей + orjson.
+
+    python benchmarks/bench_serializers.py --orgs 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.mappers.organizations import orgs_to_out, orgs_to_dicts
+from app.api.responses import fast_json_response
+from app.api.schemas import OrgsInBuildingResponse
+from app.infrastructure.repos.models import Address, Organization, OrganizationPhone, Activity
+
+
+def make_orgs(n: int) -> list[Organization]:
+    addresses = [
+        Address(id=i, country="Россия", city="Москва", street=f"Улица {i}", house=i % 1000 + 1,
+                building=None if i % 3 else 2, lat=55.7 + i * 1e-4, lon=37.6 + i * 1e-4)
+        for i in range(1, n // 5 + 2)
+    ]
+    activities = [Activity(id=i, name=f"Деятельность {i}") for i in range(1, 21)]
+    return [
+        Organization(
+            id=i,
+            name=f"Организация {i}",
+            address=addresses[i % len(addresses)],
+            phones=[OrganizationPhone(phone=f"8-800-{i:03d}-{j}") for j in range(2)],
+            activities=[activities[i % 20], activities[(i * 7) % 20]],
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+async def current(orgs: list[Organization], field) -> bytes:
+    # то, что делает FastAPI: маппер -> валидация response_model -> jsonable -> json.dumps
+    content = await serialize_response(field=field, response_content={"organizations": orgs_to_out(orgs), "next_cursor": None})
+    return JSONResponse(content).body
+
+
+async def fast(orgs: list[Organization], field) -> bytes:
+    return fast_json_response({"organizations": orgs_to_dicts(orgs), "next_cursor": None}).body
+
+
+async def bench(fn, orgs, field, repeat: int) -> float:
+    await fn(orgs, field)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn(orgs, field)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def main(n: int, repeat: int) -> None:
+    orgs = make_orgs(n)
+    field = create_model_field("Response_bench", OrgsInBuildingResponse, mode="serialization")
+
+    assert await current(orgs, field) == await fast(orgs, field), "ответы различаются"
+
+    results = {name: await bench(fn, orgs, field, repeat) for name, fn in (("current", current), ("fast", fast))}
+    for name, ms in results.items():
+        print(f"{name:>8}: {ms:8.3f} ms/ответ ({n} организаций)")
+    print(f" speedup: {results['current'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orgs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.orgs, args.repeat))
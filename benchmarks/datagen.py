@@ -0,0 +1,237 @@
+"""
+Детерминированный генератор справочника для бенчмарков: одинаковые scale и seed
+дают одни и те же данные (а значит и одни и те же id в свежей базе).
+
+    python benchmarks/datagen.py --scale 100k --out /tmp/bench-data   # файлы для app.cli.import_data
+    python benchmarks/datagen.py --scale 1m --db /tmp/bench-1m.sqlite  # сразу готовая SQLite-база
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator
+
+import orjson
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# (страна, город, широта, долгота, вес) — вес задаёт долю зданий в городе
+CITIES = [
+    ("Россия", "Москва", 55.7558, 37.6173, 30),
+    ("Россия", "Санкт-Петербург", 59.9343, 30.3351, 15),
+    ("Россия", "Новосибирск", 55.0084, 82.9357, 6),
+    ("Россия", "Екатеринбург", 56.8389, 60.6057, 6),
+    ("Россия", "Казань", 55.7961, 49.1064, 5),
+    ("Россия", "Нижний Новгород", 56.2965, 43.9361, 4),
+    ("Россия", "Краснодар", 45.0355, 38.9753, 4),
+    ("Россия", "Самара", 53.1959, 50.1002, 3),
+    ("Беларусь", "Минск", 53.9006, 27.5590, 4),
+    ("Казахстан", "Алматы", 43.2220, 76.8512, 3),
+]
+
+STREETS = [
+    "Ленина", "Мира", "Садовая", "Советская", "Центральная", "Молодёжная", "Школьная",
+    "Лесная", "Новая", "Набережная", "Гагарина", "Пушкина", "Заводская", "Полевая",
+]
+
+# Дерево видов деятельности, не глубже трёх уровней (как и ограничивает API)
+ACTIVITY_TREE = {
+    "Еда": {
+        "Мясная продукция": ["Говядина", "Свинина", "Курица"],
+        "Молочная продукция": ["Сыры", "Кисломолочные"],
+        "Хлеб и выпечка": [],
+        "Овощи и фрукты": [],
+    },
+    "Автомобили": {
+        "Грузовые": ["Тягачи", "Самосвалы"],
+        "Легковые": ["Запчасти", "Аксессуары", "Шины и диски"],
+        "Автосервис": ["Шиномонтаж", "Кузовной ремонт"],
+    },
+    "Одежда и обувь": {
+        "Мужская одежда": [],
+        "Женская одежда": [],
+        "Детская одежда": [],
+        "Обувь": ["Спортивная обувь", "Классическая обувь"],
+    },
+    "Строительство": {
+        "Стройматериалы": ["Кирпич и блоки", "Лакокрасочные"],
+        "Ремонт квартир": [],
+        "Сантехника": [],
+    },
+    "Медицина": {
+        "Аптеки": [],
+        "Стоматология": [],
+        "Клиники": ["Детские клиники", "Диагностика"],
+    },
+    "Услуги": {
+        "Салоны красоты": [],
+        "Химчистка": [],
+        "Ремонт техники": ["Ремонт телефонов", "Ремонт компьютеров"],
+    },
+    "Образование": {
+        "Курсы": ["Языковые курсы", "IT-курсы"],
+        "Детские сады": [],
+    },
+}
+
+ORG_FORMS = ["ООО", "ИП", "АО"]
+ORG_WORDS = [
+    "Альфа", "Вектор", "Гранит", "Добрыня", "Заря", "Импульс", "Квадрат", "Лидер", "Меридиан",
+    "Норд", "Орион", "Прогресс", "Радуга", "Сигма", "Титан", "Фортуна", "Эталон", "Янтарь",
+]
+
+
+@dataclass(slots=True)
+class Dataset:
+    orgs: int
+    seed: int = 42
+
+    _addresses: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def addresses_count(self) -> int:
+        # в среднем ~3 организации на здание, но распределение сильно неравномерное
+        return max(self.orgs // 3, 1)
+
+    def activities(self) -> list[dict[str, Any]]:
+        rows = []
+        for root, children in ACTIVITY_TREE.items():
+            rows.append({"name": root, "parent": None})
+            for child, leaves in children.items():
+                rows.append({"name": child, "parent": root})
+                rows.extend({"name": leaf, "parent": child} for leaf in leaves)
+        return rows
+
+    def addresses(self) -> list[dict[str, Any]]:
+        if self._addresses:
+            return self._addresses
+        rng = random.Random(f"addresses:{self.seed}")
+        weights = [c[4] for c in CITIES]
+        # в каждом городе несколько «районов», здания кучкуются вокруг их центров
+        districts = [
+            [(lat + rng.gauss(0, 0.06), lon + rng.gauss(0, 0.1)) for _ in range(8)]
+            for _, _, lat, lon, _ in CITIES
+        ]
+        per_city = [0] * len(CITIES)
+        for _ in range(self.addresses_count):
+            c = rng.choices(range(len(CITIES)), weights)[0]
+            n = per_city[c]
+            per_city[c] += 1
+            # (улица, дом) выводятся из порядкового номера здания в городе, поэтому адреса уникальны
+            street_no, house = divmod(n, 200)
+            street = STREETS[street_no % len(STREETS)]
+            if street_no >= len(STREETS):
+                street = f"{street} {street_no // len(STREETS)}"
+            center_lat, center_lon = rng.choice(districts[c])
+            self._addresses.append({
+                "country": CITIES[c][0],
+                "city": CITIES[c][1],
+                "street": street,
+                "house": house + 1,
+                "building": rng.choice((2, 3)) if rng.random() < 0.2 else None,
+                "lat": round(center_lat + rng.gauss(0, 0.01), 6),
+                "lon": round(center_lon + rng.gauss(0, 0.015), 6),
+            })
+        return self._addresses
+
+    def organizations(self) -> Iterator[dict[str, Any]]:
+        rng = random.Random(f"organizations:{self.seed}")
+        addresses = self.addresses()
+        activities = [a["name"] for a in self.activities()]
+        # популярность видов деятельности — по Ципфу: несколько очень частых и длинный хвост
+        activity_weights = [1 / (i + 1) for i in range(len(activities))]
+        rng.shuffle(activity_weights)
+        for i in range(1, self.orgs + 1):
+            # бизнес-центры: первые здания заметно «населённее» остальных
+            address = addresses[int(len(addresses) * rng.random() ** 2)]
+            yield {
+                "name": f'{rng.choice(ORG_FORMS)} "{rng.choice(ORG_WORDS)}" {i}',
+                **address,
+                "phones": [f"8-{rng.randint(800, 999)}-{rng.randint(100, 999)}-{i % 100:02d}-{k}"
+                           for k in range(rng.choice((1, 1, 2, 3)))],
+                "activities": sorted(set(rng.choices(activities, activity_weights, k=rng.choice((1, 1, 2, 3))))),
+            }
+
+
+def write_files(dataset: Dataset, out: Path) -> None:
+    out.mkdir(parents=True, exist_ok=True)
+    with (out / "activities.csv").open("w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "parent"])
+        writer.writeheader()
+        writer.writerows(dataset.activities())
+    for name, records in (("addresses", dataset.addresses()), ("organizations", dataset.organizations())):
+        with (out / f"{name}.ndjson").open("wb") as f:
+            for record in records:
+                f.write(orjson.dumps(record) + b"\n")
+
+
+def build_sqlite(dataset: Dataset, path: Path, chunk_size: int = 20_000) -> None:
+    # схема — обычными миграциями (вместе с триггерами, R*Tree и FTS5), данные — тем же
+    # BulkImporter, что и у python -m app.cli.import_data
+    from alembic import command
+    from alembic.config import Config
+
+    path.unlink(missing_ok=True)
+    os.environ["DB_TITLE"] = "sqlite"
+    os.environ["DB_FILE"] = str(path)
+    cfg = Config()
+    cfg.set_main_option("script_location", str(ROOT / "app" / "alembic"))
+    command.upgrade(cfg, "head")
+
+    asyncio.run(_load(dataset, path, chunk_size))
+
+
+async def _load(dataset: Dataset, path: Path, chunk_size: int) -> None:
+    from app.infrastructure.repos import async_engine
+    from app.infrastructure.repos.bulk_import import BulkImporter
+
+    log = logging.getLogger("datagen")
+    engine = async_engine(f"sqlite+aiosqlite:///{path.as_posix()}")
+    try:
+        async with engine.connect() as conn:
+            importer = BulkImporter(conn, log)
+            await importer.prepare()
+            for kind, records in (
+                ("activities", dataset.activities()),
+                ("addresses", dataset.addresses()),
+                ("organizations", dataset.organizations()),
+            ):
+                started = time.perf_counter()
+                numbered = enumerate(records, start=1)
+                while chunk := list(islice(numbered, chunk_size)):
+                    async with conn.begin():
+                        await importer.import_chunk(kind, chunk)
+                log.info("%s loaded in %.1fs", kind, time.perf_counter() - started)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", type=Path, help="directory for activities.csv / addresses.ndjson / organizations.ndjson")
+    target.add_argument("--db", type=Path, help="SQLite file to (re)create")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    dataset = Dataset(SCALES[args.scale], args.seed)
+    if args.out:
+        write_files(dataset, args.out)
+    else:
+        build_sqlite(dataset, args.db)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+import httpx
+import pytest
+from alembic import command
+from alembic.config import Config
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Settings создаются при первом импорте app, а без заголовка create_app() не собирается
+os.environ.setdefault("APP_TITLE", "secunda-test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch) -> Path:
+    # пустая SQLite-база со всеми миграциями (триггеры, R*Tree, FTS5)
+    path = tmp_path / "test.sqlite"
+    monkeypatch.setenv("DB_TITLE", "sqlite")
+    monkeypatch.setenv("DB_FILE", str(path))
+    cfg = Config()
+    cfg.set_main_option("script_location", str(ROOT / "app" / "alembic"))
+    command.upgrade(cfg, "head")
+    return path
+
+
+@pytest.fixture
+def seeded_db(sqlite_db) -> Path:
+    # два здания и три организации: «Рога и копыта» (Еда -> Мясная продукция), «Молоко» (Молочная продукция),
+    # «Автосервис» (Автомобили)
+    con = sqlite3.connect(sqlite_db)
+    con.executemany(
+        "INSERT INTO activities (id, name, parent_id) VALUES (?, ?, ?)",
+        [(1, "Еда", None), (2, "Мясная продукция", 1), (3, "Молочная продукция", 1), (4, "Автомобили", None)],
+    )
+    con.executemany(
+        "INSERT INTO addresses (id, country, city, street, house, building, lat, lon) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(1, "Россия", "Москва", "Ленина", 1, None, 55.0, 37.5), (2, "Россия", "Москва", "Блюхера", 32, 1, 55.75, 37.0)],
+    )
+    con.executemany(
+        "INSERT INTO organizations (id, name, address_id) VALUES (?, ?, ?)",
+        [(1, "Рога и копыта", 1), (2, "Молоко", 1), (3, "Автосервис", 2)],
+    )
+    con.executemany(
+        "INSERT INTO organization_phones (organization_id, phone) VALUES (?, ?)",
+        [(1, "2-222-222"), (1, "8-923-666-13-13"), (3, "3-333-333")],
+    )
+    con.executemany(
+        "INSERT INTO organization_activities (organization_id, activity_id) VALUES (?, ?)",
+        [(1, 2), (2, 3), (3, 4)],
+    )
+    con.commit()
+    con.close()
+    return sqlite_db
+
+
+@pytest.fixture
+def replica_files() -> list[str]:
+    return []
+
+
+@pytest.fixture
+def client_env() -> dict[str, str]:
+    # дополнительные настройки приложения для теста (переопределяется параметризацией)
+    return {}
+
+
+@pytest.fixture
+async def app(seeded_db, replica_files, client_env, monkeypatch):
+    from app.main import create_app
+
+    # lifespan читает настройки из окружения заново (DB_TITLE/DB_FILE выставил sqlite_db)
+    for name in ("DB_URL", "DB_REPLICA_URLS", "DB_REPLICA_HOSTS", "TEST_DB"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("DB_REPLICA_FILES", json.dumps(replica_files))
+    for name, value in client_env.items():
+        monkeypatch.setenv(name, value)
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest.fixture
+async def client(app):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+TREE_SQL = """
+    WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM activities
+        UNION ALL
+        SELECT tree.ancestor_id, activities.id, tree.depth + 1
+        FROM tree
+        JOIN activities ON activities.parent_id = tree.descendant_id
+    )
+    SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+
+def closure(con: sqlite3.Connection) -> set[tuple[int, int, int]]:
+    return set(con.execute("SELECT ancestor_id, descendant_id, depth FROM activity_closure"))
+
+
+def expected(con: sqlite3.Connection) -> set[tuple[int, int, int]]:
+    return set(con.execute(TREE_SQL))
+
+
+@pytest.fixture
+def con(sqlite_db):
+    con = sqlite3.connect(sqlite_db)
+    # Еда(1) -> Мясная продукция(2) -> Свинина(3), Еда(1) -> Молочная продукция(4); Автомобили(5)
+    con.executemany(
+        "INSERT INTO activities (id, name, parent_id) VALUES (?, ?, ?)",
+        [(1, "Еда", None), (2, "Мясная продукция", 1), (3, "Свинина", 2), (4, "Молочная продукция", 1),
+         (5, "Автомобили", None)],
+    )
+    con.commit()
+    yield con
+    con.close()
+
+
+def test_insert_builds_closure(con):
+    assert closure(con) == expected(con)
+    assert (1, 3, 2) in closure(con)
+
+
+def test_move_subtree(con):
+    con.execute("UPDATE activities SET parent_id = 5 WHERE id = 2")
+    con.commit()
+
+    assert closure(con) == expected(con)
+    assert (5, 3, 2) in closure(con)
+    assert not {row for row in closure(con) if row[0] == 1 and row[1] in (2, 3)}
+
+
+def test_delete_leaf_then_insert(con):
+    con.execute("DELETE FROM activities WHERE id = 3")
+    con.commit()
+    assert closure(con) == expected(con)
+
+    # раньше оставшиеся строки closure ломали вставку на UNIQUE (ancestor_id, descendant_id)
+    con.execute("INSERT INTO activities (id, name, parent_id) VALUES (3, 'Говядина', 2)")
+    con.commit()
+    assert closure(con) == expected(con)
+
+
+def test_delete_inner_node_removes_subtree(con):
+    con.execute("INSERT INTO addresses (id, country, city, street, house) VALUES (1, 'Россия', 'Москва', 'Ленина', 1)")
+    con.execute("INSERT INTO organizations (id, name, address_id) VALUES (1, 'Рога и копыта', 1)")
+    con.execute("INSERT INTO organization_activities (organization_id, activity_id) VALUES (1, 3), (1, 4)")
+    con.execute("DELETE FROM activities WHERE id = 2")
+    con.commit()
+
+    assert {r[0] for r in con.execute("SELECT id FROM activities")} == {1, 4, 5}
+    assert closure(con) == expected(con)
+    assert list(con.execute("SELECT activity_id FROM organization_activities")) == [(4,)]
@@ -0,0 +1,74 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.infrastructure.repos import ActivityTreeIndex, async_engine, async_session
+from app.infrastructure.repos.cruds import ActivityRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def session_maker(seeded_db):
+    engine = async_engine(f"sqlite+aiosqlite:///{seeded_db}")
+    yield async_session(engine)
+    await engine.dispose()
+
+
+async def test_invalidate_during_reload_keeps_index_stale(session_maker, seeded_db, monkeypatch):
+    index = ActivityTreeIndex(session_maker)
+    read, release = asyncio.Event(), asyncio.Event()
+    list_edges = ActivityRepository.list_edges
+
+    async def slow_list_edges(self):
+        edges = await list_edges(self)
+        read.set()
+        await release.wait()
+        return edges
+
+    monkeypatch.setattr(ActivityRepository, "list_edges", slow_list_edges)
+    reload = asyncio.create_task(index.ensure_loaded())
+    await read.wait()
+
+    # изменение приходит, пока дерево читается
+    con = sqlite3.connect(seeded_db)
+    con.execute("INSERT INTO activities (id, name, parent_id) VALUES (5, 'Сыры', 3)")
+    con.commit()
+    con.close()
+    index.invalidate()
+    release.set()
+    await reload
+
+    assert index.stale
+    assert 5 in await index.get_subtree_ids_by_name("Еда")
+    assert not index.stale
+
+
+async def subtrees(session_maker, name: str) -> tuple[list[int], list[int], list[int]]:
+    index = ActivityTreeIndex(session_maker)
+    async with session_maker() as session:
+        cte = await ActivityRepository(session).get_subtree_ids_by_name(name)
+        closure = await ActivityRepository(session, use_closure=True).get_subtree_ids_by_name(name)
+    return sorted(await index.get_subtree_ids_by_name(name)), sorted(cte), sorted(closure)
+
+
+async def test_index_matches_cte_and_closure(session_maker, seeded_db):
+    # Еда -> Молочная продукция -> Сыры -> Твёрдые сыры; Автомобили -> Грузовые -> Запчасти
+    con = sqlite3.connect(seeded_db)
+    con.executemany(
+        "INSERT INTO activities (id, name, parent_id) VALUES (?, ?, ?)",
+        [(5, "Сыры", 3), (6, "Твёрдые сыры", 5), (7, "Грузовые", 4), (8, "Запчасти", 7)],
+    )
+    con.commit()
+
+    expected = {"Еда": [1, 2, 3, 5, 6], "Сыры": [5, 6], "Автомобили": [4, 7, 8], "Запчасти": [8], "Нет такого": []}
+    for name, ids in expected.items():
+        assert await subtrees(session_maker, name) == (ids, ids, ids)
+
+    # перенос поддерева: closure обновляют триггеры, индекс перечитывает рёбра
+    con.execute("UPDATE activities SET parent_id = 4 WHERE id = 5")
+    con.commit()
+    con.close()
+    assert await subtrees(session_maker, "Еда") == ([1, 2, 3],) * 3
+    assert await subtrees(session_maker, "Автомобили") == ([4, 5, 6, 7, 8],) * 3
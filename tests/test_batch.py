@@ -0,0 +1,40 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+LENINA_1 = {"country": "Россия", "city": "Москва", "street": "Ленина", "house": 1}
+BLUKHERA_32 = {"country": "Россия", "city": "Москва", "street": "Блюхера", "house": 32, "building": 1}
+
+
+async def test_orgs_batch_keeps_order(client):
+    response = await client.post("/orgs/batch", json={"ids": [3, 100, 1, 3]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["id"], r["found"]) for r in results] == [(3, True), (100, False), (1, True), (3, True)]
+    assert results[0]["organization"]["name"] == "Автосервис"
+    assert results[1]["organization"] is None
+    assert results[2]["organization"]["phones"] == ["2-222-222", "8-923-666-13-13"]
+
+
+async def test_orgs_by_address_batch_keeps_order(client):
+    queries = [
+        BLUKHERA_32,
+        {**LENINA_1, "house": 2},
+        # лишние пробелы не мешают
+        {**LENINA_1, "city": "  Москва ", "street": "Ленина  "},
+        # здание без корпуса не совпадает со зданием с корпусом
+        {**BLUKHERA_32, "building": None},
+    ]
+    response = await client.post("/orgs/address/batch", json={"addresses": queries})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["address_id"], r["found"]) for r in results] == [(2, True), (None, False), (1, True), (None, False)]
+    assert [[o["name"] for o in r["organizations"]] for r in results] == [
+        ["Автосервис"], [], ["Молоко", "Рога и копыта"], [],
+    ]
+
+
+async def test_batch_limits(client):
+    assert (await client.post("/orgs/batch", json={"ids": []})).status_code == 422
+    assert (await client.post("/orgs/batch", json={"ids": list(range(1001))})).status_code == 422
+    assert (await client.post("/orgs/address/batch", json={"addresses": []})).status_code == 422
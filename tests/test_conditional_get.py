@@ -0,0 +1,46 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_matching_etag_gives_304(client):
+    first = await client.get("/orgs/1")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    second = await client.get("/orgs/1", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+async def test_etag_is_bound_to_url(client):
+    etag = (await client.get("/orgs/1")).headers["etag"]
+
+    assert (await client.get("/orgs/2", headers={"If-None-Match": etag})).status_code == 200
+    assert (await client.get("/orgs/99999999", headers={"If-None-Match": etag})).status_code == 404
+    assert (await client.get("/orgs/abc", headers={"If-None-Match": etag})).status_code == 422
+
+
+async def test_star_does_not_match_missing_resource(client):
+    assert (await client.get("/orgs/99999999", headers={"If-None-Match": "*"})).status_code == 404
+    assert (await client.get("/orgs/abc", headers={"If-None-Match": "*"})).status_code == 422
+    assert (await client.get("/orgs/1", headers={"If-None-Match": "*"})).status_code == 304
+
+
+async def test_if_modified_since_checked_after_handler(client):
+    since = "Fri, 01 Jan 2100 00:00:00 GMT"
+    assert (await client.get("/orgs/99999999", headers={"If-Modified-Since": since})).status_code == 404
+    assert (await client.get("/orgs/activity", params={"activity": "Нет такого"},
+                             headers={"If-Modified-Since": since})).status_code == 404
+
+    response = await client.get("/orgs/activity", params={"activity": "Еда"}, headers={"If-Modified-Since": since})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+async def test_stale_etag_gives_full_response(client):
+    response = await client.get("/orgs", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.headers["etag"] != '"stale"'
+    assert [org["name"] for org in response.json()["organizations"]] == ["Автосервис", "Молоко", "Рога и копыта"]
@@ -0,0 +1,34 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+ADDRESS = {"country": "Россия", "city": "Москва", "street": "Ленина", "house": 1}
+MISSING = {"country": "Россия", "city": "Москва", "street": "Ленина", "house": 2}
+
+REQUESTS = [
+    ("GET", "/orgs", {"params": {"limit": 2}}),
+    ("GET", "/orgs/activity", {"params": {"activity": "Еда"}}),
+    ("GET", "/orgs/address", {"params": ADDRESS}),
+    ("GET", "/orgs/search", {"params": {"q": "Молоко"}}),
+    ("GET", "/orgs/1", {}),
+    ("POST", "/orgs/batch", {"json": {"ids": [3, 100, 1]}}),
+    ("POST", "/orgs/address/batch", {"json": {"addresses": [ADDRESS, MISSING]}}),
+    ("GET", "/addresses", {}),
+    ("GET", "/addresses/near", {"params": {"lat": 55.4, "lon": 37.25, "radius_m": 100_000}}),
+    ("GET", "/addresses/near/grouped", {"params": {"lat": 55.4, "lon": 37.25, "radius_m": 100_000}}),
+    ("POST", "/addresses/near/batch", {"json": {"queries": [{"lat": 55.0, "lon": 37.5}, {"lat": 10.0, "lon": 10.0}]}}),
+    ("GET", "/addresses/nearest", {"params": {"lat": 55.01, "lon": 37.5, "k": 2}}),
+]
+
+
+# без кэша ответов: иначе второй проход получит тело, собранное первым
+@pytest.mark.parametrize("client_env", [{"RESPONSE_CACHE": "false"}])
+@pytest.mark.parametrize(("method", "url", "kwargs"), REQUESTS)
+async def test_fast_json_matches_pydantic(app, client, method, url, kwargs):
+    bodies = []
+    for fast_json in (True, False):
+        app.state.settings.fast_json = fast_json
+        response = await client.request(method, url, **kwargs)
+        assert response.status_code == 200
+        bodies.append(response.json())
+    assert bodies[0] == bodies[1]
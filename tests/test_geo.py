@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+from app.infrastructure.repos import AddressSpatialIndex, async_engine, async_session
+from app.infrastructure.repos.cruds import AddressRepository
+from app.infrastructure.repos.utils.geo import bounding_boxes, haversine_km
+
+pytestmark = pytest.mark.anyio
+
+# по две точки у антимеридиана и у северного полюса, по разные стороны
+POINTS = {10: (0.0, 179.99), 11: (0.0, -179.99), 12: (89.99, 0.0), 13: (89.99, 180.0)}
+
+
+@pytest.fixture
+async def session_maker(seeded_db):
+    con = sqlite3.connect(seeded_db)
+    con.executemany(
+        "INSERT INTO addresses (id, country, city, street, house, lat, lon) VALUES (?, 'Фиджи', 'Сува', 'Край', ?, ?, ?)",
+        [(address_id, address_id, lat, lon) for address_id, (lat, lon) in POINTS.items()],
+    )
+    con.commit()
+    con.close()
+
+    engine = async_engine(f"sqlite+aiosqlite:///{seeded_db}")
+    yield async_session(engine)
+    await engine.dispose()
+
+
+def test_bounding_boxes_split_at_antimeridian():
+    assert bounding_boxes(0.0, 0.0, 10.0) == [pytest.approx((-0.0899, 0.0899, -0.0899, 0.0899), abs=1e-4)]
+
+    east, west = bounding_boxes(0.0, 179.99, 10.0)
+    assert east[2:] == pytest.approx((179.9001, 180.0), abs=1e-4)
+    assert west[2:] == pytest.approx((-180.0, -179.9201), abs=1e-4)
+
+    # круг накрывает полюс — все долготы
+    assert bounding_boxes(89.99, 0.0, 10.0) == [pytest.approx((89.9001, 90.0, -180.0, 180.0), abs=1e-4)]
+
+
+@pytest.mark.parametrize("use_rtree", [False, True])
+@pytest.mark.parametrize(("lat", "lon", "expected"), [(0.0, 179.995, [10, 11]), (0.0, -179.995, [11, 10]),
+                                                      (89.995, 90.0, [12, 13])])
+async def test_nearest_across_antimeridian_and_pole(session_maker, use_rtree, lat, lon, expected):
+    async with session_maker() as session:
+        repo = AddressRepository(session, use_rtree=use_rtree)
+        nearest = await repo.list_nearest(lat, lon, k=2, start_radius_m=100.0)
+        assert [a.id for a, _ in nearest] == expected
+        for address, distance_m in nearest:
+            assert distance_m == pytest.approx(float(haversine_km(lat, lon, address.lat, address.lon)) * 1000.0)
+
+        within = await repo.list_within_radius(lat, lon, 5000)
+        assert [a.id for a in within] == expected
+        [many] = await repo.list_within_radius_many([(lat, lon, 5000, None)])
+        assert [a.id for a in many] == expected
+
+    index = AddressSpatialIndex(session_maker)
+    ids, _ = await index.nearest(lat, lon, k=2, start_radius_m=100.0)
+    assert ids == expected
+    ids, _ = await index.query(lat, lon, 5000)
+    assert ids == expected
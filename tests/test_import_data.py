@@ -0,0 +1,113 @@
+import json
+import sqlite3
+
+import pytest
+
+from app.cli import import_data
+from app.infrastructure.repos.bulk_import import BulkImporter
+
+ACTIVITIES = """name,parent
+Свинина,Мясная продукция
+Мясная продукция,Еда
+Еда,
+Автомобили,
+Сироты,Нет такого
+"""
+
+ORGS = [
+    {"name": "Рога и копыта", "country": "Россия", "city": "Москва", "street": "Ленина", "house": 1,
+     "lat": 55.0, "lon": 37.5, "phones": ["2-222-222", "3-333-333"], "activities": ["Свинина"]},
+    {"name": "Молоко", "country": "Россия", "city": "Москва", "street": "Ленина", "house": 1,
+     "lat": 55.0, "lon": 37.5, "phones": [], "activities": ["Еда"]},
+    {"name": "Автосервис", "country": "Россия", "city": "Москва", "street": "Блюхера", "house": 32, "building": 1,
+     "lat": 55.75, "lon": 37.0, "phones": ["4-444-444"], "activities": ["Автомобили"]},
+    {"name": "Без адреса"},
+]
+
+
+def run(*argv) -> None:
+    assert import_data.main([str(a) for a in argv]) == 0
+
+
+def versions(con: sqlite3.Connection) -> dict[str, int]:
+    return dict(con.execute("SELECT table_name, version FROM data_versions"))
+
+
+def counts(con: sqlite3.Connection) -> dict[str, int]:
+    tables = ("activities", "addresses", "organizations", "organization_phones", "organization_activities")
+    return {t: con.execute(f"SELECT count(*) FROM {t}").fetchone()[0] for t in tables}
+
+
+@pytest.fixture
+def files(tmp_path):
+    activities = tmp_path / "activities.csv"
+    activities.write_text(ACTIVITIES, encoding="utf-8")
+    orgs = tmp_path / "orgs.ndjson"
+    orgs.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in ORGS), encoding="utf-8")
+    return activities, orgs
+
+
+def test_import_and_rerun(sqlite_db, files):
+    activities, orgs = files
+    # родитель встречается в файле позже ребёнка и в другой пачке
+    run("activities", activities, "--chunk-size", 1)
+    run("organizations", orgs, "--chunk-size", 2)
+
+    con = sqlite3.connect(sqlite_db)
+    parents = dict(con.execute(
+        "SELECT a.name, p.name FROM activities a LEFT JOIN activities p ON p.id = a.parent_id"
+    ))
+    assert parents == {"Еда": None, "Мясная продукция": "Еда", "Свинина": "Мясная продукция", "Автомобили": None}
+    assert con.execute(
+        "SELECT depth FROM activity_closure c JOIN activities a ON a.id = c.ancestor_id "
+        "JOIN activities d ON d.id = c.descendant_id WHERE a.name = 'Еда' AND d.name = 'Свинина'"
+    ).fetchone() == (2,)
+    assert counts(con) == {
+        "activities": 4, "addresses": 2, "organizations": 3, "organization_phones": 3, "organization_activities": 3,
+    }
+    assert not activities.with_name(activities.name + ".checkpoint").exists()
+
+    # версии сдвинуты по разу за импорт, а не на каждую строку
+    before = versions(con)
+    assert before["activities"] == 1
+    assert before["organization_phones"] == 1
+
+    run("activities", activities)
+    run("organizations", orgs)
+    assert counts(con) == {
+        "activities": 4, "addresses": 2, "organizations": 3, "organization_phones": 3, "organization_activities": 3,
+    }
+
+    # триггеры data_versions после импорта на месте
+    con.execute("DELETE FROM organization_phones WHERE phone = '4-444-444'")
+    con.commit()
+    assert versions(con)["organization_phones"] == before["organization_phones"] + 2
+    con.close()
+
+
+def test_resume_keeps_deferred_records(sqlite_db, files, monkeypatch):
+    activities, _ = files
+    import_chunk = BulkImporter.import_chunk
+    calls = 0
+
+    async def failing(self, kind, chunk):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise RuntimeError("boom")
+        return await import_chunk(self, kind, chunk)
+
+    monkeypatch.setattr(BulkImporter, "import_chunk", failing)
+    with pytest.raises(RuntimeError):
+        run("activities", activities, "--chunk-size", 1)
+    # «Свинина» и «Мясная продукция» отложены до «Еды», чекпоинт на них не сдвинулся
+    checkpoint = activities.with_name(activities.name + ".checkpoint")
+    assert json.loads(checkpoint.read_text())["records"] == 0
+
+    monkeypatch.setattr(BulkImporter, "import_chunk", import_chunk)
+    run("activities", activities, "--chunk-size", 1)
+    con = sqlite3.connect(sqlite_db)
+    assert {name for (name,) in con.execute("SELECT name FROM activities")} == {
+        "Еда", "Мясная продукция", "Свинина", "Автомобили",
+    }
+    con.close()
@@ -0,0 +1,22 @@
+import shutil
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def replica_files(seeded_db, tmp_path) -> list[str]:
+    replica = tmp_path / "replica.sqlite"
+    shutil.copy(seeded_db, replica)
+    return [str(replica)]
+
+
+async def test_pool_gauges_for_every_engine(client, replica_files):
+    assert (await client.get("/orgs/1")).status_code == 200
+    metrics = (await client.get("/metrics")).text
+
+    replica = f"sqlite+aiosqlite:///{replica_files[0]}"
+    for engine, role in [("primary", "read_write"), ("primary", "read_only"), (replica, "replica")]:
+        for state in ("size", "checked_out", "checked_in", "overflow"):
+            assert f'db_pool_connections{{engine="{engine}",role="{role}",state="{state}"}}' in metrics
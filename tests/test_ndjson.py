@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def lines(response) -> list[dict]:
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+# пачки по одной записи: поток длиннее одного yield_per, связи догружаются в каждой пачке
+@pytest.mark.parametrize("client_env", [{"STREAM_CHUNK_SIZE": "1"}])
+async def test_ndjson_matches_json(client):
+    orgs = (await client.get("/orgs")).json()["organizations"]
+    assert lines(await client.get("/orgs", headers=NDJSON)) == orgs
+    assert len(orgs) == 3 and orgs[2]["phones"]
+
+    addresses = (await client.get("/addresses")).json()["addresses"]
+    assert lines(await client.get("/addresses", headers=NDJSON)) == addresses
+    assert len(addresses) == 2
+
+
+@pytest.mark.parametrize("client_env", [{"STREAM_CHUNK_SIZE": "1"}])
+async def test_ndjson_after_cursor(client):
+    cursor = (await client.get("/orgs", params={"limit": 1})).json()["next_cursor"]
+    streamed = lines(await client.get("/orgs", params={"cursor": cursor}, headers=NDJSON))
+    assert [org["name"] for org in streamed] == ["Молоко", "Рога и копыта"]
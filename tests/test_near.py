@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+BOTH_PATHS = pytest.mark.parametrize("client_env", [{"SPATIAL_INDEX": "false"}, {"SPATIAL_INDEX": "true"}])
+
+# адрес 1 (55.0, 37.5), адрес 2 (55.75, 37.0), между ними ~90 км; от (55.4, 37.25) до 2 ближе (42 км против 47)
+QUERIES = [
+    {"lat": 55.0, "lon": 37.5, "radius_m": 1000},
+    {"lat": 55.75, "lon": 37.0},
+    {"lat": 55.4, "lon": 37.25, "radius_m": 100_000},
+    {"lat": 55.4, "lon": 37.25, "radius_m": 100_000, "limit": 1},
+    {"lat": 10.0, "lon": 10.0, "radius_m": 1000},
+]
+
+
+@BOTH_PATHS
+async def test_near_batch_matches_single_queries(client):
+    response = await client.post("/addresses/near/batch", json={"queries": QUERIES})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == len(QUERIES)
+
+    for query, result in zip(QUERIES, results):
+        single = (await client.get("/addresses/near", params=query)).json()
+        assert sorted(a["id"] for a in result["addresses"]) == sorted(a["id"] for a in single["addresses"])
+        assert sorted(o["id"] for o in result["organizations"]) == sorted(o["id"] for o in single["organizations"])
+
+    assert [sorted(a["id"] for a in r["addresses"]) for r in results] == [[1], [2], [1, 2], [2], []]
+    assert sorted(o["name"] for o in results[0]["organizations"]) == ["Молоко", "Рога и копыта"]
+
+
+async def test_near_batch_validation(client):
+    assert (await client.post("/addresses/near/batch", json={"queries": []})).status_code == 422
+    assert (await client.post("/addresses/near/batch", json={"queries": [{"lat": 91, "lon": 0}]})).status_code == 422
+
+
+async def grouped(client, **params) -> list[dict]:
+    response = await client.get("/addresses/near/grouped", params={"lat": 55.4, "lon": 37.25, **params})
+    assert response.status_code == 200
+    return response.json()["addresses"]
+
+
+@BOTH_PATHS
+async def test_near_grouped(client):
+    addresses = await grouped(client, radius_m=100_000)
+    # здания по возрастанию расстояния, организации внутри здания по имени
+    assert [a["id"] for a in addresses] == [2, 1]
+    assert addresses[0]["distance_m"] < addresses[1]["distance_m"]
+    assert [[o["name"] for o in a["organizations"]] for a in addresses] == [
+        ["Автосервис"], ["Молоко", "Рога и копыта"],
+    ]
+    assert addresses[1]["organizations"][1] == {
+        "id": 1, "name": "Рога и копыта", "phones": ["2-222-222", "8-923-666-13-13"], "activities": ["Мясная продукция"],
+    }
+
+    # страницы — по тем же зданиям, что и без limit/offset
+    assert [a["id"] for a in await grouped(client, radius_m=100_000, limit=1)] == [2]
+    assert [a["id"] for a in await grouped(client, radius_m=100_000, limit=1, offset=1)] == [1]
+    assert await grouped(client, radius_m=1000) == []
+
+
+@BOTH_PATHS
+async def test_near_grouped_keeps_empty_buildings(client, seeded_db):
+    con = sqlite3.connect(seeded_db)
+    con.execute("DELETE FROM organizations WHERE address_id = 2")
+    con.commit()
+    con.close()
+
+    addresses = await grouped(client, radius_m=1000, lat=55.75, lon=37.0)
+    assert [(a["id"], a["organizations"]) for a in addresses] == [(2, [])]
@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from app.infrastructure.repos.utils.geo import haversine_km
+
+pytestmark = pytest.mark.anyio
+
+# опрос data_versions «не успевает»: гео-индекс отстаёт от БД
+STALE_INDEX = {"SPATIAL_INDEX": "true", "DATA_VERSION_POLL_S": "3600", "SPATIAL_INDEX_TTL_S": "3600"}
+
+
+def distance_m(lat, lon, address: dict) -> float:
+    return round(float(haversine_km(lat, lon, address["lat"], address["lon"])) * 1000.0, 1)
+
+
+async def nearest(client, lat: float, lon: float, k: int) -> list[tuple[int, float]]:
+    response = await client.get("/addresses/nearest", params={"lat": lat, "lon": lon, "k": k})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    for r in results:
+        assert r["distance_m"] == distance_m(lat, lon, r["address"])
+    return [(r["address"]["id"], r["distance_m"]) for r in results]
+
+
+@pytest.mark.parametrize("client_env", [STALE_INDEX])
+async def test_nearest_with_address_deleted_behind_index(client, seeded_db):
+    before = await nearest(client, 55.01, 37.5, k=2)
+    assert [address_id for address_id, _ in before] == [1, 2]
+
+    con = sqlite3.connect(seeded_db)
+    con.execute("DELETE FROM organizations WHERE address_id = 1")
+    con.execute("DELETE FROM addresses WHERE id = 1")
+    con.commit()
+    con.close()
+
+    after = await nearest(client, 55.01, 37.5, k=2)
+    assert after == [before[1]]
+
+
+@pytest.mark.parametrize("client_env", [{"SPATIAL_INDEX": "false"}, {"SPATIAL_INDEX": "true"}])
+async def test_nearest_k(client):
+    assert await nearest(client, 55.01, 37.5, k=1) == [(1, 1111.9)]
+    assert [address_id for address_id, _ in await nearest(client, 55.7, 37.0, k=5)] == [2, 1]
+    # от (55.4, 37.25) до адреса 2 ближе
+    assert [address_id for address_id, _ in await nearest(client, 55.4, 37.25, k=1)] == [2]
+
+
+@pytest.mark.parametrize("client_env", [{"SPATIAL_INDEX": "false"}, {"SPATIAL_INDEX": "true"}])
+async def test_nearest_by_activity(client):
+    response = await client.get("/addresses/nearest", params={"lat": 55.01, "lon": 37.5, "k": 5, "activity": "Автомобили"})
+    assert response.status_code == 200
+    [result] = response.json()["results"]
+    assert result["address"]["id"] == 2
+    assert [o["name"] for o in result["organizations"]] == ["Автосервис"]
+
+    # у ближайшего здания из двух организаций отдаём только подходящую по виду деятельности
+    response = await client.get("/addresses/nearest", params={"lat": 55.7, "lon": 37.0, "k": 5, "activity": "Мясная продукция"})
+    [result] = response.json()["results"]
+    assert [o["name"] for o in result["organizations"]] == ["Рога и копыта"]
+
+    response = await client.get("/addresses/nearest", params={"lat": 55.7, "lon": 37.0, "activity": "Нет такого"})
+    assert response.status_code == 404
@@ -0,0 +1,38 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def pages(client, url: str, limit: int, **params) -> list[list[str]]:
+    names, cursor = [], None
+    while True:
+        query = {**params, "limit": limit}
+        if cursor is not None:
+            query["cursor"] = cursor
+        response = await client.get(url, params=query)
+        assert response.status_code == 200
+        body = response.json()
+        names.append([org["name"] for org in body["organizations"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return names
+
+
+async def test_keyset_pages_cover_all_orgs(client):
+    assert await pages(client, "/orgs", limit=2) == [["Автосервис", "Молоко"], ["Рога и копыта"]]
+    # ровно limit строк: следующей страницы нет
+    assert await pages(client, "/orgs", limit=3) == [["Автосервис", "Молоко", "Рога и копыта"]]
+
+
+async def test_keyset_pages_by_activity_and_address(client):
+    assert await pages(client, "/orgs/activity", limit=1, activity="Еда") == [["Молоко"], ["Рога и копыта"]]
+    address = {"country": "Россия", "city": "Москва", "street": "Ленина", "house": 1}
+    assert await pages(client, "/orgs/address", limit=1, **address) == [["Молоко"], ["Рога и копыта"]]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "WzEsMl0", "WyJhIiwiYiJd"])
+async def test_bad_cursor(client, cursor):
+    # мусор, [1, 2] и ["a", "b"]
+    response = await client.get("/orgs", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Некорректный курсор."
@@ -0,0 +1,89 @@
+import shutil
+import sqlite3
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# проверки реплик и опрос data_versions — только вручную, из теста
+MANUAL = {"DB_REPLICA_CHECK_S": "3600", "DATA_VERSION_POLL_S": "3600", "RESPONSE_CACHE": "false"}
+
+
+def rename_org(path, name: str, mark: bool = False) -> None:
+    con = sqlite3.connect(path)
+    con.execute("UPDATE organizations SET name = ? WHERE id = 1", (name,))
+    if mark:
+        # метка реплики — не изменение данных: версию возвращаем
+        con.execute("UPDATE data_versions SET version = version - 1 WHERE table_name = 'organizations'")
+    con.commit()
+    con.close()
+
+
+@pytest.fixture
+def replica_files(request, seeded_db, tmp_path) -> list[str]:
+    # fresh — копия primary (имя организации 1 помечено, чтобы было видно, кто ответил),
+    # lagging — копия, после которой primary изменился, missing — файла нет и не может быть
+    files = []
+    for i, kind in enumerate(request.param):
+        path = tmp_path / f"replica{i}.sqlite"
+        if kind == "missing":
+            files.append(str(tmp_path / "missing" / path.name))
+            continue
+        shutil.copy(seeded_db, path)
+        if kind == "fresh":
+            rename_org(path, "Рога и копыта (реплика)", mark=True)
+        files.append(str(path))
+    if "lagging" in request.param:
+        con = sqlite3.connect(seeded_db)
+        con.execute("INSERT INTO organization_phones (organization_id, phone) VALUES (2, '5-555-555')")
+        con.commit()
+        con.close()
+    return files
+
+
+async def org_name(client) -> str:
+    response = await client.get("/orgs/1")
+    assert response.status_code == 200
+    return response.json()["organization"]["name"]
+
+
+@pytest.mark.parametrize("client_env", [MANUAL])
+@pytest.mark.parametrize("replica_files", [["fresh"]], indirect=True)
+async def test_reads_go_to_replica(app, client):
+    [replica] = app.state.replicas.replicas
+    assert replica.healthy
+    assert await org_name(client) == "Рога и копыта (реплика)"
+
+
+@pytest.mark.parametrize("client_env", [MANUAL])
+@pytest.mark.parametrize("replica_files", [["lagging", "missing"]], indirect=True)
+async def test_lagging_and_missing_replicas_fall_back_to_primary(app, client):
+    lagging, missing = app.state.replicas.replicas
+    assert not lagging.healthy and lagging.reason == "behind primary on organization_phones"
+    assert not missing.healthy and missing.reason.startswith("OperationalError")
+    assert await org_name(client) == "Рога и копыта"
+
+
+@pytest.mark.parametrize("client_env", [MANUAL])
+@pytest.mark.parametrize("replica_files", [["fresh"]], indirect=True)
+async def test_replica_back_after_catching_up(app, client, seeded_db, replica_files):
+    replicas = app.state.replicas
+    [replica] = replicas.replicas
+
+    # запись на primary: до перепроверки реплика может отставать — читаем с primary
+    rename_org(seeded_db, "Рога и копыта 2")
+    await app.state.data_version.refresh()
+    assert not replica.healthy
+    assert await org_name(client) == "Рога и копыта 2"
+
+    # проверка: реплика действительно отстаёт
+    await replicas.check()
+    assert replica.reason == "behind primary on organizations"
+    assert await org_name(client) == "Рога и копыта 2"
+
+    # догнала — снова в ротации
+    rename_org(replica_files[0], "Рога и копыта 2")
+    rename_org(replica_files[0], "Рога и копыта (реплика)", mark=True)
+    await replicas.check()
+    assert replica.healthy
+    assert await org_name(client) == "Рога и копыта (реплика)"
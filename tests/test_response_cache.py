@@ -0,0 +1,42 @@
+import sqlite3
+
+import anyio
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+ACTIVITY = {"activity": "Еда"}
+
+
+async def names(client, expected_cache: str) -> list[str]:
+    response = await client.get("/orgs/activity", params=ACTIVITY)
+    assert response.status_code == 200
+    assert response.headers["x-cache"] == expected_cache
+    return [org["name"] for org in response.json()["organizations"]]
+
+
+@pytest.mark.parametrize("client_env", [{"DATA_VERSION_POLL_S": "0.05"}])
+async def test_cache_hit_and_invalidation_on_write(client, seeded_db):
+    assert await names(client, "MISS") == ["Молоко", "Рога и копыта"]
+    assert await names(client, "HIT") == ["Молоко", "Рога и копыта"]
+    # другой ключ — свой промах
+    response = await client.get("/orgs/activity", params={"activity": "Автомобили"})
+    assert response.headers["x-cache"] == "MISS"
+
+    con = sqlite3.connect(seeded_db)
+    con.execute("INSERT INTO organizations (id, name, address_id) VALUES (4, 'Ферма', 2)")
+    con.execute("INSERT INTO organization_activities (organization_id, activity_id) VALUES (4, 2)")
+    con.commit()
+    con.close()
+
+    # запись видна после очередного опроса data_versions: кэш сброшен, ответ собирается заново
+    with anyio.fail_after(5):
+        while (await client.get("/orgs/activity", params=ACTIVITY)).headers["x-cache"] == "HIT":
+            await anyio.sleep(0.05)
+    assert await names(client, "HIT") == ["Молоко", "Рога и копыта", "Ферма"]
+
+
+@pytest.mark.parametrize("client_env", [{"RESPONSE_CACHE": "false", "SINGLE_FLIGHT": "false"}])
+async def test_cache_disabled(client):
+    assert await names(client, "MISS") == ["Молоко", "Рога и копыта"]
+    assert await names(client, "MISS") == ["Молоко", "Рога и копыта"]
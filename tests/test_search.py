@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def more_orgs(seeded_db):
+    con = sqlite3.connect(seeded_db)
+    con.executemany(
+        "INSERT INTO organizations (id, name, address_id) VALUES (?, ?, 2)",
+        [(4, "Молочный завод"), (5, "Молоковоз"), (6, "Шиномонтаж"), (7, "100% мёд")],
+    )
+    con.commit()
+    con.close()
+
+
+async def search(client, q: str, **params) -> list[str]:
+    response = await client.get("/orgs/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [org["name"] for org in response.json()["organizations"]]
+
+
+async def test_search_ranking(app, client, more_orgs):
+    assert app.state.name_search == "fts5"
+    names = await search(client, "Молоко")
+    assert names[0] == "Молоко"
+    assert set(names[:3]) == {"Молоко", "Молоковоз", "Молочный завод"}
+    assert "Шиномонтаж" not in names
+    assert await search(client, "Молоко", limit=1) == ["Молоко"]
+
+
+async def test_search_typo_and_case(client, more_orgs):
+    # опечатка: общие триграммы «око», «лок» остаются
+    assert (await search(client, "Малоко"))[0] == "Молоко"
+    assert (await search(client, "  шиномонтаж ")) == ["Шиномонтаж"]
+    assert await search(client, "Грузовики") == []
+
+
+async def test_search_short_and_special(client, more_orgs):
+    # короче триграммы — поиск по подстроке
+    assert await search(client, "ок") == ["Молоко", "Молоковоз"]
+    assert await search(client, "%") == ["100% мёд"]
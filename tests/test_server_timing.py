@@ -0,0 +1,56 @@
+import logging
+import re
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+METRIC = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) queries")?')
+
+
+def server_timing(response) -> dict[str, float]:
+    metrics = {}
+    for name, duration, queries in METRIC.findall(response.headers["server-timing"]):
+        metrics[name] = float(duration)
+        if queries:
+            metrics["queries"] = int(queries)
+    return metrics
+
+
+async def test_server_timing_header(client):
+    response = await client.get("/orgs/activity", params={"activity": "Еда"})
+    assert response.headers["x-cache"] == "MISS"
+    metrics = server_timing(response)
+    assert list(metrics) == ["pool", "db", "queries", "map", "ser", "app", "total"]
+    assert metrics["queries"] > 0
+    parts = metrics["pool"] + metrics["db"] + metrics["map"] + metrics["ser"] + metrics["app"]
+    assert parts == pytest.approx(metrics["total"], abs=0.05)
+
+    # ответ из кэша в БД не ходит
+    response = await client.get("/orgs/activity", params={"activity": "Еда"})
+    assert response.headers["x-cache"] == "HIT"
+    assert server_timing(response)["queries"] == 0
+
+    # ошибки тоже с заголовком
+    response = await client.get("/orgs", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert "total" in server_timing(response)
+
+
+@pytest.mark.parametrize("client_env", [{"SLOW_REQUEST_MS": "0"}])
+async def test_slow_request_logged(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="app"):
+        await client.get("/orgs/1")
+    [record] = [r for r in caplog.records if r.getMessage().startswith("Slow request")]
+    assert "path=/orgs/1 status=200" in record.getMessage()
+
+
+def test_server_timing_disabled(monkeypatch):
+    from app import main
+    from app.infrastructure.core.config import Settings
+
+    # флаги middleware create_app() берёт из настроек модуля
+    monkeypatch.setenv("SERVER_TIMING", "false")
+    monkeypatch.setattr(main, "settings", Settings())
+    app = main.create_app()
+    assert all(m.cls.__name__ != "ServerTimingMiddleware" for m in app.user_middleware)
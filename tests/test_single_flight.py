@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from app.infrastructure.repos.cruds import OrganizationRepository
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_follower_survives_leader_disconnect(client, monkeypatch):
+    started, release = asyncio.Event(), asyncio.Event()
+    in_transaction = []
+    list_by_activities_any = OrganizationRepository.list_by_activities_any
+
+    async def slow_list(self, *args, **kwargs):
+        await self.session.execute(OrganizationRepository._select(self).limit(1))
+        started.set()
+        await release.wait()
+        # транзакцию общей задачи не должен был оборвать teardown сессии лидера
+        in_transaction.append(self.session.in_transaction())
+        return await list_by_activities_any(self, *args, **kwargs)
+
+    monkeypatch.setattr(OrganizationRepository, "list_by_activities_any", slow_list)
+    params = {"activity": "Еда"}
+
+    leader = asyncio.create_task(client.get("/orgs/activity", params=params))
+    await started.wait()
+    follower = asyncio.create_task(client.get("/orgs/activity", params=params))
+    await asyncio.sleep(0.05)
+
+    # клиент-лидер отключился: его обработчик отменён, сессия запроса закрыта
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    release.set()
+
+    response = await follower
+    assert response.status_code == 200
+    assert in_transaction == [True]
+    assert response.headers["x-cache"] == "COALESCED"
+    assert [org["name"] for org in response.json()["organizations"]] == ["Молоко", "Рога и копыта"]
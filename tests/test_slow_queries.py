@@ -0,0 +1,44 @@
+import os
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.core.slow_queries import SlowQueryLog
+
+pytestmark = pytest.mark.anyio
+
+PG_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+async def test_sqlite_plan_is_attached(seeded_db):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{seeded_db}")
+    log = SlowQueryLog(threshold_ms=0, explain=True)
+    log.instrument(engine.sync_engine)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT id FROM organizations WHERE name = :name"), {"name": "Молоко"})
+    finally:
+        await engine.dispose()
+
+    [entry] = [e for e in log.entries() if "organizations" in e["statement"]]
+    assert entry["parameters"] == ["Молоко"]
+    assert "organizations" in entry["plan"]
+
+
+@pytest.mark.skipif(not PG_URL, reason="TEST_POSTGRES_URL is not set")
+async def test_explain_analyze_does_not_repeat_writes():
+    engine = create_async_engine(PG_URL)
+    log = SlowQueryLog(threshold_ms=0, explain=True)
+    log.instrument(engine.sync_engine)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("CREATE TEMP TABLE slow_query_writes (x int) ON COMMIT DROP"))
+            await conn.execute(text("WITH ins AS (INSERT INTO slow_query_writes VALUES (1) RETURNING x) SELECT x FROM ins"))
+            assert await conn.scalar(text("SELECT count(*) FROM slow_query_writes")) == 1
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+
+    [entry] = [e for e in log.entries() if e["statement"].startswith("WITH ins")]
+    assert "Insert on slow_query_writes" in entry["plan"]
@@ -0,0 +1,81 @@
+import asyncio
+import random
+import sqlite3
+
+import pytest
+
+from app.infrastructure.repos import AddressSpatialIndex, async_engine, async_session
+from app.infrastructure.repos.cruds import AddressRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def session_maker(seeded_db):
+    engine = async_engine(f"sqlite+aiosqlite:///{seeded_db}")
+    yield async_session(engine)
+    await engine.dispose()
+
+
+async def test_invalidate_during_reload_keeps_index_stale(session_maker, seeded_db, monkeypatch):
+    index = AddressSpatialIndex(session_maker)
+    read, release = asyncio.Event(), asyncio.Event()
+    list_coordinates = AddressRepository.list_coordinates
+
+    async def slow_list_coordinates(self):
+        rows = await list_coordinates(self)
+        read.set()
+        await release.wait()
+        return rows
+
+    monkeypatch.setattr(AddressRepository, "list_coordinates", slow_list_coordinates)
+    reload = asyncio.create_task(index.ensure_fresh())
+    await read.wait()
+
+    con = sqlite3.connect(seeded_db)
+    con.execute("INSERT INTO addresses (id, country, city, street, house, lat, lon) "
+                "VALUES (3, 'Россия', 'Москва', 'Тверская', 7, 55.001, 37.5)")
+    con.commit()
+    con.close()
+    index.invalidate()
+    release.set()
+    await reload
+
+    assert index.stale
+    ids, _ = await index.query(55.0, 37.5, 1000)
+    assert ids == [1, 3]
+
+
+@pytest.fixture
+def scattered(seeded_db):
+    # 500 адресов в квадрате ~40 км вокруг центра Москвы: в одну ячейку сетки попадает много точек
+    rng = random.Random(5)
+    con = sqlite3.connect(seeded_db)
+    con.executemany(
+        "INSERT INTO addresses (id, country, city, street, house, lat, lon) VALUES (?, 'Россия', 'Москва', 'Тестовая', ?, ?, ?)",
+        [(i, i, 55.55 + rng.random() * 0.4, 37.3 + rng.random() * 0.6) for i in range(10, 510)],
+    )
+    con.commit()
+    con.close()
+    return seeded_db
+
+
+@pytest.mark.parametrize("use_rtree", [False, True])
+async def test_grid_matches_sql_radius(scattered, session_maker, use_rtree):
+    index = AddressSpatialIndex(session_maker)
+    rng = random.Random(7)
+    points = [(55.75, 37.6, 100), (55.0, 37.5, 1)] + [
+        (55.5 + rng.random() * 0.5, 37.25 + rng.random() * 0.7, rng.choice([300, 1000, 2500, 10_000]))
+        for _ in range(40)
+    ]
+    async with session_maker() as session:
+        repo = AddressRepository(session, use_rtree=use_rtree)
+        for lat, lon, radius_m in points:
+            expected = await repo.list_within_radius(lat, lon, radius_m)
+            ids, distances_m = await index.query(lat, lon, radius_m)
+            assert sorted(ids) == sorted(a.id for a in expected)
+            assert distances_m == sorted(distances_m)
+
+            # страница индекса — те же адреса по возрастанию расстояния
+            page_ids, _ = await index.query(lat, lon, radius_m, limit=5, offset=2)
+            assert page_ids == ids[2:7]
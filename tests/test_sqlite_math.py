@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+
+from app.infrastructure.repos import async_engine, async_session
+from app.infrastructure.repos.cruds import AddressRepository
+from app.infrastructure.repos.session import register_sqlite_math_functions
+
+pytestmark = pytest.mark.anyio
+
+
+async def within_radius(db, python_math: bool, use_rtree: bool) -> list[tuple[int, float]]:
+    engine = async_engine(f"sqlite+aiosqlite:///{db}")
+    if python_math:
+        # поверх встроенных: так ведёт себя сборка SQLite без SQLITE_ENABLE_MATH_FUNCTIONS
+        event.listen(engine.sync_engine, "connect", lambda conn, _: register_sqlite_math_functions(conn))
+    try:
+        async with async_session(engine)() as session:
+            grouped = await AddressRepository(session, use_rtree=use_rtree).list_within_radius_with_orgs(
+                55.0, 37.5, 100_000,
+            )
+            return [(address.id, round(distance_m, 6)) for address, distance_m, _ in grouped]
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("use_rtree", [False, True])
+async def test_python_math_functions_match_builtin(seeded_db, use_rtree):
+    builtin = await within_radius(seeded_db, python_math=False, use_rtree=use_rtree)
+    assert [address_id for address_id, _ in builtin] == [1, 2]
+    assert await within_radius(seeded_db, python_math=True, use_rtree=use_rtree) == builtin
+
+
+def test_out_of_domain_gives_null():
+    con = sqlite3.connect(":memory:")
+    register_sqlite_math_functions(con)
+    assert con.execute("SELECT asin(2), sqrt(-1), radians(NULL), pow(2, 3)").fetchone() == (None, None, None, 8.0)